@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -19,10 +20,12 @@ from api.routes.browser import router as browser_router
 from api.routes.search import router as search_router
 from api.routes.ws_terminal import router as ws_terminal_router
 from scheduler.worker import worker_singleton
+from backend.log_stream import router as log_router, publish_log_event, bind_loop
 from api.security import RateLimitMiddleware, ApiTokenMiddleware
 from api.routes.voice import router as voice_router
 from api.routes.watchdog import router as watchdog_router
 from watchdog.worker import watchdog_singleton
+from data.ingest import ingest_queue
 
 
 settings = Settings()
@@ -31,6 +34,10 @@ settings = Settings()
 async def lifespan(app: FastAPI):
     # Startup
     try:
+        # Per-run scheduler timings go to the live log stream; runs finish on
+        # pool threads, so events are handed over to this loop
+        bind_loop(asyncio.get_running_loop())
+        worker_singleton.set_publisher(publish_log_event)
         worker_singleton.start()
     except Exception:
         # In production, log error; keep app running
@@ -52,6 +59,11 @@ async def lifespan(app: FastAPI):
         watchdog_singleton.stop()
     except Exception:
         pass
+    try:
+        # Drain buffered watchdog events/commands before exit
+        ingest_queue.stop()
+    except Exception:
+        pass
 
 app = FastAPI(title="Jessica AI Assistant Internal API", lifespan=lifespan)
 
@@ -86,6 +98,7 @@ app.include_router(search_router, prefix="/search")
 app.include_router(ws_terminal_router)
 app.include_router(voice_router)
 app.include_router(watchdog_router)
+app.include_router(log_router)
 
 
 @app.get("/health")
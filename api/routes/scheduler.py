@@ -1,7 +1,13 @@
+import asyncio
 import json
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response
 from pydantic import BaseModel
+from starlette.responses import StreamingResponse
 from data import db
+from scheduler.output import forget_output, live_output
+from scheduler.worker import TaskBusyError, worker_singleton
+from api.streaming import ndjson_response
 
 
 class TaskCreateRequest(BaseModel):
@@ -21,6 +27,8 @@ class TaskCreateAdvanced(BaseModel):
     cron_expr: str | None = None
     iso_time: str | None = None
     enabled: bool = True
+    timeout_seconds: int | None = None
+    concurrency_key: str | None = None  # runs sharing a key never overlap
 
 
 class TaskIdRequest(BaseModel):
@@ -37,6 +45,7 @@ def add_task(req: TaskCreateRequest):
         raise HTTPException(status_code=400, detail="interval_seconds must be > 0")
     args_json = json.dumps(req.args)
     task_id = db.add_task(req.name, req.command, args_json, req.interval_seconds, req.enabled)
+    worker_singleton.refresh()
     return {"id": task_id}
 
 
@@ -55,6 +64,8 @@ def list_tasks():
             "schedule_type": r["schedule_type"],
             "cron_expr": r["cron_expr"],
             "iso_time": r["iso_time"],
+            "timeout_seconds": r["timeout_seconds"],
+            "concurrency_key": r["concurrency_key"],
         }
         for r in rows
     ]
@@ -65,15 +76,36 @@ def enable_task(req: TaskIdRequest):
     if req.enabled is None:
         raise HTTPException(status_code=400, detail="enabled must be provided")
     db.set_task_enabled(req.id, bool(req.enabled))
+    worker_singleton.refresh()
     return {"id": req.id, "enabled": bool(req.enabled)}
 
 
 @router.delete("/delete")
 def delete_task(req: TaskIdRequest):
     db.delete_task(req.id)
+    forget_output(req.id)
+    worker_singleton.refresh()
     return {"id": req.id, "deleted": True}
 
 
+@router.get("/running")
+def running_tasks():
+    return worker_singleton.running()
+
+
+@router.get("/metrics")
+def metrics():
+    """Lateness, queue wait, jitter and duration histograms (seconds) plus run counts."""
+    return worker_singleton.metrics.snapshot()
+
+
+@router.post("/cancel")
+def cancel_task(req: TaskIdRequest):
+    if not worker_singleton.cancel(req.id):
+        raise HTTPException(status_code=404, detail="Task is not running")
+    return {"id": req.id, "cancelled": True}
+
+
 @router.post("/run_now")
 def run_now(req: TaskIdRequest):
     # Directly execute the task once without changing schedule
@@ -81,29 +113,57 @@ def run_now(req: TaskIdRequest):
     if not rows:
         raise HTTPException(status_code=404, detail="Task not found")
     r = rows[0]
+    import os
+    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    command = r["command"].lower()
+    args = json.loads(r["args_json"]) if r["args_json"] else []
+    if command == "python":
+        if not args:
+            raise HTTPException(status_code=400, detail="No script path")
+        target = os.path.abspath(os.path.join(base_dir, args[0]))
+        if os.path.commonpath([target, base_dir]) != base_dir:
+            raise HTTPException(status_code=403, detail="Forbidden script path")
+        if not os.path.isfile(target):
+            raise HTTPException(status_code=404, detail="Script not found")
+    elif command not in {"echo", "dir"}:
+        raise HTTPException(status_code=400, detail="Unsupported command")
+    # Runs through the worker so output is capped and visible on /tail
     try:
-        import os, subprocess, json as _json
-        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-        command = r["command"].lower()
-        args = _json.loads(r["args_json"]) if r["args_json"] else []
-        if command == "python":
-            if not args:
-                raise HTTPException(status_code=400, detail="No script path")
-            target = os.path.abspath(os.path.join(base_dir, args[0]))
-            if os.path.commonpath([target, base_dir]) != base_dir:
-                raise HTTPException(status_code=403, detail="Forbidden script path")
-            if not os.path.isfile(target):
-                raise HTTPException(status_code=404, detail="Script not found")
-            full = ["python", target] + args[1:]
-            res = subprocess.run(full, capture_output=True, text=True, timeout=20, shell=False)
-        elif command in {"echo", "dir"}:
-            full = [command] + args
-            res = subprocess.run(full, capture_output=True, text=True, timeout=10, shell=True)
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported command")
-    except subprocess.TimeoutExpired:
+        handle, rc, out, err = worker_singleton.run_now(r)
+    except TaskBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if handle.timed_out:
         raise HTTPException(status_code=504, detail="Command timed out")
-    return {"returncode": res.returncode, "stdout": res.stdout, "stderr": res.stderr}
+    return {"returncode": rc, "stdout": out, "stderr": err}
+
+
+@router.get("/tail")
+async def tail(id: int):
+    """Server-sent events with the live output of a task's current (or last) run."""
+    output = live_output(id)
+    if output is None:
+        raise HTTPException(status_code=404, detail="No output for task")
+    # Bounded: a slow client misses chunks instead of growing the queue
+    queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+    backlog = output.subscribe(asyncio.get_running_loop(), queue)
+
+    async def eventgen():
+        try:
+            for event in backlog:
+                yield f"data: {json.dumps(event)}\n\n"
+            if backlog and backlog[-1]["type"] == "end":
+                return
+            while True:
+                event = await queue.get()
+                yield f"data: {json.dumps(event)}\n\n"
+                if event["type"] == "end":
+                    return
+        except asyncio.CancelledError:
+            pass
+        finally:
+            output.unsubscribe(queue)
+
+    return StreamingResponse(eventgen(), media_type="text/event-stream")
 
 
 @router.post("/add_advanced")
@@ -121,6 +181,8 @@ def add_task_advanced(req: TaskCreateAdvanced):
             raise HTTPException(status_code=400, detail="iso_time required")
     else:
         raise HTTPException(status_code=400, detail="Invalid schedule_type")
+    if req.timeout_seconds is not None and req.timeout_seconds <= 0:
+        raise HTTPException(status_code=400, detail="timeout_seconds must be > 0")
 
     args_json = json.dumps(req.args)
     task_id = db.add_task_advanced(
@@ -132,20 +194,41 @@ def add_task_advanced(req: TaskCreateAdvanced):
         req.cron_expr,
         req.iso_time,
         req.enabled,
+        req.timeout_seconds,
+        req.concurrency_key,
     )
+    worker_singleton.refresh()
     return {"id": task_id}
 
 
+def _result_item(r):
+    return {
+        "id": r["id"],
+        "returncode": r["returncode"],
+        "stdout": r["stdout"],
+        "stderr": r["stderr"],
+        "ts": r["ts"],
+    }
+
+
 @router.get("/results")
-def results(id: int, limit: int = 20):
-    rows = db.get_task_results(id, limit)
-    return [
-        {
-            "id": r["id"],
-            "returncode": r["returncode"],
-            "stdout": r["stdout"],
-            "stderr": r["stderr"],
-            "ts": r["ts"],
-        }
-        for r in rows
-    ]
\ No newline at end of file
+def results(id: int, limit: int = Query(default=20, ge=1, le=500), before_id: int | None = None):
+    """Newest-first results; pass the last item's id as before_id for the next page."""
+    rows = db.get_task_results(id, limit, before_id)
+    return [_result_item(r) for r in rows]
+
+
+@router.get("/results/export")
+def export_results(id: int):
+    """Stream every stored result of a task as NDJSON, newest first."""
+    rows = db.iter_keyset(lambda limit, before_id: db.get_task_results(id, limit, before_id))
+    return ndjson_response(rows, _result_item, f"task-{id}-results.ndjson")
+
+
+@router.get("/results/overflow")
+def result_overflow(result_id: int, stream: str = Query(default="stdout", pattern="^(stdout|stderr)$")):
+    """zlib-compressed middle of a truncated result stream."""
+    blob = db.get_task_result_overflow(result_id, stream)
+    if blob is None:
+        raise HTTPException(status_code=404, detail="No overflow for result")
+    return Response(content=blob, media_type="application/zlib")
@@ -0,0 +1,17 @@
+import json
+from typing import Any, Callable, Iterable
+
+from starlette.responses import StreamingResponse
+
+
+def ndjson_response(rows: Iterable[Any], to_item: Callable[[Any], dict], filename: str | None = None) -> StreamingResponse:
+    """Stream rows as newline-delimited JSON without materializing them.
+
+    Pair with data.db.iter_keyset so exports of any size read one page at a time.
+    """
+    def gen():
+        for row in rows:
+            yield json.dumps(to_item(row), default=str) + "\n"
+
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'} if filename else None
+    return StreamingResponse(gen(), media_type="application/x-ndjson", headers=headers)
\ No newline at end of file
@@ -1,24 +1,185 @@
 import asyncio
+import time
 from datetime import datetime
-from typing import Awaitable, Callable
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 from croniter import croniter
 
+# Longest single sleep; wall-clock jumps (suspend, clock changes) are noticed within this
+MAX_SLEEP = 60.0
+# A fire this many seconds past its slot counts as a misfire
+MISFIRE_GRACE = 1.0
+MISFIRE_POLICIES = ("skip", "catch_up")
 
-async def run_cron(task: Callable[[], Awaitable[None]] | Callable[[], None], cron_expr: str) -> None:
-    """Run a task forever following a cron expression.
+JobFunc = Callable[[], Awaitable[Any]] | Callable[[], Any]
 
-    Accepts async or sync callables. Uses croniter to compute the next fire time.
+
+class CronJob:
+    """One registered job: a cron expression or a fixed interval in seconds."""
+
+    def __init__(self, name: str, func: JobFunc, cron_expr: Optional[str] = None,
+                 every: Optional[float] = None, misfire: str = "skip"):
+        if (cron_expr is None) == (every is None):
+            raise ValueError("exactly one of cron_expr or every is required")
+        if every is not None and every <= 0:
+            raise ValueError("every must be > 0")
+        if misfire not in MISFIRE_POLICIES:
+            raise ValueError(f"misfire must be one of {MISFIRE_POLICIES}")
+        if cron_expr is not None and not croniter.is_valid(cron_expr):
+            raise ValueError(f"invalid cron expression: {cron_expr}")
+        self.name = name
+        self.func = func
+        self.cron_expr = cron_expr
+        self.every = every
+        self.misfire = misfire
+        self.next_fire: float = 0.0
+        self.task: Optional[asyncio.Future] = None
+        self.runs = 0
+        self.missed = 0
+        self.overlaps = 0
+        self.last_start: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def after(self, ts: float) -> float:
+        """First fire time strictly after ts (epoch seconds)."""
+        if self.every is not None:
+            return ts + self.every
+        return croniter(self.cron_expr, datetime.fromtimestamp(ts)).get_next(datetime).timestamp()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "cron_expr": self.cron_expr,
+            "every": self.every,
+            "misfire": self.misfire,
+            "next_fire": self.next_fire,
+            "running": self.task is not None and not self.task.done(),
+            "runs": self.runs,
+            "missed": self.missed,
+            "overlaps": self.overlaps,
+            "last_start": self.last_start,
+            "last_duration": self.last_duration,
+            "last_error": self.last_error,
+        }
+
+
+class CronRegistry:
+    """Runs every background job from a single timer task.
+
+    Jobs are keyed by name; adding a job with an existing name replaces it.
+    Fire times are absolute wall-clock times recomputed from the schedule, so
+    sleeps never accumulate drift. A job whose previous run is still in flight
+    is not started again. When a slot is missed by more than MISFIRE_GRACE
+    (event loop blocked, machine asleep), the job's misfire policy decides:
+    "skip" drops the missed slots, "catch_up" runs once now.
+
+    Sync callables run in the default executor so they don't block the loop.
     """
-    base = datetime.now()
-    itr = croniter(cron_expr, base)
-    while True:
-        next_dt = itr.get_next(datetime)
-        delay = (next_dt - datetime.now()).total_seconds()
-        await asyncio.sleep(max(0, int(delay)))
-        result = task()
-        if asyncio.iscoroutine(result):
+
+    def __init__(self, misfire_grace: float = MISFIRE_GRACE):
+        self._jobs: Dict[str, CronJob] = {}
+        self._misfire_grace = misfire_grace
+        self._timer: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def add(self, name: str, func: JobFunc, cron_expr: Optional[str] = None, every: Optional[float] = None,
+            misfire: str = "skip", run_immediately: bool = False) -> CronJob:
+        job = CronJob(name, func, cron_expr=cron_expr, every=every, misfire=misfire)
+        now = time.time()
+        job.next_fire = now if run_immediately else job.after(now)
+        old = self._jobs.get(name)
+        if old is not None:
+            job.task = old.task  # an in-flight run still blocks overlap
+        self._jobs[name] = job
+        self._notify()
+        return job
+
+    def remove(self, name: str) -> bool:
+        job = self._jobs.pop(name, None)
+        self._notify()
+        return job is not None
+
+    def has(self, name: str) -> bool:
+        return name in self._jobs
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        return [job.status() for job in self._jobs.values()]
+
+    def start(self) -> None:
+        """Start the timer on the running event loop."""
+        if self._timer is not None and not self._timer.done():
+            return
+        self._wake = asyncio.Event()
+        self._timer = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
             try:
-                await result
-            except Exception as e:  # pragma: no cover
-                print(f"[Cron] Task error: {e}")
\ No newline at end of file
+                await self._timer
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._timer = None
+        for job in self._jobs.values():
+            if job.task is not None and not job.task.done():
+                job.task.cancel()
+
+    def _notify(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            now = time.time()
+            for job in list(self._jobs.values()):
+                if job.next_fire <= now:
+                    self._fire(job, now)
+            delay = MAX_SLEEP
+            if self._jobs:
+                delay = min(delay, max(0.0, min(j.next_fire for j in self._jobs.values()) - time.time()))
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _fire(self, job: CronJob, now: float) -> None:
+        slot = job.next_fire
+        late = now - slot > self._misfire_grace
+        # Advance past now in whole schedule steps so the timeline stays anchored
+        nxt = job.after(slot)
+        while nxt <= now:
+            job.missed += 1
+            nxt = job.after(nxt)
+        job.next_fire = nxt
+        if late and job.misfire == "skip":
+            job.missed += 1
+            return
+        if job.task is not None and not job.task.done():
+            job.overlaps += 1
+            return
+        job.task = asyncio.ensure_future(self._execute(job))
+
+    async def _execute(self, job: CronJob) -> None:
+        job.last_start = time.time()
+        job.runs += 1
+        try:
+            if asyncio.iscoroutinefunction(job.func):
+                await job.func()
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(None, job.func)
+                if asyncio.iscoroutine(result):
+                    await result
+            job.last_error = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.last_error = str(e)
+            print(f"[Cron] {job.name} error: {e}")
+        finally:
+            job.last_duration = time.time() - job.last_start
+
+
+# Shared by the updater, knowledge fetcher and any other periodic backend job
+cron_registry = CronRegistry()
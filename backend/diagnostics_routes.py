@@ -2,6 +2,7 @@ import psutil
 import time
 from fastapi import APIRouter
 from .vector_memory import count as vector_count, last_update_time
+from watchdog.processes import process_sampler
 
 
 router = APIRouter(prefix="/diagnostics", tags=["diagnostics"])
@@ -16,7 +17,7 @@ async def run_diagnostics():
         swap = psutil.swap_memory()
         disk = psutil.disk_usage("/")
         net = psutil.net_io_counters()
-        procs = len(list(psutil.process_iter()))
+        procs = len(process_sampler.snapshot())
     except Exception:
         cpu = 0.0
         mem = type("obj", (), {"percent": 0.0, "total": 0, "available": 0})()
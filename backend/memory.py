@@ -1,34 +1,74 @@
-import sqlite3
-from pathlib import Path
+from typing import List, Tuple
 
+from data.storage import memory_store
 
-DB_PATH = Path("data/memory.db")
+
+_store = memory_store
+
+
+def _fts_query(q: str) -> str:
+    # Quote each term so user input can't inject FTS syntax; prefix-match the terms
+    terms = [t.replace('"', '""') for t in q.split()]
+    return " ".join(f'"{t}"*' for t in terms if t)
 
 
 def save_interaction(prompt: str, response: str) -> None:
     """Persist an interaction to SQLite (data/memory.db)."""
-    # Ensure data directory exists
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-
-    conn = sqlite3.connect(DB_PATH.as_posix())
-    cur = conn.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS interactions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            prompt TEXT,
-            response TEXT,
-            time DATETIME DEFAULT CURRENT_TIMESTAMP
+    with _store.transaction() as conn:
+        conn.execute(
+            "INSERT INTO interactions(prompt, response) VALUES (?, ?)",
+            (prompt or "", response or ""),
+        )
+        # Keep only last 100 entries to avoid bloat
+        conn.execute(
+            "DELETE FROM interactions WHERE id NOT IN (SELECT id FROM interactions ORDER BY id DESC LIMIT 100)"
+        )
+
+
+def store_interaction(prompt: str, response: str) -> int:
+    """Insert an interaction without trimming and return its id."""
+    with _store.transaction() as conn:
+        cur = conn.execute(
+            "INSERT INTO interactions (prompt, response) VALUES (?, ?)", (prompt, response)
         )
-        """
-    )
-    cur.execute(
-        "INSERT INTO interactions(prompt, response) VALUES (?, ?)",
-        (prompt or "", response or ""),
-    )
-    # Keep only last 100 entries to avoid bloat
-    cur.execute(
-        "DELETE FROM interactions WHERE id NOT IN (SELECT id FROM interactions ORDER BY id DESC LIMIT 100)"
-    )
-    conn.commit()
-    conn.close()
\ No newline at end of file
+        return cur.lastrowid
+
+
+def replace_with_summary(summary: str) -> None:
+    """Collapse all stored interactions into a single summary row."""
+    with _store.transaction() as conn:
+        conn.execute("DELETE FROM interactions")
+        conn.execute(
+            "INSERT INTO interactions(prompt, response) VALUES (?, ?)",
+            ("memory_summary", summary),
+        )
+
+
+def recent_interactions(limit: int) -> List[Tuple[int, str, str, str]]:
+    with _store.reader() as conn:
+        return conn.execute(
+            "SELECT id, prompt, response, time FROM interactions ORDER BY id DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+
+
+def search_interactions(q: str, limit: int) -> List[Tuple[int, str, str, str]]:
+    """Keyword search over prompts and responses, best matches first (bm25)."""
+    match = _fts_query(q)
+    with _store.reader() as conn:
+        if "fts5" in _store.features and match:
+            return conn.execute(
+                """
+                SELECT i.id, i.prompt, i.response, i.time
+                FROM interactions_fts f JOIN interactions i ON i.id = f.rowid
+                WHERE interactions_fts MATCH ?
+                ORDER BY bm25(interactions_fts), i.id DESC
+                LIMIT ?
+                """,
+                (match, limit),
+            ).fetchall()
+        like = f"%{q}%"
+        return conn.execute(
+            "SELECT id, prompt, response, time FROM interactions WHERE prompt LIKE ? OR response LIKE ? ORDER BY id DESC LIMIT ?",
+            (like, like, limit),
+        ).fetchall()
\ No newline at end of file
@@ -1,68 +1,83 @@
 import os
-import sqlite3
+import threading
 import time
 import secrets
 
-# Compute absolute DB path relative to project root
-BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-DB = os.path.join(BASE_DIR, 'data', 'jessica.db')
-
-
-def _ensure_table():
-    conn = sqlite3.connect(DB)
-    try:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS tokens (
-                token TEXT PRIMARY KEY,
-                created_at INTEGER,
-                role TEXT DEFAULT 'user'
-            )
-            """
-        )
-        conn.commit()
-        # Migration: ensure role column exists
-        cur = conn.execute("PRAGMA table_info(tokens)")
-        cols = {row[1] for row in cur.fetchall()}
-        if "role" not in cols:
-            conn.execute("ALTER TABLE tokens ADD COLUMN role TEXT DEFAULT 'user'")
-            conn.commit()
-    finally:
-        conn.close()
+from data.storage import jessica_store
+
+# token -> (exists, role, expiry). Tokens can also be created or
+# revoked by other processes (scripts/make_token.ps1), so entries expire.
+CACHE_TTL_SECONDS = float(os.getenv("AUTH_TOKEN_CACHE_TTL", "60"))
+CACHE_MAX_ENTRIES = 10000
+_cache: dict[str, tuple[bool, str | None, float]] = {}
+_lock = threading.Lock()
+# Bumped by every invalidation; a lookup that raced one doesn't cache its result
+_generation = 0
+_store = jessica_store
+
+
+def init_auth_db() -> None:
+    """Open the token store; the tokens schema is created once by data.storage."""
+    _store.connection()
+
+
+def invalidate_token_cache(token: str | None = None) -> None:
+    """Drop one cached token, or the whole cache when token is None."""
+    global _generation
+    with _lock:
+        _generation += 1
+        if token is None:
+            _cache.clear()
+        else:
+            _cache.pop(token, None)
+
+
+def _lookup(token: str) -> tuple[bool, str | None]:
+    """Return (exists, role) for a token, served from the TTL cache when fresh."""
+    if not token:
+        return False, None
+    now = time.monotonic()
+    entry = _cache.get(token)
+    if entry is not None and entry[2] > now:
+        return entry[0], entry[1]
+    with _lock:
+        generation = _generation
+    with _store.reader() as conn:
+        row = conn.execute("SELECT role FROM tokens WHERE token=?", (token,)).fetchone()
+    exists, role = row is not None, (row[0] if row else None)
+    with _lock:
+        if generation != _generation:
+            # Invalidated while we read; the row may already be stale
+            return exists, role
+        # Bound memory if clients spray random invalid tokens
+        if len(_cache) >= CACHE_MAX_ENTRIES:
+            _cache.clear()
+        _cache[token] = (exists, role, now + CACHE_TTL_SECONDS)
+    return exists, role
 
 
 def validate_token(token: str) -> bool:
-    _ensure_table()
-    conn = sqlite3.connect(DB)
-    try:
-        cur = conn.execute("SELECT 1 FROM tokens WHERE token=?", (token,))
-        ok = cur.fetchone() is not None
-        return ok
-    finally:
-        conn.close()
+    return _lookup(token)[0]
 
 
 def get_token_role(token: str) -> str | None:
-    _ensure_table()
-    conn = sqlite3.connect(DB)
-    try:
-        cur = conn.execute("SELECT role FROM tokens WHERE token=?", (token,))
-        row = cur.fetchone()
-        return row[0] if row else None
-    finally:
-        conn.close()
+    return _lookup(token)[1]
 
 
 def make_token(role: str = "user") -> str:
-    _ensure_table()
     t = secrets.token_hex(32)
-    conn = sqlite3.connect(DB)
-    try:
+    with _store.transaction() as conn:
         conn.execute("INSERT INTO tokens(token, created_at, role) VALUES (?,?,?)", (t, int(time.time()), role))
-        conn.commit()
-        return t
-    finally:
-        conn.close()
+    invalidate_token_cache(t)
+    return t
+
+
+def revoke_token(token: str) -> bool:
+    """Delete a token. Returns True if it existed."""
+    with _store.transaction() as conn:
+        cur = conn.execute("DELETE FROM tokens WHERE token=?", (token,))
+    invalidate_token_cache(token)
+    return cur.rowcount > 0
 
 
 def require_role(role: str):
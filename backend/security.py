@@ -30,20 +30,19 @@ class AuthTokenMiddleware(BaseHTTPMiddleware):
             token = token.split(" ", 1)[1]
 
         role = None
+        valid = False
         if token:
             try:
-                if validate_token(token):
-                    role = get_token_role(token)
-                    request.state.token_role = role
-                else:
-                    request.state.token_role = None
+                # Both lookups are served from the in-memory token cache
+                valid = validate_token(token)
+                role = get_token_role(token) if valid else None
             except Exception:
-                request.state.token_role = None
+                valid = False
+            request.state.token_role = role
 
         # Enforce token presence if required
-        if self.require_api_token:
-            if not token or not validate_token(token):
-                return JSONResponse(status_code=401, content={"detail": "Unauthorized"})
+        if self.require_api_token and not valid:
+            return JSONResponse(status_code=401, content={"detail": "Unauthorized"})
 
         return await call_next(request)
 
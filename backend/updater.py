@@ -1,4 +1,3 @@
-import asyncio
 import subprocess
 from pathlib import Path
 
@@ -27,11 +26,3 @@ def update_jessica() -> tuple[bool, str]:
         msg = f"[AutoUpdate] git pull error: {e}"
         print(msg)
         return False, msg
-
-
-async def run_periodic_updates(interval_hours: int = 24) -> None:
-    """Periodically run update_jessica every interval_hours."""
-    seconds = max(1, int(interval_hours * 3600))
-    while True:
-        update_jessica()
-        await asyncio.sleep(seconds)
\ No newline at end of file
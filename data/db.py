@@ -1,112 +1,69 @@
-import os
 import sqlite3
-import threading
-from typing import List, Tuple
+import time
+from typing import Callable, Iterator, List, Tuple
 
+from data.storage import jessica_store
 
-DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jessica.db")
-_conn = None
-_lock = threading.Lock()
+
+_store = jessica_store
+DB_PATH = _store.path
+_lock = _store.lock
+
+
+# Hot-table sizes; older rows roll into the *_archive tables instead of being deleted
+HOT_COMMANDS = 50
+HOT_CONVERSATIONS = 200
+_MAX_ID = 2 ** 63 - 1
+_ARCHIVE_COLUMNS = {
+    "commands": "id, text, ts",
+    "conversations": "id, role, content, ts",
+}
+
+# Distinct watchdog problems kept; the least recently seen are dropped
+MAX_EVENT_GROUPS = 1000
 
 
 def _get_conn() -> sqlite3.Connection:
-    global _conn
-    if _conn is None:
-        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-        _conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-        _conn.execute("PRAGMA journal_mode=WAL;")
-        _conn.row_factory = sqlite3.Row
-    return _conn
+    return _store.connection()
 
 
-def init_db():
-    conn = _get_conn()
-    with _lock:
-        conn.executescript(
-            """
-            CREATE TABLE IF NOT EXISTS commands (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                text TEXT NOT NULL,
-                ts DATETIME DEFAULT CURRENT_TIMESTAMP
-            );
-
-            CREATE TABLE IF NOT EXISTS conversations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                role TEXT NOT NULL,
-                content TEXT NOT NULL,
-                ts DATETIME DEFAULT CURRENT_TIMESTAMP
-            );
-
-            CREATE TABLE IF NOT EXISTS patterns (
-                pattern TEXT PRIMARY KEY,
-                count INTEGER NOT NULL DEFAULT 0
-            );
-
-            CREATE TABLE IF NOT EXISTS plugins (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                enabled INTEGER NOT NULL DEFAULT 1,
-                config_json TEXT
-            );
-
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                command TEXT NOT NULL,
-                args_json TEXT,
-                interval_seconds INTEGER NOT NULL,
-                enabled INTEGER NOT NULL DEFAULT 1,
-                last_run DATETIME
-            );
-
-            CREATE TABLE IF NOT EXISTS task_results (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                task_id INTEGER NOT NULL,
-                returncode INTEGER,
-                stdout TEXT,
-                stderr TEXT,
-                ts DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY(task_id) REFERENCES tasks(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS watchdog_events (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                source TEXT NOT NULL,
-                level TEXT NOT NULL,
-                message TEXT NOT NULL,
-                metadata_json TEXT,
-                ts DATETIME DEFAULT CURRENT_TIMESTAMP
-            );
-            """
-        )
-        conn.commit()
+def _roll_to_archive(conn: sqlite3.Connection, table: str, keep: int) -> None:
+    """Move everything older than the newest `keep` rows of `table` into its archive.
 
-        # Simple migration: add schedule fields to tasks if missing
-        cur = conn.execute("PRAGMA table_info(tasks)")
-        cols = {row[1] for row in cur.fetchall()}
-        if "schedule_type" not in cols:
-            conn.execute("ALTER TABLE tasks ADD COLUMN schedule_type TEXT DEFAULT 'interval'")
-        if "cron_expr" not in cols:
-            conn.execute("ALTER TABLE tasks ADD COLUMN cron_expr TEXT")
-        if "iso_time" not in cols:
-            conn.execute("ALTER TABLE tasks ADD COLUMN iso_time TEXT")
-        conn.commit()
+    Must be called with _lock held, inside the caller's transaction.
+    """
+    row = conn.execute(f"SELECT id FROM {table} ORDER BY id DESC LIMIT 1 OFFSET ?", (keep,)).fetchone()
+    if row is None:
+        return
+    cols = _ARCHIVE_COLUMNS[table]
+    conn.execute(f"INSERT OR IGNORE INTO {table}_archive ({cols}) SELECT {cols} FROM {table} WHERE id <= ?", (row[0],))
+    conn.execute(f"DELETE FROM {table} WHERE id <= ?", (row[0],))
+
+
+def init_db():
+    # Schema and migrations live in data.storage and run once per process
+    _store.connection()
 
 
 def log_command(text: str) -> None:
     conn = _get_conn()
     with _lock:
         conn.execute("INSERT INTO commands (text) VALUES (?)", (text,))
-        # Keep only last 50
-        conn.execute(
-            "DELETE FROM commands WHERE id NOT IN (SELECT id FROM commands ORDER BY id DESC LIMIT 50)"
-        )
+        _roll_to_archive(conn, "commands", HOT_COMMANDS)
         conn.commit()
 
 
-def get_recent_commands(limit: int = 10) -> List[str]:
+def log_commands(texts: List[str]) -> None:
+    """Insert a batch of commands in one transaction (used by the ingest writer)."""
     conn = _get_conn()
     with _lock:
+        conn.executemany("INSERT INTO commands (text) VALUES (?)", [(t,) for t in texts])
+        _roll_to_archive(conn, "commands", HOT_COMMANDS)
+        conn.commit()
+
+
+def get_recent_commands(limit: int = 10) -> List[str]:
+    with _store.reader() as conn:
         cur = conn.execute(
             "SELECT text FROM commands ORDER BY id DESC LIMIT ?", (limit,)
         )
@@ -119,16 +76,12 @@ def append_conversation(role: str, content: str) -> None:
         conn.execute(
             "INSERT INTO conversations (role, content) VALUES (?, ?)", (role, content)
         )
-        # Cap history size to last 200 messages
-        conn.execute(
-            "DELETE FROM conversations WHERE id NOT IN (SELECT id FROM conversations ORDER BY id DESC LIMIT 200)"
-        )
+        _roll_to_archive(conn, "conversations", HOT_CONVERSATIONS)
         conn.commit()
 
 
 def get_recent_conversation(limit: int = 20) -> List[Tuple[str, str]]:
-    conn = _get_conn()
-    with _lock:
+    with _store.reader() as conn:
         cur = conn.execute(
             "SELECT role, content FROM conversations ORDER BY id DESC LIMIT ?",
             (limit,),
@@ -136,6 +89,58 @@ def get_recent_conversation(limit: int = 20) -> List[Tuple[str, str]]:
         return [(row[0], row[1]) for row in cur.fetchall()]
 
 
+def get_conversation_page(limit: int = 20, before_id: int | None = None) -> List[sqlite3.Row]:
+    """Newest-first messages with id < before_id, continuing into the archive tier."""
+    cursor = before_id if before_id is not None else _MAX_ID
+    with _store.reader() as conn:
+        cur = conn.execute(
+            """
+            SELECT id, role, content, ts FROM (
+                SELECT id, role, content, ts FROM conversations WHERE id < ?
+                UNION ALL
+                SELECT id, role, content, ts FROM conversations_archive WHERE id < ?
+            ) ORDER BY id DESC LIMIT ?
+            """,
+            (cursor, cursor, limit),
+        )
+        return cur.fetchall()
+
+
+def _search_archive(table: str, text_col: str, q: str | None, since: str | None, until: str | None,
+                    limit: int) -> List[sqlite3.Row]:
+    clauses, params = [], []
+    if since:
+        clauses.append("ts >= ?")
+        params.append(since)
+    if until:
+        clauses.append("ts < ?")
+        params.append(until)
+    if q:
+        clauses.append(f"{text_col} LIKE ?")
+        params.append(f"%{q}%")
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    with _store.reader() as conn:
+        cur = conn.execute(
+            f"SELECT {_ARCHIVE_COLUMNS[table]} FROM {table}_archive {where} ORDER BY ts DESC, id DESC LIMIT ?",
+            (*params, limit),
+        )
+        return cur.fetchall()
+
+
+def search_conversation_archive(
+    q: str | None = None, since: str | None = None, until: str | None = None, limit: int = 50
+) -> List[sqlite3.Row]:
+    """Search archived messages, newest first. since/until are 'YYYY-MM-DD[ HH:MM:SS]' (UTC)."""
+    return _search_archive("conversations", "content", q, since, until, limit)
+
+
+def search_command_archive(
+    q: str | None = None, since: str | None = None, until: str | None = None, limit: int = 50
+) -> List[sqlite3.Row]:
+    """Search archived commands, newest first. since/until as in search_conversation_archive."""
+    return _search_archive("commands", "text", q, since, until, limit)
+
+
 def bump_pattern(pattern: str) -> None:
     conn = _get_conn()
     with _lock:
@@ -147,8 +152,7 @@ def bump_pattern(pattern: str) -> None:
 
 
 def get_top_patterns(limit: int = 10) -> List[Tuple[str, int]]:
-    conn = _get_conn()
-    with _lock:
+    with _store.reader() as conn:
         cur = conn.execute(
             "SELECT pattern, count FROM patterns ORDER BY count DESC LIMIT ?",
             (limit,),
@@ -168,8 +172,7 @@ def add_plugin(plugin_id: str, name: str, enabled: bool = True, config_json: str
 
 
 def list_plugins() -> List[sqlite3.Row]:
-    conn = _get_conn()
-    with _lock:
+    with _store.reader() as conn:
         cur = conn.execute("SELECT id, name, enabled, config_json FROM plugins ORDER BY name ASC")
         return cur.fetchall()
 
@@ -207,11 +210,11 @@ def add_task(name: str, command: str, args_json: str | None, interval_seconds: i
         return cur.lastrowid
 
 
-def add_task_advanced(name: str, command: str, args_json: str | None, schedule_type: str, interval_seconds: int | None = None, cron_expr: str | None = None, iso_time: str | None = None, enabled: bool = True) -> int:
+def add_task_advanced(name: str, command: str, args_json: str | None, schedule_type: str, interval_seconds: int | None = None, cron_expr: str | None = None, iso_time: str | None = None, enabled: bool = True, timeout_seconds: int | None = None, concurrency_key: str | None = None) -> int:
     conn = _get_conn()
     with _lock:
         cur = conn.execute(
-            "INSERT INTO tasks (name, command, args_json, interval_seconds, enabled, schedule_type, cron_expr, iso_time) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            "INSERT INTO tasks (name, command, args_json, interval_seconds, enabled, schedule_type, cron_expr, iso_time, timeout_seconds, concurrency_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
             (
                 name,
                 command,
@@ -221,6 +224,8 @@ def add_task_advanced(name: str, command: str, args_json: str | None, schedule_t
                 schedule_type,
                 cron_expr,
                 iso_time,
+                timeout_seconds,
+                concurrency_key,
             ),
         )
         conn.commit()
@@ -228,10 +233,10 @@ def add_task_advanced(name: str, command: str, args_json: str | None, schedule_t
 
 
 def list_tasks() -> List[sqlite3.Row]:
-    conn = _get_conn()
-    with _lock:
+    with _store.reader() as conn:
         cur = conn.execute(
-            "SELECT id, name, command, args_json, interval_seconds, enabled, last_run, schedule_type, cron_expr, iso_time FROM tasks ORDER BY id ASC"
+            "SELECT id, name, command, args_json, interval_seconds, enabled, last_run, schedule_type, cron_expr, iso_time, "
+            "timeout_seconds, concurrency_key FROM tasks ORDER BY id ASC"
         )
         return cur.fetchall()
 
@@ -247,6 +252,7 @@ def delete_task(task_id: int) -> None:
     conn = _get_conn()
     with _lock:
         conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+        conn.execute("DELETE FROM task_leases WHERE task_id = ?", (task_id,))
         conn.commit()
 
 
@@ -258,35 +264,131 @@ def mark_task_run(task_id: int) -> None:
 
 
 def get_due_tasks() -> List[sqlite3.Row]:
-    conn = _get_conn()
-    with _lock:
+    with _store.reader() as conn:
         cur = conn.execute(
             """
-            SELECT id, name, command, args_json, interval_seconds, schedule_type, cron_expr, iso_time FROM tasks
-            WHERE enabled = 1
-            ORDER BY id ASC
+            SELECT t.id, t.name, t.command, t.args_json, t.interval_seconds, t.last_run, t.schedule_type,
+                   t.cron_expr, t.iso_time, t.timeout_seconds, t.concurrency_key,
+                   COALESCE(l.fence, 0) AS fence, l.claimed_at
+            FROM tasks t
+            LEFT JOIN task_leases l ON l.task_id = t.id
+            WHERE t.enabled = 1
+            ORDER BY t.id ASC
             """
         )
         return cur.fetchall()
 
 
-def log_task_result(task_id: int, returncode: int | None, stdout: str, stderr: str) -> None:
+def log_task_result(task_id: int, returncode: int | None, stdout: str, stderr: str,
+                    stdout_overflow: bytes | None = None, stderr_overflow: bytes | None = None) -> None:
     conn = _get_conn()
     with _lock:
         conn.execute(
-            "INSERT INTO task_results (task_id, returncode, stdout, stderr) VALUES (?, ?, ?, ?)",
-            (task_id, returncode, stdout, stderr),
+            "INSERT INTO task_results (task_id, returncode, stdout, stderr, stdout_overflow, stderr_overflow) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (task_id, returncode, stdout, stderr, stdout_overflow, stderr_overflow),
         )
         conn.commit()
 
 
-def get_task_results(task_id: int, limit: int = 20) -> List[sqlite3.Row]:
+def claim_task_run(task_id: int, owner: str, fence: int, ttl: float) -> int | None:
+    """Take the lease for a task's next run.
+
+    Succeeds only if nobody has claimed a run since the caller saw ``fence``
+    and no unexpired lease is held, so each run is claimed by one process.
+    Returns the new fencing token, or None if the claim lost.
+    """
+    now = time.time()
+    conn = _get_conn()
+    with _lock:
+        conn.execute("INSERT OR IGNORE INTO task_leases (task_id) VALUES (?)", (task_id,))
+        cur = conn.execute(
+            "UPDATE task_leases SET owner = ?, fence = fence + 1, claimed_at = ?, expires_at = ? "
+            "WHERE task_id = ? AND fence = ? AND expires_at <= ?",
+            (owner, now, now + ttl, task_id, fence, now),
+        )
+        conn.commit()
+        return fence + 1 if cur.rowcount else None
+
+
+def renew_task_lease(task_id: int, owner: str, fence: int, ttl: float) -> bool:
+    """Extend a held lease. False means it expired and was claimed by someone else."""
+    conn = _get_conn()
+    with _lock:
+        cur = conn.execute(
+            "UPDATE task_leases SET expires_at = ? WHERE task_id = ? AND owner = ? AND fence = ?",
+            (time.time() + ttl, task_id, owner, fence),
+        )
+        conn.commit()
+        return cur.rowcount > 0
+
+
+def get_task_lease(task_id: int) -> sqlite3.Row | None:
+    with _store.reader() as conn:
+        return conn.execute(
+            "SELECT task_id, owner, fence, claimed_at, expires_at FROM task_leases WHERE task_id = ?", (task_id,)
+        ).fetchone()
+
+
+def finish_task_run(task_id: int, owner: str, fence: int, returncode: int | None, stdout: str, stderr: str,
+                    stdout_overflow: bytes | None = None, stderr_overflow: bytes | None = None) -> bool:
+    """Record a leased run's result, mark the task run and release the lease, atomically.
+
+    Rejected (returns False) if the fencing token is stale, i.e. the lease
+    expired and another process has since claimed the task.
+    """
+    conn = _get_conn()
+    with _lock:
+        cur = conn.execute(
+            "UPDATE task_leases SET expires_at = 0 WHERE task_id = ? AND owner = ? AND fence = ?",
+            (task_id, owner, fence),
+        )
+        if not cur.rowcount:
+            conn.rollback()
+            return False
+        conn.execute(
+            "INSERT INTO task_results (task_id, returncode, stdout, stderr, stdout_overflow, stderr_overflow) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (task_id, returncode, stdout, stderr, stdout_overflow, stderr_overflow),
+        )
+        conn.execute("UPDATE tasks SET last_run = CURRENT_TIMESTAMP WHERE id = ?", (task_id,))
+        conn.commit()
+        return True
+
+
+def release_task_lease(task_id: int, owner: str, fence: int) -> bool:
+    """Expire a held lease without recording a result. False if the fence is stale."""
     conn = _get_conn()
     with _lock:
         cur = conn.execute(
-            "SELECT id, returncode, stdout, stderr, ts FROM task_results WHERE task_id = ? ORDER BY id DESC LIMIT ?",
-            (task_id, limit),
+            "UPDATE task_leases SET expires_at = 0 WHERE task_id = ? AND owner = ? AND fence = ?",
+            (task_id, owner, fence),
         )
+        conn.commit()
+        return cur.rowcount > 0
+
+
+def get_task_result_overflow(result_id: int, stream: str) -> bytes | None:
+    """zlib-compressed middle of a result's stdout/stderr that was cut from the stored text."""
+    column = {"stdout": "stdout_overflow", "stderr": "stderr_overflow"}[stream]
+    with _store.reader() as conn:
+        row = conn.execute(f"SELECT {column} FROM task_results WHERE id = ?", (result_id,)).fetchone()
+        return row[0] if row else None
+
+
+def get_task_results(task_id: int, limit: int = 20, before_id: int | None = None) -> List[sqlite3.Row]:
+    with _store.reader() as conn:
+        if before_id is None:
+            cur = conn.execute(
+                "SELECT id, returncode, stdout, stderr, ts FROM task_results WHERE task_id = ? ORDER BY id DESC LIMIT ?",
+                (task_id, limit),
+            )
+        else:
+            cur = conn.execute(
+                "SELECT id, returncode, stdout, stderr, ts FROM task_results WHERE task_id = ? AND id < ? "
+                "ORDER BY id DESC LIMIT ?",
+                (task_id, before_id, limit),
+            )
         return cur.fetchall()
 
 
@@ -304,15 +406,86 @@ def log_watchdog_event(source: str, level: str, message: str, metadata_json: str
         conn.commit()
 
 
-def list_watchdog_events(limit: int = 50) -> List[sqlite3.Row]:
+def log_watchdog_events(rows: List[tuple], groups: List[Tuple[str, str, str, str, int]] = ()) -> None:
+    """Insert a batch of events and bump their groups in one transaction.
+
+    rows are (source, level, message, metadata_json[, fingerprint]); groups
+    are (fingerprint, source, level, message, count) occurrences to add,
+    whether or not an event row was written for them.
+    """
     conn = _get_conn()
     with _lock:
+        conn.executemany(
+            "INSERT INTO watchdog_events (source, level, message, metadata_json, fingerprint) VALUES (?, ?, ?, ?, ?)",
+            (row if len(row) == 5 else (*row, None) for row in rows),
+        )
+        conn.executemany(
+            """
+            INSERT INTO watchdog_event_groups (fingerprint, source, level, message, count)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(fingerprint) DO UPDATE SET
+                level = excluded.level,
+                message = excluded.message,
+                count = count + excluded.count,
+                last_seen = CURRENT_TIMESTAMP
+            """,
+            groups,
+        )
+        if groups:
+            conn.execute(
+                "DELETE FROM watchdog_event_groups WHERE fingerprint NOT IN "
+                "(SELECT fingerprint FROM watchdog_event_groups ORDER BY last_seen DESC LIMIT ?)",
+                (MAX_EVENT_GROUPS,),
+            )
+        conn.execute(
+            "DELETE FROM watchdog_events WHERE id NOT IN (SELECT id FROM watchdog_events ORDER BY id DESC LIMIT 500)"
+        )
+        conn.commit()
+
+
+def list_watchdog_events(limit: int = 50, before_id: int | None = None, source: str | None = None) -> List[sqlite3.Row]:
+    clauses, params = [], []
+    if source:
+        clauses.append("source = ?")
+        params.append(source)
+    if before_id is not None:
+        clauses.append("id < ?")
+        params.append(before_id)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    with _store.reader() as conn:
         cur = conn.execute(
-            "SELECT id, source, level, message, metadata_json, ts FROM watchdog_events ORDER BY id DESC LIMIT ?",
-            (limit,),
+            f"SELECT id, source, level, message, metadata_json, ts, fingerprint FROM watchdog_events {where} "
+            f"ORDER BY id DESC LIMIT ?",
+            (*params, limit),
+        )
+        return cur.fetchall()
+
+
+def list_watchdog_event_groups(limit: int = 50, source: str | None = None) -> List[sqlite3.Row]:
+    """Distinct problems, most recently seen first."""
+    where, params = ("WHERE source = ?", (source,)) if source else ("", ())
+    with _store.reader() as conn:
+        cur = conn.execute(
+            f"SELECT fingerprint, source, level, message, count, first_seen, last_seen FROM watchdog_event_groups "
+            f"{where} ORDER BY last_seen DESC LIMIT ?",
+            (*params, limit),
         )
         return cur.fetchall()
 
 
+def iter_keyset(fetch_page: Callable[[int, int | None], List[sqlite3.Row]], page_size: int = 500) -> Iterator[sqlite3.Row]:
+    """Yield every row of a newest-first keyset query, one page at a time.
+
+    fetch_page(limit, before_id) must return rows ordered by id DESC.
+    """
+    before_id = None
+    while True:
+        rows = fetch_page(page_size, before_id)
+        yield from rows
+        if len(rows) < page_size:
+            return
+        before_id = rows[-1]["id"]
+
+
 # Initialize on import
 init_db()
\ No newline at end of file
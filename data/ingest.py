@@ -0,0 +1,222 @@
+import hashlib
+import json
+import queue
+import re
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from data import db
+
+
+# Queue item kinds
+WATCHDOG_EVENT = "watchdog_event"
+COMMAND = "command"
+
+# Volatile parts of messages that shouldn't split one problem into many
+_NORMALIZE = [
+    (re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.I), "<uuid>"),
+    (re.compile(r"0x[0-9a-f]+", re.I), "0x#"),
+    (re.compile(r"\d+"), "#"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+class IngestQueue:
+    """Bounded in-memory queue drained by a single writer thread.
+
+    Producers (watchdog, devtools, system watcher, command logging) enqueue
+    without touching SQLite; the writer groups pending items into batches and
+    inserts each batch with ``executemany`` in one transaction.
+
+    Policy when producers outrun the writer:
+    - watchdog events are fingerprinted by source and normalized message;
+      repeats of a fingerprint within ``dedup_window`` seconds only bump its
+      counter in watchdog_event_groups, and the next row written for it
+      carries a ``repeats`` count in its metadata;
+    - once the queue is full new items are dropped and counted, and the writer
+      records one summary warning event for the dropped items.
+    """
+
+    def __init__(self, maxsize: int = 10000, batch_size: int = 500, flush_interval: float = 0.25,
+                 dedup_window: float = 60.0):
+        self._queue: "queue.Queue[Tuple[str, tuple]]" = queue.Queue(maxsize=maxsize)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._dedup_window = dedup_window
+        # fingerprint -> [time its last row was written, repeats suppressed since]
+        self._windows: Dict[str, List[float]] = {}
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._dropped = 0
+        self._dropped_pending = 0
+        self._written = 0
+        self._coalesced = 0
+        self._batches = 0
+
+    def start(self):
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="ingest-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the writer after draining everything already queued."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def put(self, kind: str, row: tuple) -> bool:
+        """Enqueue a row without blocking. Returns False if it was dropped."""
+        if not (self._thread and self._thread.is_alive()):
+            self.start()
+        try:
+            self._queue.put_nowait((kind, row))
+            return True
+        except queue.Full:
+            self._dropped += 1
+            self._dropped_pending += 1
+            return False
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Block until everything queued so far is written (or timeout)."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self._queue.unfinished_tasks == 0:
+                return True
+            time.sleep(0.01)
+        return self._queue.unfinished_tasks == 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "maxsize": self._queue.maxsize,
+            "written": self._written,
+            "coalesced": self._coalesced,
+            "dropped": self._dropped,
+            "batches": self._batches,
+        }
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception:
+                    # Keep the writer alive; a failed batch is lost
+                    pass
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+            elif self._stop.is_set() and self._queue.empty():
+                break
+
+    def _next_batch(self) -> List[Tuple[str, tuple]]:
+        try:
+            first = self._queue.get(timeout=self._flush_interval)
+        except queue.Empty:
+            return []
+        batch = [first]
+        # Give a burst a short window to accumulate before writing
+        deadline = time.time() + self._flush_interval
+        while len(batch) < self._batch_size:
+            remaining = deadline - time.time()
+            try:
+                if remaining > 0 and not self._stop.is_set():
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Tuple[str, tuple]]):
+        raw = [row for kind, row in batch if kind == WATCHDOG_EVENT]
+        commands = [row for kind, row in batch if kind == COMMAND]
+
+        if self._dropped_pending:
+            dropped, self._dropped_pending = self._dropped_pending, 0
+            raw.append((
+                "ingest",
+                "warning",
+                f"Dropped {dropped} events (ingest queue full)",
+                json.dumps({"dropped": dropped}),
+            ))
+
+        events, groups = self._aggregate(raw)
+        self._coalesced += len(raw) - len(events)
+        if events or groups:
+            db.log_watchdog_events(events, groups)
+        if commands:
+            db.log_commands([c[0] for c in commands])
+        self._written += len(events) + len(commands)
+        self._batches += 1
+
+    def _aggregate(self, rows: List[tuple]) -> Tuple[List[tuple], List[tuple]]:
+        """Split a batch into event rows to write and per-fingerprint counter bumps."""
+        now = time.time()
+        if len(self._windows) > 10000:
+            self._windows = {fp: w for fp, w in self._windows.items() if now - w[0] < self._dedup_window}
+        by_fp: Dict[str, List[Any]] = {}
+        for row in rows:
+            fp = event_fingerprint(row[0], row[2])
+            entry = by_fp.get(fp)
+            if entry is None:
+                by_fp[fp] = [row, 1, row]
+            else:
+                entry[1] += 1
+                entry[2] = row
+        events, groups = [], []
+        for fp, (first, n, last) in by_fp.items():
+            source, level, message, _ = last
+            groups.append((fp, source, level, message, n))
+            window = self._windows.get(fp)
+            if window is not None and now - window[0] < self._dedup_window:
+                window[1] += n
+                continue
+            repeats = n + (int(window[1]) if window else 0)
+            self._windows[fp] = [now, 0]
+            source, level, message, metadata_json = first
+            if repeats > 1:
+                metadata_json = _with_repeats(metadata_json, repeats)
+            events.append((source, level, message, metadata_json, fp))
+        return events, groups
+
+
+def normalize_message(message: str) -> str:
+    """Message with ids, addresses and numbers masked, for fingerprinting."""
+    for pattern, repl in _NORMALIZE:
+        message = pattern.sub(repl, message)
+    return message.strip()
+
+
+def event_fingerprint(source: str, message: str) -> str:
+    return hashlib.sha1(f"{source}\0{normalize_message(message)}".encode("utf-8", "replace")).hexdigest()[:16]
+
+
+def _with_repeats(metadata_json: str | None, repeats: int) -> str:
+    meta: Dict[str, Any] = {}
+    if metadata_json:
+        try:
+            parsed = json.loads(metadata_json)
+            meta = parsed if isinstance(parsed, dict) else {"metadata": parsed}
+        except Exception:
+            meta = {"metadata": metadata_json}
+    meta["repeats"] = repeats
+    return json.dumps(meta)
+
+
+ingest_queue = IngestQueue()
+
+
+def enqueue_watchdog_event(source: str, level: str, message: str, metadata_json: str | None = None) -> bool:
+    return ingest_queue.put(WATCHDOG_EVENT, (source, level, message, metadata_json))
+
+
+def enqueue_command(text: str) -> bool:
+    return ingest_queue.put(COMMAND, (text,))
@@ -0,0 +1,278 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator
+
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class SQLiteStore:
+    """Shared connections to one SQLite file.
+
+    - one writer connection, serialized by ``lock``; callers commit explicitly;
+    - a small pool of reader connections that WAL lets run alongside the writer;
+    - schema/migrations run once when the writer is first opened, never per request.
+
+    Connections keep sqlite3's prepared-statement cache, so repeated queries are
+    compiled once per connection rather than on every call.
+    """
+
+    def __init__(self, path: str, init: Callable[[sqlite3.Connection], Iterable[str] | None] | None = None,
+                 readers: int = 4):
+        self.path = path
+        self.lock = threading.Lock()
+        self.features: set[str] = set()
+        self._init = init
+        self._open_lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=readers)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Return the shared writer connection, opening it and the schema on first use."""
+        if self._conn is None:
+            with self._open_lock:
+                if self._conn is None:
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    conn = self._connect()
+                    if self._init is not None:
+                        self.features = set(self._init(conn) or ())
+                        conn.commit()
+                    self._conn = conn
+        return self._conn
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled read connection."""
+        self.connection()
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            try:
+                self._readers.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements on the writer connection and commit them together."""
+        conn = self.connection()
+        with self.lock:
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def close(self) -> None:
+        with self._open_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            while True:
+                try:
+                    self._readers.get_nowait().close()
+                except queue.Empty:
+                    break
+
+
+def _add_missing_columns(conn: sqlite3.Connection, table: str, columns: dict[str, str]) -> None:
+    cols = {row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+    for name, ddl in columns.items():
+        if name not in cols:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+
+
+def init_jessica_schema(conn: sqlite3.Connection) -> None:
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS commands (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            text TEXT NOT NULL,
+            ts DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS conversations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            ts DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS patterns (
+            pattern TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS plugins (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            enabled INTEGER NOT NULL DEFAULT 1,
+            config_json TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            command TEXT NOT NULL,
+            args_json TEXT,
+            interval_seconds INTEGER NOT NULL,
+            enabled INTEGER NOT NULL DEFAULT 1,
+            last_run DATETIME
+        );
+
+        CREATE TABLE IF NOT EXISTS task_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id INTEGER NOT NULL,
+            returncode INTEGER,
+            stdout TEXT,
+            stderr TEXT,
+            ts DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(task_id) REFERENCES tasks(id) ON DELETE CASCADE
+        );
+
+        CREATE TABLE IF NOT EXISTS watchdog_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source TEXT NOT NULL,
+            level TEXT NOT NULL,
+            message TEXT NOT NULL,
+            metadata_json TEXT,
+            ts DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS tokens (
+            token TEXT PRIMARY KEY,
+            created_at INTEGER,
+            role TEXT DEFAULT 'user'
+        );
+
+        -- Repeated watchdog events aggregated by fingerprint (see data.ingest)
+        CREATE TABLE IF NOT EXISTS watchdog_event_groups (
+            fingerprint TEXT PRIMARY KEY,
+            source TEXT NOT NULL,
+            level TEXT NOT NULL,
+            message TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            first_seen DATETIME DEFAULT CURRENT_TIMESTAMP,
+            last_seen DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_watchdog_event_groups_last_seen ON watchdog_event_groups(last_seen);
+
+        -- One row per task: who holds the current run and its fencing token
+        CREATE TABLE IF NOT EXISTS task_leases (
+            task_id INTEGER PRIMARY KEY,
+            owner TEXT,
+            fence INTEGER NOT NULL DEFAULT 0,
+            claimed_at REAL,
+            expires_at REAL NOT NULL DEFAULT 0
+        );
+
+        -- Cold tier for rows rolled out of the capped hot tables (see data.db)
+        CREATE TABLE IF NOT EXISTS commands_archive (
+            id INTEGER PRIMARY KEY,
+            text TEXT NOT NULL,
+            ts DATETIME
+        );
+
+        CREATE TABLE IF NOT EXISTS conversations_archive (
+            id INTEGER PRIMARY KEY,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            ts DATETIME
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_commands_archive_ts ON commands_archive(ts);
+        CREATE INDEX IF NOT EXISTS idx_conversations_archive_ts ON conversations_archive(ts);
+
+        -- Keyset pagination: filter by task/source, walk backwards by id
+        CREATE INDEX IF NOT EXISTS idx_task_results_task ON task_results(task_id, id);
+        CREATE INDEX IF NOT EXISTS idx_watchdog_events_source ON watchdog_events(source, id);
+        """
+    )
+    # Simple migrations for databases created by older versions
+    _add_missing_columns(conn, "tasks", {
+        "schedule_type": "TEXT DEFAULT 'interval'",
+        "cron_expr": "TEXT",
+        "iso_time": "TEXT",
+        "timeout_seconds": "INTEGER",
+        "concurrency_key": "TEXT",
+    })
+    # Compressed middle of oversized task output (see scheduler.output)
+    _add_missing_columns(conn, "task_results", {
+        "stdout_overflow": "BLOB",
+        "stderr_overflow": "BLOB",
+    })
+    _add_missing_columns(conn, "watchdog_events", {"fingerprint": "TEXT"})
+    _add_missing_columns(conn, "tokens", {"role": "TEXT DEFAULT 'user'"})
+
+
+def init_memory_schema(conn: sqlite3.Connection) -> set[str]:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS interactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            prompt TEXT,
+            response TEXT,
+            time DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    try:
+        # External-content FTS index kept in sync by triggers
+        conn.executescript(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS interactions_fts USING fts5(
+                prompt, response, content='interactions', content_rowid='id'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS interactions_ai AFTER INSERT ON interactions BEGIN
+                INSERT INTO interactions_fts(rowid, prompt, response)
+                VALUES (new.id, new.prompt, new.response);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS interactions_ad AFTER DELETE ON interactions BEGIN
+                INSERT INTO interactions_fts(interactions_fts, rowid, prompt, response)
+                VALUES ('delete', old.id, old.prompt, old.response);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS interactions_au AFTER UPDATE ON interactions BEGIN
+                INSERT INTO interactions_fts(interactions_fts, rowid, prompt, response)
+                VALUES ('delete', old.id, old.prompt, old.response);
+                INSERT INTO interactions_fts(rowid, prompt, response)
+                VALUES (new.id, new.prompt, new.response);
+            END;
+            """
+        )
+        # Backfill rows written before the index existed
+        indexed = conn.execute("SELECT COUNT(*) FROM interactions_fts_docsize").fetchone()[0]
+        total = conn.execute("SELECT COUNT(*) FROM interactions").fetchone()[0]
+        if indexed != total:
+            conn.execute("INSERT INTO interactions_fts(interactions_fts) VALUES ('rebuild')")
+        return {"fts5"}
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5; search falls back to LIKE
+        return set()
+
+
+# Commands, conversations, plugins, tasks, watchdog events and API tokens
+jessica_store = SQLiteStore(os.path.join(DATA_DIR, "jessica.db"), init=init_jessica_schema)
+# Prompt/response interaction memory used by the backend app
+memory_store = SQLiteStore(os.path.join(DATA_DIR, "memory.db"), init=init_memory_schema)
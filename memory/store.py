@@ -1,23 +1,26 @@
 from typing import List, Tuple
 
 from data.db import (
-    log_command,
     get_recent_commands,
     append_conversation,
     get_recent_conversation,
     bump_pattern,
     get_top_patterns,
+    search_conversation_archive,
 )
+from data.ingest import enqueue_command
 
 
 class MemoryStore:
     """Persistent memory store backed by SQLite.
 
-    Keeps recent commands, conversation history, and simple pattern counts.
+    Keeps recent commands, conversation history (older messages are archived,
+    not dropped), and simple pattern counts.
     """
 
     def log_command(self, text: str) -> None:
-        log_command(text)
+        # Written asynchronously in batches by the ingest writer
+        enqueue_command(text)
 
     def recent_commands(self, limit: int = 10) -> List[str]:
         return get_recent_commands(limit)
@@ -28,6 +31,12 @@ class MemoryStore:
     def recent_history(self, limit: int = 20) -> List[Tuple[str, str]]:
         return get_recent_conversation(limit)
 
+    def search_archive(self, q: str | None = None, since: str | None = None, until: str | None = None,
+                       limit: int = 50) -> List[Tuple[str, str, str]]:
+        """Search messages that rolled out of the recent history window."""
+        rows = search_conversation_archive(q, since, until, limit)
+        return [(r["role"], r["content"], r["ts"]) for r in rows]
+
     def bump_pattern(self, pattern: str) -> None:
         bump_pattern(pattern)
 
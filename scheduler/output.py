@@ -0,0 +1,208 @@
+import asyncio
+import codecs
+import os
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+# Characters kept verbatim from the start and end of each stream
+HEAD_CHARS = 32 * 1024
+TAIL_CHARS = 32 * 1024
+# Raw characters from the middle that go into the compressed overflow blob;
+# anything beyond this is only counted
+OVERFLOW_CHARS = 8 * 1024 * 1024
+# Seconds a finished run's output stays tailable once a newer run of any task starts
+OUTPUT_GRACE = 600.0
+
+
+class StreamCapture:
+    """Bounded capture of one output stream: head + tail ring + compressed middle."""
+
+    def __init__(self, head_chars: int = HEAD_CHARS, tail_chars: int = TAIL_CHARS,
+                 overflow_chars: int = OVERFLOW_CHARS):
+        self._head_chars = head_chars
+        self._tail_chars = tail_chars
+        self._overflow_chars = overflow_chars
+        self._head: List[str] = []
+        self._head_len = 0
+        self._tail: deque[str] = deque()
+        self._tail_len = 0
+        self._compressor = zlib.compressobj(6)
+        self._overflow: List[bytes] = []
+        self._overflow_len = 0
+        self.dropped = 0
+        self.total = 0
+
+    def write(self, text: str) -> None:
+        if not text:
+            return
+        self.total += len(text)
+        room = self._head_chars - self._head_len
+        if room > 0:
+            self._head.append(text[:room])
+            self._head_len += min(room, len(text))
+            text = text[room:]
+            if not text:
+                return
+        self._tail.append(text)
+        self._tail_len += len(text)
+        while self._tail_len > self._tail_chars:
+            first = self._tail[0]
+            excess = self._tail_len - self._tail_chars
+            if len(first) <= excess:
+                self._tail.popleft()
+                self._tail_len -= len(first)
+                self._spill(first)
+            else:
+                self._tail[0] = first[excess:]
+                self._tail_len -= excess
+                self._spill(first[:excess])
+
+    def _spill(self, text: str) -> None:
+        room = self._overflow_chars - self._overflow_len
+        if room <= 0:
+            self.dropped += len(text)
+            return
+        kept = text[:room]
+        self.dropped += len(text) - len(kept)
+        self._overflow_len += len(kept)
+        self._overflow.append(self._compressor.compress(kept.encode("utf-8", "replace")))
+
+    def tail(self, chars: int) -> str:
+        text = "".join(self._tail)
+        if len(text) >= chars or self._overflow_len or self.dropped:
+            return text[-chars:]
+        return ("".join(self._head) + text)[-chars:]
+
+    def text(self) -> str:
+        """Head and tail, with a marker for what was moved out of the middle."""
+        omitted = self._overflow_len + self.dropped
+        head = "".join(self._head)
+        tail = "".join(self._tail)
+        if not omitted:
+            return head + tail
+        return f"{head}\n... [{omitted} chars omitted, see overflow] ...\n{tail}"
+
+    def overflow_blob(self) -> Optional[bytes]:
+        """zlib-compressed middle of the stream, or None if nothing overflowed."""
+        if not self._overflow_len:
+            return None
+        return b"".join(self._overflow) + self._compressor.copy().flush()
+
+
+class TaskOutput:
+    """Live output of one task run: bounded captures plus tail subscribers.
+
+    Subscribers are (event loop, asyncio.Queue) pairs; chunks are handed to the
+    loop thread-safely and dropped for consumers that fall behind.
+    """
+
+    def __init__(self, task_id: int):
+        self.task_id = task_id
+        self.streams = {"stdout": StreamCapture(), "stderr": StreamCapture()}
+        self.done = False
+        self.finished_at: Optional[float] = None
+        self.returncode: Optional[int] = None
+        self._lock = threading.Lock()
+        self._subscribers: List[Tuple[Any, Any]] = []
+
+    def write(self, stream: str, text: str) -> None:
+        with self._lock:
+            self.streams[stream].write(text)
+            subscribers = list(self._subscribers)
+        self._publish(subscribers, {"type": stream, "data": text})
+
+    def finish(self, returncode: Optional[int]) -> None:
+        with self._lock:
+            self.done = True
+            self.finished_at = time.time()
+            self.returncode = returncode
+            subscribers = list(self._subscribers)
+        self._publish(subscribers, {"type": "end", "returncode": returncode})
+
+    def subscribe(self, loop, queue, backlog_chars: int = 4096) -> List[Dict[str, Any]]:
+        """Register a subscriber and return the backlog it should replay first."""
+        with self._lock:
+            backlog = [
+                {"type": name, "data": cap.tail(backlog_chars)}
+                for name, cap in self.streams.items() if cap.total
+            ]
+            if self.done:
+                backlog.append({"type": "end", "returncode": self.returncode})
+            else:
+                self._subscribers.append((loop, queue))
+        return backlog
+
+    def unsubscribe(self, queue) -> None:
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s[1] is not queue]
+
+    @staticmethod
+    def _publish(subscribers, event) -> None:
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:
+                pass  # loop closed
+
+
+def _offer(queue, event) -> None:
+    # Runs on the subscriber's loop; chunks may be dropped, but "end" must arrive
+    # or the tail never closes
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        if event["type"] != "end":
+            return
+        try:
+            queue.get_nowait()
+            queue.put_nowait(event)
+        except Exception:
+            pass
+    except Exception:
+        pass
+
+
+def pump(fd: int, output: TaskOutput, stream: str) -> None:
+    """Read a pipe until EOF, feeding decoded chunks into output as they arrive."""
+    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+    while True:
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            break
+        text = decoder.decode(chunk)
+        if text:
+            output.write(stream, text)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        output.write(stream, tail)
+
+
+_live: Dict[int, TaskOutput] = {}
+_live_lock = threading.Lock()
+
+
+def start_output(task_id: int) -> TaskOutput:
+    """Create the live output for a new run; it replaces the task's previous run.
+
+    Outputs of runs that finished more than OUTPUT_GRACE seconds ago are dropped here.
+    """
+    out = TaskOutput(task_id)
+    cutoff = time.time() - OUTPUT_GRACE
+    with _live_lock:
+        for tid in [t for t, o in _live.items() if o.finished_at is not None and o.finished_at < cutoff]:
+            del _live[tid]
+        _live[task_id] = out
+    return out
+
+
+def live_output(task_id: int) -> Optional[TaskOutput]:
+    with _live_lock:
+        return _live.get(task_id)
+
+
+def forget_output(task_id: int) -> None:
+    with _live_lock:
+        _live.pop(task_id, None)
@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -18,10 +19,12 @@ from src.api.routes.browser import router as browser_router
 from src.api.routes.search import router as search_router
 from src.api.routes.ws_terminal import router as ws_terminal_router
 from src.scheduler.worker import worker_singleton
+from src.backend.log_stream import router as log_router, publish_log_event, bind_loop
 from src.api.security import RateLimitMiddleware, ApiTokenMiddleware
 from src.api.routes.voice import router as voice_router
 from src.api.routes.watchdog import router as watchdog_router
 from src.watchdog.worker import watchdog_singleton
+from data.ingest import ingest_queue
 
 
 settings = Settings()
@@ -59,6 +62,7 @@ app.include_router(search_router, prefix="/search")
 app.include_router(ws_terminal_router)
 app.include_router(voice_router)
 app.include_router(watchdog_router)
+app.include_router(log_router)
 
 
 @app.get("/health")
@@ -67,8 +71,12 @@ def root_health():
 
 
 @app.on_event("startup")
-def _start_worker():
+async def _start_worker():
     try:
+        # Per-run scheduler timings go to the live log stream; runs finish on
+        # pool threads, so events are handed over to this loop
+        bind_loop(asyncio.get_running_loop())
+        worker_singleton.set_publisher(publish_log_event)
         worker_singleton.start()
     except Exception:
         # In production, log error; keep app running
@@ -90,6 +98,11 @@ def _stop_worker():
         watchdog_singleton.stop()
     except Exception:
         pass
+    try:
+        # Drain buffered watchdog events/commands before exit
+        ingest_queue.stop()
+    except Exception:
+        pass
 
 # Security middlewares
 app.add_middleware(RateLimitMiddleware, settings=settings)
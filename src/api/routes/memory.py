@@ -1,5 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
+from data import db
 from memory.store import MemoryStore
+from src.api.streaming import ndjson_response
 
 
 router = APIRouter()
@@ -11,9 +13,29 @@ def recent_commands(limit: int = 10):
     return {"commands": memory.recent_commands(limit)}
 
 
+def _message_item(r):
+    return {"id": r["id"], "role": r["role"], "content": r["content"], "ts": r["ts"]}
+
+
 @router.get("/history")
-def recent_history(limit: int = 20):
-    return {"history": memory.recent_history(limit)}
+def recent_history(limit: int = Query(default=20, ge=1, le=500), before_id: int | None = None):
+    """Newest-first history; pass next_before_id back as before_id to page into older messages."""
+    rows = db.get_conversation_page(limit, before_id)
+    return {
+        "history": [(r["role"], r["content"]) for r in rows],
+        "next_before_id": rows[-1]["id"] if len(rows) == limit else None,
+    }
+
+
+@router.get("/history/export")
+def export_history():
+    """Stream the whole history (hot and archived) as NDJSON, newest first."""
+    return ndjson_response(db.iter_keyset(db.get_conversation_page), _message_item, "history.ndjson")
+
+
+@router.get("/archive")
+def archived_history(q: str | None = None, since: str | None = None, until: str | None = None, limit: int = 50):
+    return {"history": memory.search_archive(q, since, until, limit)}
 
 
 @router.get("/patterns")
@@ -1,8 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 
 from src.watchdog.worker import watchdog_singleton
-from data.db import list_watchdog_events
-from src.watchdog.actions import suggest_actions_for_events
+from data.db import list_watchdog_events, list_watchdog_event_groups, iter_keyset
+from src.api.streaming import ndjson_response
+from src.watchdog.actions import reload_rules, suggest_actions_for_events
 
 router = APIRouter(prefix="/watchdog", tags=["watchdog"])
 
@@ -12,31 +13,62 @@ def status():
     return {"status": "ok", "snapshot": watchdog_singleton.snapshot()}
 
 
+def _event_item(r):
+    return {
+        "id": r[0],
+        "source": r[1],
+        "level": r[2],
+        "message": r[3],
+        "metadata_json": r[4],
+        "ts": r[5],
+        "fingerprint": r[6],
+    }
+
+
 @router.get("/events")
-def events(limit: int = 50):
-    rows = list_watchdog_events(limit)
-    events = [
-        {
-            "id": r[0],
-            "source": r[1],
-            "level": r[2],
-            "message": r[3],
-            "metadata_json": r[4],
-            "ts": r[5],
-        }
-        for r in rows
-    ]
+def events(limit: int = Query(default=50, ge=1, le=500), before_id: int | None = None, source: str | None = None):
+    rows = list_watchdog_events(limit, before_id, source)
     return {
         "status": "ok",
-        "events": events,
+        "events": [_event_item(r) for r in rows],
+        "next_before_id": rows[-1][0] if len(rows) == limit else None,
+    }
+
+
+@router.get("/events/export")
+def export_events(source: str | None = None):
+    """Stream stored events as NDJSON, newest first."""
+    rows = iter_keyset(lambda limit, before_id: list_watchdog_events(limit, before_id, source))
+    return ndjson_response(rows, _event_item, "watchdog-events.ndjson")
+
+
+def _group_item(r):
+    return {
+        "fingerprint": r["fingerprint"],
+        "source": r["source"],
+        "level": r["level"],
+        "message": r["message"],
+        "count": r["count"],
+        "first_seen": r["first_seen"],
+        "last_seen": r["last_seen"],
     }
 
 
+@router.get("/groups")
+def groups(limit: int = Query(default=50, ge=1, le=500), source: str | None = None):
+    """Distinct problems (events aggregated by fingerprint), most recently seen first."""
+    return {"status": "ok", "groups": [_group_item(r) for r in list_watchdog_event_groups(limit, source)]}
+
+
 @router.get("/suggest")
 def suggest(limit: int = 50):
-    rows = list_watchdog_events(limit)
-    events = [
-        {"source": r[1], "level": r[2], "message": r[3]} for r in rows
-    ]
+    # One entry per distinct problem, however often it repeated
+    events = [_group_item(r) for r in list_watchdog_event_groups(limit)]
     suggestions = suggest_actions_for_events(events)
-    return {"status": "ok", "suggestions": suggestions}
\ No newline at end of file
+    return {"status": "ok", "suggestions": suggestions}
+
+
+@router.post("/rules/reload")
+def rules_reload():
+    """Re-read the suggestion rule packs (watchdog/rules, WATCHDOG_RULES_DIR)."""
+    return {"status": "ok", "rules": reload_rules()}
@@ -2,17 +2,16 @@ from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import os
-import asyncio
 from contextlib import asynccontextmanager
-from .routes.auth import validate_token
+from .routes.auth import validate_token, init_auth_db
 from .ai_core import jessica_core
 from .speak import speak
 from .memory import save_interaction
 from .vector_routes import router as vector_router
 from .vector_memory import search as vector_search, store_interaction as vector_store
 from src.configs.settings import settings
-from .updater import run_periodic_updates, update_jessica
-from .cron import run_cron
+from .updater import update_jessica
+from .cron import cron_registry
 from .voice_loop import start_background_listener
 from .voice.listener import start as start_voice_listener, stop as stop_voice_listener
 import yaml
@@ -20,7 +19,7 @@ from .system_watcher import start as start_watcher, stop as stop_watcher, router
 from .memory_routes import router as memory_router
 from .log_stream import router as log_router, publish_log_event
 from .config_routes import router as config_router
-from .knowledge_fetcher import run_knowledge_updates
+from .knowledge_fetcher import perform_update as update_knowledge
 from .diagnostics_routes import router as diagnostics_router
 from .dashboard_routes import router as dashboard_router
 from .performance_routes import router as performance_router
@@ -33,6 +32,7 @@ from .memory_summary_routes import router as memory_summary_router
 from .security import SupabaseAuthMiddleware
 from .routes.auth_status import router as auth_status_router
 from .status_routes import router as status_router
+from data.ingest import ingest_queue
 import time
 
 
@@ -43,18 +43,26 @@ async def lifespan(app: FastAPI):
     app.state.cron_update_enabled = settings.enable_cron_update
     app.state.cron_update_expression = settings.cron_update_expression
     app.state.start_time = time.time()
+    # Token store schema is set up once here, not per auth check
+    try:
+        init_auth_db()
+    except Exception:
+        pass
 
     # --- Startup ---
-    # Launch auto updater in the background if enabled
+    # Periodic jobs share one timer (backend.cron)
     if settings.enable_auto_update:
-        app.state.update_task = asyncio.create_task(
-            run_periodic_updates(settings.auto_update_interval_hours)
+        cron_registry.add(
+            "auto_update", update_jessica, every=max(1, settings.auto_update_interval_hours * 3600),
+            run_immediately=True,
         )
     # Or use cron schedule if enabled
     if settings.enable_cron_update:
-        app.state.update_cron_task = asyncio.create_task(
-            run_cron(update_jessica, settings.cron_update_expression)
-        )
+        try:
+            cron_registry.add("cron_update", update_jessica, cron_expr=settings.cron_update_expression,
+                              misfire="catch_up")
+        except ValueError as e:
+            print(f"[Cron] cron_update not scheduled: {e}")
     # Voice wake-word listener
     if settings.enable_voice_mode:
         try:
@@ -83,24 +91,21 @@ async def lifespan(app: FastAPI):
         pass
     # Knowledge auto-updates
     if settings.enable_knowledge_auto_update:
-        try:
-            app.state.knowledge_task = asyncio.create_task(
-                run_knowledge_updates(settings.knowledge_auto_update_interval_hours)
-            )
-        except Exception:
-            pass
+        cron_registry.add(
+            "knowledge_update", update_knowledge,
+            every=max(1, settings.knowledge_auto_update_interval_hours * 3600), run_immediately=True,
+        )
+    cron_registry.start()
 
     # Yield to run application
     try:
         yield
     finally:
         # --- Shutdown ---
-        task = getattr(app.state, "update_task", None)
-        if task:
-            task.cancel()
-        cron_task = getattr(app.state, "update_cron_task", None)
-        if cron_task:
-            cron_task.cancel()
+        try:
+            await cron_registry.stop()
+        except Exception:
+            pass
         # Stop voice listener
         try:
             stop_voice_listener()
@@ -110,11 +115,8 @@ async def lifespan(app: FastAPI):
             stop_watcher(app)
         except Exception:
             pass
-        # Stop knowledge updater
         try:
-            kt = getattr(app.state, "knowledge_task", None)
-            if kt:
-                kt.cancel()
+            ingest_queue.stop()
         except Exception:
             pass
 
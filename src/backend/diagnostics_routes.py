@@ -1,7 +1,10 @@
 import psutil
 import time
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, HTTPException
 from .vector_memory import count as vector_count, last_update_time
+from src.watchdog.processes import process_sampler
+from src.pipeline.history import ProbeHistory
 
 
 router = APIRouter(prefix="/diagnostics", tags=["diagnostics"])
@@ -16,7 +19,7 @@ async def run_diagnostics():
         swap = psutil.swap_memory()
         disk = psutil.disk_usage("/")
         net = psutil.net_io_counters()
-        procs = len(list(psutil.process_iter()))
+        procs = len(process_sampler.snapshot())
     except Exception:
         cpu = 0.0
         mem = type("obj", (), {"percent": 0.0, "total": 0, "available": 0})()
@@ -53,4 +56,18 @@ async def run_diagnostics():
         "vector_memory_count": vm_count,
         "knowledge_last_update": last_know,
         "anomalies": anomalies,
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/probes")
+async def probe_history(name: Optional[str] = None, resolution: str = "1m",
+                        since: Optional[float] = None, limit: int = 500):
+    """Probe trends from the desktop app's saved history; one probe's series when name is given."""
+    history = ProbeHistory().load()
+    if name is None:
+        return {"probes": history.summary()}
+    try:
+        points = history.query(name, resolution, since, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"name": name, "resolution": resolution, "points": points}
@@ -1,4 +1,3 @@
-import asyncio
 import time
 from typing import List
 import requests
@@ -64,12 +63,3 @@ async def perform_update(queries: List[str] | None = None):
             store_interaction(prompt=f"[knowledge] {q}", response=summary, tags=["knowledge", tag])  # type: ignore
         except Exception:
             continue
-
-
-async def run_knowledge_updates(interval_hours: int = 12):
-    while True:
-        try:
-            await perform_update()
-        except Exception:
-            pass
-        await asyncio.sleep(max(1, int(interval_hours * 3600)))
\ No newline at end of file
@@ -1,6 +1,7 @@
 import asyncio
 import json
-from typing import List
+import threading
+from typing import List, Optional
 from fastapi import APIRouter
 from starlette.responses import StreamingResponse
 
@@ -9,29 +10,56 @@ router = APIRouter(prefix="/logs", tags=["logs"])
 
 _subscribers: List[asyncio.Queue] = []
 _history: List[str] = []
+_history_lock = threading.Lock()
+# Loop the subscriber queues belong to; set at app startup (or by the first subscriber)
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def bind_loop(loop: asyncio.AbstractEventLoop):
+    global _loop
+    _loop = loop
 
 
 def publish_log_event(event: dict):
+    """Safe to call from any thread; queues are only touched on the bound loop."""
     try:
         payload = json.dumps(event)
-        # Keep a simple capped history for /logs retrieval
+    except Exception:
+        return
+    loop = _loop
+    if loop is None:
+        _deliver(payload)
+        return
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        _deliver(payload)
+        return
+    try:
+        loop.call_soon_threadsafe(_deliver, payload)
+    except RuntimeError:
+        pass  # loop closed
+
+
+def _deliver(payload: str):
+    # Keep a simple capped history for /logs retrieval
+    with _history_lock:
+        _history.append(payload)
+        if len(_history) > 200:
+            del _history[: len(_history) - 200]
+    for q in list(_subscribers):
         try:
-            _history.append(payload)
-            if len(_history) > 200:
-                del _history[: len(_history) - 200]
+            q.put_nowait(payload)
         except Exception:
-            pass
-        for q in list(_subscribers):
-            try:
-                q.put_nowait(payload)
-            except Exception:
-                continue
-    except Exception:
-        pass
+            continue
 
 
 @router.get("/stream")
 async def stream():
+    if _loop is None:
+        bind_loop(asyncio.get_running_loop())
     queue: asyncio.Queue = asyncio.Queue()
     _subscribers.append(queue)
 
@@ -55,6 +83,7 @@ async def stream():
 async def recent_logs():
     # Return last 50 log lines (JSON strings)
     try:
-        return _history[-50:]
+        with _history_lock:
+            return _history[-50:]
     except Exception:
         return []
\ No newline at end of file
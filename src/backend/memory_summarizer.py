@@ -1,19 +1,8 @@
-import sqlite3
+from .memory import recent_interactions, replace_with_summary
 
 
 def summarize_memory():
-    conn = sqlite3.connect("data/memory.db")
-    try:
-        rows = conn.execute(
-            "SELECT prompt, response FROM interactions ORDER BY id DESC LIMIT 100"
-        ).fetchall()
-        text = " ".join([f"Q:{r[0]} A:{r[1]}" for r in rows])
-        summary = text[:2000]
-        conn.execute("DELETE FROM interactions")
-        conn.execute(
-            "INSERT INTO interactions(prompt,response) VALUES (?,?)",
-            ("memory_summary", summary),
-        )
-        conn.commit()
-    finally:
-        conn.close()
\ No newline at end of file
+    rows = recent_interactions(100)
+    text = " ".join([f"Q:{r[1]} A:{r[2]}" for r in rows])
+    summary = text[:2000]
+    replace_with_summary(summary)
\ No newline at end of file
@@ -1,8 +1,10 @@
 import asyncio
 import psutil
 from fastapi import APIRouter, Request
-from data.db import log_watchdog_event
+from data.ingest import enqueue_watchdog_event
 from .vector_memory import count as vector_count, last_update_time
+from .cron import cron_registry
+from src.watchdog.processes import process_sampler
 
 
 class SystemWatcher:
@@ -23,18 +25,11 @@ class SystemWatcher:
             try:
                 self.latest["cpu_percent"] = float(psutil.cpu_percent(interval=None))
                 self.latest["memory_percent"] = float(psutil.virtual_memory().percent)
-                procs = []
-                for p in psutil.process_iter(["pid", "name", "cpu_percent", "memory_percent"]):
-                    info = p.info
-                    procs.append({
-                        "pid": info.get("pid"),
-                        "name": info.get("name"),
-                        "cpu": info.get("cpu_percent"),
-                        "mem": info.get("memory_percent"),
-                    })
-                # Top 8 by CPU
-                procs.sort(key=lambda x: (x.get("cpu") or 0), reverse=True)
-                self.latest["processes"] = procs[:8]
+                # Top 8 by CPU, from the shared process snapshot
+                self.latest["processes"] = [
+                    {"pid": p["pid"], "name": p["name"], "cpu": p["cpu"], "mem": p["mem"]}
+                    for p in process_sampler.snapshot().top(8)
+                ]
                 # Publish event to log stream if available
                 if callable(self._publisher):
                     try:
@@ -48,7 +43,7 @@ class SystemWatcher:
                         # throttle anomaly logs to once per 60s
                         if now - self._last_anomaly_ts > 60.0:
                             self._last_anomaly_ts = now
-                            log_watchdog_event(
+                            enqueue_watchdog_event(
                                 source="system",
                                 level="warning",
                                 message="High CPU usage",
@@ -80,11 +75,11 @@ async def status(request: Request):
         base["knowledge_last_update"] = 0
     # Scheduler status
     try:
-        app = request.app
         sched = {
-            "auto_update": bool(getattr(app.state, "update_task", None)),
-            "cron_update": bool(getattr(app.state, "update_cron_task", None)),
-            "knowledge_updater": bool(getattr(app.state, "knowledge_task", None)),
+            "auto_update": cron_registry.has("auto_update"),
+            "cron_update": cron_registry.has("cron_update"),
+            "knowledge_updater": cron_registry.has("knowledge_update"),
+            "jobs": cron_registry.jobs(),
         }
         base["scheduler_status"] = sched
     except Exception:
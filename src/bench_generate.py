@@ -0,0 +1,54 @@
+import argparse
+import os
+import sys
+import time
+
+import torch
+
+# Ensure project root is in path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.model.transformer import JessicaGPT
+
+def tokens_per_second(model, prompt, new_tokens, use_cache, repeats):
+    best = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.generate(prompt, max_new_tokens=new_tokens, use_cache=use_cache)
+        if prompt.is_cuda:
+            torch.cuda.synchronize()
+        best = max(best, new_tokens / (time.perf_counter() - start))
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="JessicaGPT generation speed, with and without the KV cache")
+    parser.add_argument("--vocab-size", type=int, default=256)
+    # Defaults match the model Brain runs
+    parser.add_argument("--n-embd", type=int, default=128)
+    parser.add_argument("--n-head", type=int, default=4)
+    parser.add_argument("--n-layer", type=int, default=4)
+    parser.add_argument("--block-size", type=int, default=256)
+    parser.add_argument("--prompt-tokens", type=int, default=200)
+    parser.add_argument("--new-tokens", type=int, default=60)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    model = JessicaGPT(vocab_size=args.vocab_size, n_embd=args.n_embd, n_head=args.n_head,
+                       n_layer=args.n_layer, block_size=args.block_size).to(args.device)
+    model.eval()
+    prompt = torch.randint(args.vocab_size, (1, args.prompt_tokens), device=args.device)
+
+    # Warm up both paths
+    model.generate(prompt, max_new_tokens=4, use_cache=False)
+    model.generate(prompt, max_new_tokens=4, use_cache=True)
+
+    full = tokens_per_second(model, prompt, args.new_tokens, False, args.repeats)
+    cached = tokens_per_second(model, prompt, args.new_tokens, True, args.repeats)
+    print(f"prompt={args.prompt_tokens} new={args.new_tokens} device={args.device}")
+    print(f"full forward : {full:8.1f} tokens/s")
+    print(f"kv cache     : {cached:8.1f} tokens/s  ({cached / full:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -37,12 +37,16 @@ class Brain:
     def set_mode(self, mode: str):
         print(f"Brain switched to {mode.upper()} mode.")
 
-    async def process_input(self, user_input: str, update_callback: Callable[[str], None] = None, confirmation_callback: Callable[[str, dict], bool] = None) -> str:
+    async def process_input(self, user_input: str, update_callback: Callable[[str], None] = None, confirmation_callback: Callable[[str, dict], bool] = None, system: bool = False) -> str:
         """
         Process input:
         1. Inject Persona + RAG/Tool Context via prompt.
         2. IF the model *generates* a tool call (future training), execute it.
         3. For Phase 2/3 MVP: Heuristic triggers.
+        
+        system=True is for internal prompts (e.g. repair suggestions): no tool
+        triggers, generation off the event loop, and nothing written to the
+        training data or chat history.
         """
         context_accumulated = []
         
@@ -59,8 +63,8 @@ class Brain:
             except:
                 pass
 
-        # 2. Heuristic Tool Use
-        tool_output = await self._heuristic_tool_check(user_input, confirmation_callback, update_callback)
+        # 2. Heuristic Tool Use (never for system prompts: they quote arbitrary error text)
+        tool_output = None if system else await self._heuristic_tool_check(user_input, confirmation_callback, update_callback)
         if tool_output:
             context_accumulated.append(f"Tool Output:\n{tool_output}")
 
@@ -70,6 +74,9 @@ class Brain:
         if update_callback:
             update_callback("[Thinking via JessicaGPT...]\n")
             
+        if system:
+            return await asyncio.to_thread(self._generate, full_prompt)
+            
         generated_text = self._generate(full_prompt)
         
         if update_callback:
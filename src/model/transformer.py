@@ -3,6 +3,20 @@ import torch.nn as nn
 import torch.nn.functional as F
 import pytorch_lightning as pl
 
+class KVCache:
+    """Keys and values of already processed positions, per layer and head
+
+    Each entry is a [k, v] pair of (B, T_past, head_size) tensors that
+    Head.forward extends in place.
+    """
+    def __init__(self, n_layer, n_head):
+        self.layers = [[[None, None] for _ in range(n_head)] for _ in range(n_layer)]
+
+    @property
+    def length(self):
+        k = self.layers[0][0][0]
+        return 0 if k is None else k.shape[1]
+
 class Head(nn.Module):
     """One head of self-attention"""
     def __init__(self, head_size, n_embd, block_size, dropout):
@@ -13,16 +27,24 @@ class Head(nn.Module):
         self.register_buffer('tril', torch.tril(torch.ones(block_size, block_size)))
         self.dropout = nn.Dropout(dropout)
 
-    def forward(self, x):
+    def forward(self, x, cache=None):
         B, T, C = x.shape
         k = self.key(x)   # (B, T, head_size)
         q = self.query(x) # (B, T, head_size)
+        v = self.value(x) # (B, T, head_size)
+        past = 0
+        if cache is not None:
+            # Attend over cached positions too; only the new ones are projected
+            if cache[0] is not None:
+                past = cache[0].shape[1]
+                k = torch.cat((cache[0], k), dim=1) # (B, past+T, head_size)
+                v = torch.cat((cache[1], v), dim=1)
+            cache[0], cache[1] = k, v
         # Compute attention scores
-        wei = q @ k.transpose(-2, -1) * C**-0.5 # (B, T, T)
-        wei = wei.masked_fill(self.tril[:T, :T] == 0, float('-inf'))
+        wei = q @ k.transpose(-2, -1) * C**-0.5 # (B, T, past+T)
+        wei = wei.masked_fill(self.tril[past:past + T, :past + T] == 0, float('-inf'))
         wei = F.softmax(wei, dim=-1)
         wei = self.dropout(wei)
-        v = self.value(x) # (B, T, head_size)
         out = wei @ v # (B, T, head_size)
         return out
 
@@ -34,8 +56,11 @@ class MultiHeadAttention(nn.Module):
         self.proj = nn.Linear(n_embd, n_embd)
         self.dropout = nn.Dropout(dropout)
 
-    def forward(self, x):
-        out = torch.cat([h(x) for h in self.heads], dim=-1)
+    def forward(self, x, cache=None):
+        if cache is None:
+            out = torch.cat([h(x) for h in self.heads], dim=-1)
+        else:
+            out = torch.cat([h(x, c) for h, c in zip(self.heads, cache)], dim=-1)
         out = self.dropout(self.proj(out))
         return out
 
@@ -63,8 +88,8 @@ class Block(nn.Module):
         self.ln1 = nn.LayerNorm(n_embd)
         self.ln2 = nn.LayerNorm(n_embd)
 
-    def forward(self, x):
-        x = x + self.sa(self.ln1(x))
+    def forward(self, x, cache=None):
+        x = x + self.sa(self.ln1(x), cache)
         x = x + self.ffwd(self.ln2(x))
         return x
 
@@ -85,14 +110,20 @@ class JessicaGPT(pl.LightningModule):
         self.ln_f = nn.LayerNorm(n_embd) # final layer norm
         self.lm_head = nn.Linear(n_embd, vocab_size)
 
-    def forward(self, idx, targets=None):
+    def forward(self, idx, targets=None, cache=None):
         B, T = idx.shape
+        # With a cache, idx continues the cached positions
+        start = cache.length if cache is not None else 0
         
         # idx and targets are both (B,T) tensor of integers
         tok_emb = self.token_embedding_table(idx) # (B,T,C)
-        pos_emb = self.position_embedding_table(torch.arange(T, device=idx.device)) # (T,C)
+        pos_emb = self.position_embedding_table(torch.arange(start, start + T, device=idx.device)) # (T,C)
         x = tok_emb + pos_emb # (B,T,C)
-        x = self.blocks(x) # (B,T,C)
+        if cache is None:
+            x = self.blocks(x) # (B,T,C)
+        else:
+            for block, layer_cache in zip(self.blocks, cache.layers):
+                x = block(x, layer_cache)
         x = self.ln_f(x) # (B,T,C)
         logits = self.lm_head(x) # (B,T,vocab_size)
 
@@ -117,13 +148,30 @@ class JessicaGPT(pl.LightningModule):
         return optimizer
 
     @torch.no_grad()
-    def generate(self, idx, max_new_tokens):
-        """Generate new tokens from context"""
+    def generate(self, idx, max_new_tokens, use_cache=True):
+        """Generate new tokens from context
+        
+        With use_cache, the context is run through the model once and each
+        step then only processes the newest token against the cached keys
+        and values. Positions are absolute, so when the window fills up the
+        cache is rebuilt from the last 3/4 of block_size tokens (rather than
+        on every step); the model then sees between 3/4 and all of
+        block_size tokens of context. use_cache=False re-runs the full
+        cropped context for every token.
+        """
+        cache = None
         for _ in range(max_new_tokens):
-            # Crop context if needed
-            idx_cond = idx[:, -self.block_size:]
-            # Get predictions
-            logits, loss = self(idx_cond)
+            if not use_cache:
+                # Crop context if needed
+                idx_cond = idx[:, -self.block_size:]
+                # Get predictions
+                logits, loss = self(idx_cond)
+            elif cache is None or cache.length >= self.block_size:
+                keep = self.block_size if cache is None else self.block_size - self.block_size // 4
+                cache = KVCache(len(self.blocks), len(self.blocks[0].sa.heads))
+                logits, loss = self(idx[:, -keep:], cache=cache)
+            else:
+                logits, loss = self(idx[:, -1:], cache=cache)
             # Focus on last time step
             logits = logits[:, -1, :] # (B, C)
             # Apply softmax
@@ -0,0 +1,260 @@
+"""
+Pipeline Executor - Runs pipeline steps as a dependency graph
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Steps run at once, per pipeline run
+MAX_STEP_WORKERS = 4
+# Output lines kept on each StepResult (all lines still go to the log stream)
+OUTPUT_TAIL_LINES = 200
+
+@dataclass
+class StepResult:
+    name: str
+    status: str  # ok, failed, timeout, cached, skipped
+    returncode: Optional[int] = None
+    duration: float = 0.0
+    output: str = ""
+    cache_key: Optional[str] = None
+
+def _default_publisher() -> Optional[Callable[[dict], None]]:
+    # Called from step threads; publish_log_event hands events to the server loop itself
+    try:
+        from src.backend.log_stream import publish_log_event
+        return publish_log_event
+    except Exception:
+        return None
+
+def _kill_tree(proc: subprocess.Popen):
+    """Kill a shell and whatever it started; killing only the shell leaves the pipe open"""
+    try:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except Exception:
+        pass
+    try:
+        proc.kill()
+    except Exception:
+        pass
+
+def order_steps(steps) -> List:
+    """Topologically order steps; raises ValueError on unknown dependencies or cycles"""
+    by_name = {s.name: s for s in steps}
+    if len(by_name) != len(steps):
+        raise ValueError("Duplicate step names")
+    for step in steps:
+        for dep in step.depends_on:
+            if dep not in by_name:
+                raise ValueError(f"Step '{step.name}' depends on unknown step '{dep}'")
+    ordered, state = [], {}
+
+    def visit(step, path):
+        if state.get(step.name) == "done":
+            return
+        if state.get(step.name) == "visiting":
+            raise ValueError("Dependency cycle: " + " -> ".join(path + [step.name]))
+        state[step.name] = "visiting"
+        for dep in step.depends_on:
+            visit(by_name[dep], path + [step.name])
+        state[step.name] = "done"
+        ordered.append(step)
+
+    for step in steps:
+        visit(step, [])
+    return ordered
+
+class StepCache:
+    """Successful step runs keyed by a hash of the command and its inputs, kept in a JSON file"""
+
+    def __init__(self, path: Optional[Path]):
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+        # (path, size, mtime_ns) -> content digest, so unchanged files are read once
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        if self.path and self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except Exception:
+                self._entries = {}
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._entries.get(key)
+
+    def put(self, key: str, entry: dict):
+        with self._lock:
+            self._entries[key] = entry
+            if not self.path:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(".tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(self._entries, f)
+                os.replace(tmp, self.path)
+            except Exception as e:
+                print(f"Error saving step cache: {e}")
+
+    def file_digest(self, path: Path) -> str:
+        try:
+            st = path.stat()
+        except OSError:
+            return "missing"
+        ident = (str(path), st.st_size, st.st_mtime_ns)
+        digest = self._digests.get(ident)
+        if digest is None:
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(chunk)
+            digest = h.hexdigest()
+            self._digests[ident] = digest
+        return digest
+
+class PipelineExecutor:
+    """Runs a pipeline's steps as a DAG on a thread pool
+
+    A step starts once every step in its depends_on has succeeded; steps
+    downstream of a failure are skipped. Output lines are published to the
+    log stream as they arrive. A step that declares inputs is not re-run
+    while its command, working dir, input file contents and upstream keys
+    hash to a key that already succeeded; steps without inputs always run.
+    """
+
+    def __init__(self, max_workers: int = MAX_STEP_WORKERS, cache_path: Optional[Path] = None,
+                 publish: Optional[Callable[[dict], None]] = None, base_dir: Optional[Path] = None):
+        self.max_workers = max_workers
+        self.cache = StepCache(cache_path)
+        self.publish = publish if publish is not None else _default_publisher()
+        self.base_dir = Path(base_dir) if base_dir else Path.cwd()
+
+    def run(self, pipeline, force: bool = False) -> Dict[str, StepResult]:
+        """Run all steps of a pipeline; force ignores cached results"""
+        steps = order_steps(pipeline.steps)
+        by_name = {s.name: s for s in steps}
+        results: Dict[str, StepResult] = {}
+        keys: Dict[str, str] = {}
+        pending = {s.name: set(s.depends_on) for s in steps}
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline-step") as pool:
+            while pending or running:
+                for name in [n for n, deps in pending.items() if deps <= results.keys()]:
+                    step = by_name[name]
+                    del pending[name]
+                    if any(results[d].status not in ("ok", "cached") for d in step.depends_on):
+                        results[name] = StepResult(name, "skipped", output="Upstream step failed")
+                        self._emit(pipeline, name, status="skipped")
+                        continue
+                    keys[name] = self._cache_key(step, [keys[d] for d in step.depends_on])
+                    cached = None if force or not step.inputs else self.cache.get(keys[name])
+                    if cached is not None:
+                        results[name] = StepResult(name, "cached", cached.get("returncode", 0),
+                                                   cache_key=keys[name])
+                        self._emit(pipeline, name, status="cached")
+                        continue
+                    running[pool.submit(self._run_step, pipeline, step)] = name
+                if not running:
+                    continue
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = StepResult(name, "failed", output=str(e))
+                    result.cache_key = keys.get(name)
+                    results[name] = result
+                    if result.status == "ok" and by_name[name].inputs:
+                        self.cache.put(keys[name], {"returncode": 0, "finished": time.time()})
+
+        return {s.name: results[s.name] for s in steps}
+
+    async def run_async(self, pipeline, force: bool = False) -> Dict[str, StepResult]:
+        """run() off the event loop"""
+        return await asyncio.to_thread(self.run, pipeline, force)
+
+    def _working_dir(self, step) -> Path:
+        wd = Path(step.working_dir or ".")
+        return wd if wd.is_absolute() else self.base_dir / wd
+
+    def _cache_key(self, step, upstream: List[str]) -> str:
+        h = hashlib.sha256()
+        wd = self._working_dir(step)
+        h.update(step.command.encode())
+        h.update(str(wd.resolve()).encode())
+        for pattern in sorted(step.inputs):
+            matches = sorted(wd.glob(pattern)) if any(c in pattern for c in "*?[") else [wd / pattern]
+            for match in matches:
+                # A directory input stands for every file under it
+                files = sorted(p for p in match.rglob("*") if p.is_file()) if match.is_dir() else [match]
+                for path in files:
+                    h.update(f"\0{path}\0".encode())
+                    h.update(self.cache.file_digest(path).encode())
+        for key in upstream:
+            h.update(key.encode())
+        return h.hexdigest()
+
+    def _run_step(self, pipeline, step) -> StepResult:
+        self._emit(pipeline, step.name, status="running")
+        start = time.time()
+        tail = deque(maxlen=OUTPUT_TAIL_LINES)
+        timed_out = threading.Event()
+        try:
+            proc = subprocess.Popen(step.command, shell=True, cwd=str(self._working_dir(step)),
+                                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                    stdin=subprocess.DEVNULL, start_new_session=(os.name != "nt"))
+        except Exception as e:
+            self._emit(pipeline, step.name, status="failed", line=str(e))
+            return StepResult(step.name, "failed", duration=time.time() - start, output=str(e))
+
+        def kill():
+            timed_out.set()
+            _kill_tree(proc)
+
+        timer = threading.Timer(step.timeout, kill)
+        timer.daemon = True
+        timer.start()
+        try:
+            for raw in proc.stdout:
+                line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                tail.append(line)
+                self._emit(pipeline, step.name, line=line)
+            returncode = proc.wait()
+        finally:
+            timer.cancel()
+            proc.stdout.close()
+
+        if timed_out.is_set():
+            status = "timeout"
+            tail.append(f"Timed out after {step.timeout}s")
+        else:
+            status = "ok" if returncode == 0 else "failed"
+        self._emit(pipeline, step.name, status=status, returncode=returncode)
+        return StepResult(step.name, status, returncode, time.time() - start, "\n".join(tail))
+
+    def _emit(self, pipeline, step_name: str, **fields):
+        if self.publish is None:
+            return
+        try:
+            self.publish({"type": "pipeline_step", "pipeline": pipeline.name, "step": step_name,
+                          "ts": time.time(), **fields})
+        except Exception:
+            pass
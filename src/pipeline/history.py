@@ -0,0 +1,217 @@
+"""
+Probe History - Bounded per-probe time series with 1m/1h/1d rollups
+"""
+
+import base64
+import json
+import math
+import os
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional
+
+PROBE_HISTORY_PATH = os.getenv(
+    "PROBE_HISTORY_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                 "data", "probe_history.json"))
+
+# Raw results kept per probe
+RAW_CAPACITY = 1000
+# Rollup name -> (bucket width in seconds, buckets kept)
+ROLLUPS = {
+    "1m": (60, 24 * 60),
+    "1h": (3600, 30 * 24),
+    "1d": (86400, 365),
+}
+
+_RAW_FIELDS = {"ts": "d", "ok": "b", "latency": "f"}
+_ROLLUP_FIELDS = {"start": "d", "count": "I", "failures": "I", "flaps": "I",
+                  "lat_n": "I", "lat_sum": "d", "lat_max": "f"}
+
+class _Ring:
+    """Fixed-capacity columns of typed arrays; the oldest row is overwritten when full"""
+
+    def __init__(self, fields: Dict[str, str], capacity: int):
+        self.fields = fields
+        self.capacity = capacity
+        self.cols = {name: array(code, [0] * capacity) for name, code in fields.items()}
+        self.size = 0
+        self.head = 0  # next write position
+
+    def append(self, **values):
+        for name, col in self.cols.items():
+            col[self.head] = values.get(name, 0)
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def last_index(self) -> Optional[int]:
+        return (self.head - 1) % self.capacity if self.size else None
+
+    def indexes(self) -> List[int]:
+        """Row positions, oldest first"""
+        start = (self.head - self.size) % self.capacity
+        return [(start + i) % self.capacity for i in range(self.size)]
+
+    def dump(self) -> Dict[str, Any]:
+        order = self.indexes()
+        return {name: base64.b64encode(array(col.typecode, (col[i] for i in order)).tobytes()).decode()
+                for name, col in self.cols.items()}
+
+    def load(self, data: Dict[str, Any]):
+        rows = None
+        for name, code in self.fields.items():
+            values = array(code)
+            values.frombytes(base64.b64decode(data.get(name, "")))
+            values = values[-self.capacity:]
+            if rows is None:
+                rows = len(values)
+            for i, v in enumerate(values[:rows]):
+                self.cols[name][i] = v
+        self.size = rows or 0
+        self.head = self.size % self.capacity
+
+class ProbeSeries:
+    """Raw results plus rollups for one probe"""
+
+    def __init__(self, raw_capacity: int = RAW_CAPACITY):
+        self.raw = _Ring(_RAW_FIELDS, raw_capacity)
+        self.rollups = {name: _Ring(_ROLLUP_FIELDS, keep) for name, (_, keep) in ROLLUPS.items()}
+
+    def record(self, ts: float, ok: bool, latency_ms: Optional[float]):
+        last = self.raw.last_index()
+        flipped = last is not None and bool(self.raw.cols["ok"][last]) != ok
+        self.raw.append(ts=ts, ok=1 if ok else 0, latency=math.nan if latency_ms is None else latency_ms)
+        for name, (width, _) in ROLLUPS.items():
+            ring = self.rollups[name]
+            start = ts - ts % width
+            i = ring.last_index()
+            if i is None or ring.cols["start"][i] < start:
+                ring.append(start=start)
+                i = ring.last_index()
+            cols = ring.cols
+            cols["count"][i] += 1
+            cols["failures"][i] += 0 if ok else 1
+            cols["flaps"][i] += 1 if flipped else 0
+            if latency_ms is not None:
+                cols["lat_n"][i] += 1
+                cols["lat_sum"][i] += latency_ms
+                cols["lat_max"][i] = max(cols["lat_max"][i], latency_ms)
+
+    def query(self, resolution: str = "raw", since: Optional[float] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        points = []
+        if resolution == "raw":
+            cols = self.raw.cols
+            for i in self.raw.indexes():
+                if since is not None and cols["ts"][i] < since:
+                    continue
+                latency = cols["latency"][i]
+                points.append({"ts": cols["ts"][i], "ok": bool(cols["ok"][i]),
+                               "latency_ms": None if math.isnan(latency) else round(latency, 2)})
+        else:
+            ring = self.rollups[resolution]
+            cols = ring.cols
+            width = ROLLUPS[resolution][0]
+            for i in ring.indexes():
+                if since is not None and cols["start"][i] + width <= since:
+                    continue
+                count, lat_n = cols["count"][i], cols["lat_n"][i]
+                points.append({
+                    "ts": cols["start"][i],
+                    "count": count,
+                    "failures": cols["failures"][i],
+                    "uptime": round((count - cols["failures"][i]) / count, 4) if count else None,
+                    "flaps": cols["flaps"][i],
+                    "latency_avg_ms": round(cols["lat_sum"][i] / lat_n, 2) if lat_n else None,
+                    "latency_max_ms": round(cols["lat_max"][i], 2) if lat_n else None,
+                })
+        return points[-limit:] if limit else points
+
+    def dump(self) -> Dict[str, Any]:
+        return {"raw": self.raw.dump(), **{name: ring.dump() for name, ring in self.rollups.items()}}
+
+    def load(self, data: Dict[str, Any]):
+        self.raw.load(data.get("raw", {}))
+        for name, ring in self.rollups.items():
+            ring.load(data.get(name, {}))
+
+class ProbeHistory:
+    """Time series of probe results, bounded in memory and on disk
+
+    Every probe keeps RAW_CAPACITY raw results and a fixed number of 1m, 1h
+    and 1d rollup buckets (count, failures, status flips, latency avg/max)
+    in typed arrays. save() writes them to one JSON file so other processes
+    (the backend's /diagnostics) can read the same history.
+    """
+
+    def __init__(self, path: Optional[str] = PROBE_HISTORY_PATH, raw_capacity: int = RAW_CAPACITY):
+        self.path = path
+        self.raw_capacity = raw_capacity
+        self.series: Dict[str, ProbeSeries] = {}
+        self.last_save = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, name: str, ok: bool, ts: Optional[float] = None, latency_ms: Optional[float] = None):
+        with self._lock:
+            series = self.series.get(name)
+            if series is None:
+                series = self.series[name] = ProbeSeries(self.raw_capacity)
+            series.record(ts if ts is not None else time.time(), ok, latency_ms)
+
+    def query(self, name: str, resolution: str = "raw", since: Optional[float] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Points for one probe; resolution is raw, 1m, 1h or 1d"""
+        if resolution != "raw" and resolution not in ROLLUPS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        with self._lock:
+            series = self.series.get(name)
+            return series.query(resolution, since, limit) if series else []
+
+    def summary(self, window: float = 3600) -> Dict[str, Dict[str, Any]]:
+        """Per probe: uptime, flaps and average latency over the last window seconds"""
+        since = time.time() - window
+        out = {}
+        for name in list(self.series):
+            points = self.query(name, "1m", since=since)
+            count = sum(p["count"] for p in points)
+            failures = sum(p["failures"] for p in points)
+            lat = [(p["latency_avg_ms"], p["count"]) for p in points if p["latency_avg_ms"] is not None]
+            out[name] = {
+                "checks": count,
+                "uptime": round((count - failures) / count, 4) if count else None,
+                "flaps": sum(p["flaps"] for p in points),
+                "latency_avg_ms": round(sum(a * n for a, n in lat) / sum(n for _, n in lat), 2) if lat else None,
+            }
+        return out
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            payload = {"saved": time.time(), "probes": {n: s.dump() for n, s in self.series.items()}}
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp, self.path)
+            self.last_save = time.time()
+        except Exception as e:
+            print(f"Error saving probe history: {e}")
+
+    def load(self) -> "ProbeHistory":
+        if not self.path or not os.path.exists(self.path):
+            return self
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            series = {}
+            for name, data in payload.get("probes", {}).items():
+                series[name] = ProbeSeries(self.raw_capacity)
+                series[name].load(data)
+            with self._lock:
+                self.series = series
+        except Exception as e:
+            print(f"Error loading probe history: {e}")
+        return self
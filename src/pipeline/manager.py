@@ -5,16 +5,20 @@ Pipeline Manager - Manages pipeline configurations and execution
 import json
 import os
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 import asyncio
 
+from .schema import PipelineConfigModel
+
 @dataclass
 class PipelineStep:
     name: str
     command: str
     working_dir: str = "."
     timeout: int = 300
+    depends_on: List[str] = field(default_factory=list)
+    inputs: List[str] = field(default_factory=list)
 
 @dataclass
 class ProbeConfig:
@@ -38,62 +42,98 @@ class PipelineManager:
         self.pipelines_dir = Path(pipelines_dir)
         self.pipelines_dir.mkdir(parents=True, exist_ok=True)
         self.pipelines: Dict[str, Pipeline] = {}
+        self._executor = None
+        # file -> (mtime_ns, size) and the pipeline it defined, for reload_changed()
+        self._file_stats: Dict[Path, Tuple[int, int]] = {}
+        self._file_pipelines: Dict[Path, str] = {}
         
     def load_pipelines(self):
         """Load all pipelines from the pipelines directory"""
         print(f"Loading pipelines from {self.pipelines_dir}")
         self.pipelines.clear()
+        self._file_stats.clear()
+        self._file_pipelines.clear()
         
         if not self.pipelines_dir.exists():
             return
             
         for file_path in self.pipelines_dir.glob("*.json"):
             try:
+                self._file_stats[file_path] = self._stat(file_path)
                 self._load_pipeline_file(file_path)
             except Exception as e:
                 print(f"Error loading pipeline {file_path}: {e}")
                 
         print(f"Loaded {len(self.pipelines)} pipelines")
         
-    def _load_pipeline_file(self, file_path: Path):
-        """Load a single pipeline file"""
+    def reload_changed(self) -> bool:
+        """Re-read pipeline files added, changed or removed since the last load
+        
+        A file that no longer validates keeps its previous pipeline. Returns
+        True if any pipeline was added, replaced or removed.
+        """
+        current = {}
+        for file_path in self.pipelines_dir.glob("*.json"):
+            try:
+                current[file_path] = self._stat(file_path)
+            except OSError:
+                continue
+                
+        changed = False
+        for file_path in set(self._file_stats) - set(current):
+            name = self._file_pipelines.pop(file_path, None)
+            if name and name not in self._file_pipelines.values():
+                self.pipelines.pop(name, None)
+                print(f"  - Removed: {name}")
+                changed = True
+                
+        for file_path, stat in current.items():
+            if self._file_stats.get(file_path) == stat:
+                continue
+            try:
+                previous = self._file_pipelines.get(file_path)
+                pipeline = self._load_pipeline_file(file_path)
+                if previous and previous != pipeline.name and previous not in self._file_pipelines.values():
+                    self.pipelines.pop(previous, None)
+                changed = True
+            except Exception as e:
+                print(f"Error reloading pipeline {file_path}: {e}")
+                
+        self._file_stats = current
+        return changed
+        
+    @staticmethod
+    def _stat(file_path: Path) -> Tuple[int, int]:
+        st = file_path.stat()
+        return st.st_mtime_ns, st.st_size
+        
+    def _load_pipeline_file(self, file_path: Path) -> Pipeline:
+        """Load and validate a single pipeline file"""
         with open(file_path, 'r') as f:
             data = json.load(f)
             
-        # Parse steps
-        steps = []
-        for step_data in data.get('steps', []):
-            steps.append(PipelineStep(
-                name=step_data['name'],
-                command=step_data['command'],
-                working_dir=step_data.get('working_dir', '.'),
-                timeout=step_data.get('timeout', 300)
-            ))
-            
-        # Parse probes
-        probes = []
+        # Probe params may be given inline (everything except type, name, interval)
+        probes_data = []
         for probe_data in data.get('probes', []):
-            # Extract params (everything except type, name, interval)
-            params = {k: v for k, v in probe_data.items() 
-                     if k not in ['type', 'name', 'interval']}
-            
-            probes.append(ProbeConfig(
-                type=probe_data['type'],
-                name=probe_data['name'],
-                interval=probe_data.get('interval', 60),
-                params=params
-            ))
-            
+            params = dict(probe_data.get('params', {}))
+            params.update({k: v for k, v in probe_data.items()
+                           if k not in ['type', 'name', 'interval', 'params']})
+            probes_data.append({**{k: probe_data[k] for k in ['type', 'name', 'interval'] if k in probe_data},
+                                'params': params})
+        config = PipelineConfigModel.model_validate({**data, 'probes': probes_data})
+        
         pipeline = Pipeline(
-            name=data['name'],
-            description=data.get('description', ''),
-            steps=steps,
-            probes=probes,
-            enabled=data.get('enabled', True)
+            name=config.name,
+            description=config.description,
+            steps=[PipelineStep(**step.model_dump()) for step in config.steps],
+            probes=[ProbeConfig(**probe.model_dump()) for probe in config.probes],
+            enabled=config.enabled
         )
         
         self.pipelines[pipeline.name] = pipeline
+        self._file_pipelines[file_path] = pipeline.name
         print(f"  - Loaded: {pipeline.name}")
+        return pipeline
         
     def get_pipeline(self, name: str) -> Optional[Pipeline]:
         """Get a pipeline by name"""
@@ -103,6 +143,21 @@ class PipelineManager:
         """Get all loaded pipelines"""
         return list(self.pipelines.values())
         
+    @property
+    def executor(self):
+        """Shared step executor; cached step results live next to the pipeline files"""
+        if self._executor is None:
+            from .executor import PipelineExecutor
+            self._executor = PipelineExecutor(cache_path=self.pipelines_dir / ".cache" / "steps.json")
+        return self._executor
+        
+    async def run_pipeline(self, name: str, force: bool = False):
+        """Run a pipeline's steps; returns step name -> StepResult"""
+        pipeline = self.get_pipeline(name)
+        if pipeline is None:
+            raise KeyError(name)
+        return await self.executor.run_async(pipeline, force=force)
+        
     def create_example_pipeline(self):
         """Create an example pipeline file if none exist"""
         if list(self.pipelines_dir.glob("*.json")):
@@ -119,7 +174,8 @@ class PipelineManager:
                     "name": "check_syntax",
                     "command": "python -m py_compile src/main.py",
                     "working_dir": ".",
-                    "timeout": 30
+                    "timeout": 30,
+                    "inputs": ["src/main.py"]
                 }
             ],
             "probes": [
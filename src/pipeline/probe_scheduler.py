@@ -3,20 +3,68 @@ Probe Scheduler - Manages periodic execution of probes
 """
 
 import asyncio
+import heapq
+import itertools
+import random
 import time
-from typing import List, Dict, Callable, Optional
+from typing import List, Dict, Callable, Optional, Tuple
 from .probes.base import Probe, ProbeResult, ProbeFactory
 from .manager import PipelineManager
+from .history import ProbeHistory
+
+# Most probe checks in flight at once
+MAX_CONCURRENT_PROBES = 8
+# Runs are spread by up to this fraction of the interval (capped at MAX_JITTER seconds)
+JITTER_FRACTION = 0.1
+MAX_JITTER = 5.0
+# Longest single sleep; the loop re-reads the wall clock so a suspend is noticed
+MAX_SLEEP = 30.0
+# Seconds between writes of the probe history file
+HISTORY_SAVE_INTERVAL = 60.0
+# Seconds between checks of the pipelines directory for edits
+PIPELINE_POLL_INTERVAL = 2.0
 
 class ProbeScheduler:
-    """Schedules and runs probes"""
+    """Schedules and runs probes
+    
+    Probes sit in a heap ordered by next due time and the loop sleeps until
+    the earliest one is due, so idle cost doesn't grow with the probe count.
+    Due probes run concurrently, at most max_concurrency at a time; each
+    check is bounded by its probe's timeout so a hung check is reported as a
+    failure instead of holding up the loop. Next runs are anchored to the
+    schedule plus a little jitter; slots missed while the machine slept or a
+    check overran are dropped and the probe runs once, soon after waking.
     
-    def __init__(self, pipeline_manager: PipelineManager):
+    Edited pipeline files are picked up while running: only probes that
+    were added, removed or changed are touched, so the rest keep their
+    state and timing. Heap entries of changed probes are left in place and
+    skipped when popped (their due time no longer matches _next_run).
+    """
+    
+    def __init__(self, pipeline_manager: PipelineManager, max_concurrency: int = MAX_CONCURRENT_PROBES,
+                 history: Optional[ProbeHistory] = None):
         self.pipeline_manager = pipeline_manager
-        self.active_probes: List[Probe] = []
+        self._probes: Dict[str, Probe] = {}
+        self._configs: Dict[str, object] = {}
         self.running = False
         self.results: Dict[str, ProbeResult] = {}
+        self.history = history if history is not None else ProbeHistory().load()
         self.failure_callbacks: List[Callable[[Probe, ProbeResult], None]] = []
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._queue: List[Tuple[float, int, Probe]] = []
+        self._seq = itertools.count()
+        self._next_run: Dict[str, float] = {}
+        self._in_flight: set = set()
+        self._wake: Optional[asyncio.Event] = None
+        
+    @property
+    def active_probes(self) -> List[Probe]:
+        return list(self._probes.values())
+        
+    @active_probes.setter
+    def active_probes(self, probes: List[Probe]):
+        self._probes = {probe.name: probe for probe in probes}
         
     def start(self, loop=None):
         """Start the scheduler"""
@@ -26,11 +74,13 @@ class ProbeScheduler:
         # Schedule the run loop
         if loop:
             asyncio.ensure_future(self._run_loop(), loop=loop)
+            asyncio.ensure_future(self._watch_pipelines(), loop=loop)
         else:
             # Try to get the running loop
             try:
                 loop = asyncio.get_running_loop()
                 asyncio.ensure_future(self._run_loop(), loop=loop)
+                asyncio.ensure_future(self._watch_pipelines(), loop=loop)
             except RuntimeError:
                 # No running loop, will be started later
                 pass
@@ -40,6 +90,9 @@ class ProbeScheduler:
     def stop(self):
         """Stop the scheduler"""
         self.running = False
+        if self._wake is not None:
+            self._wake.set()
+        self.history.save()
         print("Probe scheduler stopped")
         
     def add_failure_callback(self, callback: Callable[[Probe, ProbeResult], None]):
@@ -48,57 +101,179 @@ class ProbeScheduler:
         
     def _load_probes(self):
         """Load probes from all enabled pipelines"""
-        self.active_probes.clear()
-        pipelines = self.pipeline_manager.get_all_pipelines()
+        self._probes.clear()
+        self._configs.clear()
+        self.sync_probes()
         
-        for pipeline in pipelines:
+    def sync_probes(self):
+        """Bring active probes in line with the loaded pipelines, touching only what changed"""
+        wanted = {}
+        for pipeline in self.pipeline_manager.get_all_pipelines():
             if not pipeline.enabled:
                 continue
-                
             for probe_config in pipeline.probes:
-                probe = ProbeFactory.create_probe(probe_config)
-                if probe:
-                    self.active_probes.append(probe)
-                    print(f"Loaded probe: {probe.name} ({probe.interval}s)")
+                wanted[probe_config.name] = probe_config
+                
+        now = time.time()
+        for name in [n for n in self._probes if n not in wanted]:
+            del self._probes[name]
+            self._configs.pop(name, None)
+            self._next_run.pop(name, None)
+            self.results.pop(name, None)
+            print(f"Removed probe: {name}")
+            
+        for name, probe_config in wanted.items():
+            old_config = self._configs.get(name)
+            if old_config == probe_config:
+                continue
+            probe = self._probes.get(name)
+            if (probe is not None and old_config is not None and old_config.type == probe_config.type
+                    and old_config.params == probe_config.params):
+                # Interval change only: keep the probe and its state, move its next run
+                probe.interval = probe_config.interval
+                self._configs[name] = probe_config
+                # A check in flight re-queues itself with the new interval when it finishes
+                if name in self._next_run and name not in self._in_flight and self._wake is not None:
+                    self._schedule(probe, max(probe.last_run + probe.interval, now) if probe.last_run
+                                   else now + self._jitter(probe))
+                print(f"Updated probe: {name} ({probe.interval}s)")
+                continue
+            probe = ProbeFactory.create_probe(probe_config)
+            if not probe:
+                continue
+            self._probes[name] = probe
+            self._configs[name] = probe_config
+            if self._wake is not None:
+                self._schedule(probe, now + self._jitter(probe))
+            print(f"Loaded probe: {probe.name} ({probe.interval}s)")
+            
+        if self._wake is not None:
+            self._wake.set()
+            
+    async def _watch_pipelines(self):
+        """Poll the pipelines directory and apply edits without a restart"""
+        while self.running:
+            await asyncio.sleep(PIPELINE_POLL_INTERVAL)
+            try:
+                if await asyncio.to_thread(self.pipeline_manager.reload_changed):
+                    self.sync_probes()
+            except Exception as e:
+                print(f"Error reloading pipelines: {e}")
                     
+    @staticmethod
+    def _jitter(probe: Probe) -> float:
+        return random.uniform(0, min(probe.interval * JITTER_FRACTION, MAX_JITTER))
+        
+    def _schedule(self, probe: Probe, due: float):
+        self._next_run[probe.name] = due
+        heapq.heappush(self._queue, (due, next(self._seq), probe))
+        
+    def _next_due(self, probe: Probe, due: float, now: float) -> float:
+        """Next slot after a run that was due at `due`, skipping slots already missed"""
+        nxt = due + probe.interval
+        if nxt <= now:
+            nxt = now + self._jitter(probe)
+        return nxt
+        
     async def _run_loop(self):
         """Main execution loop"""
+        self._wake = asyncio.Event()
+        self._queue.clear()
+        now = time.time()
+        for probe in self.active_probes:
+            self._schedule(probe, now + self._jitter(probe))
+            
         while self.running:
-            for probe in self.active_probes:
-                if probe.should_run():
-                    try:
-                        result = await probe.check()
-                        self.results[probe.name] = result
-                        
-                        if not result.success:
-                            print(f"❌ Probe failed: {probe.name} - {result.message}")
-                            self._notify_failure(probe, result)
-                        else:
-                            # Optional: Log success (verbose)
-                            # print(f"✅ Probe passed: {probe.name}")
-                            pass
-                            
-                    except Exception as e:
-                        print(f"Error running probe {probe.name}: {e}")
+            now = time.time()
+            due = []
+            while self._queue and self._queue[0][0] <= now:
+                due_at, seq, probe = heapq.heappop(self._queue)
+                if self._probes.get(probe.name) is probe and self._next_run.get(probe.name) == due_at:
+                    due.append((due_at, seq, probe))
+            for due_at, _, probe in due:
+                asyncio.ensure_future(self._fire(probe, due_at))
+            if self.history.path and now - self.history.last_save >= HISTORY_SAVE_INTERVAL:
+                self.history.last_save = now
+                asyncio.ensure_future(asyncio.to_thread(self.history.save))
+                
+            delay = self._queue[0][0] - now if self._queue else MAX_SLEEP
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=min(max(delay, 0), MAX_SLEEP))
+            except asyncio.TimeoutError:
+                pass
+                
+    async def _fire(self, probe: Probe, due_at: float):
+        """Run one scheduled check, then queue the probe's next run"""
+        self._in_flight.add(probe.name)
+        try:
+            await self._run_probe(probe)
+        finally:
+            self._in_flight.discard(probe.name)
+        if self.running and self._probes.get(probe.name) is probe:
+            self._schedule(probe, self._next_due(probe, due_at, time.time()))
+            if self._wake is not None:
+                self._wake.set()
             
-            await asyncio.sleep(1)  # Check every second
+    async def _run_probe(self, probe: Probe) -> Optional[ProbeResult]:
+        """Run one probe check under the concurrency limit and its timeout"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(probe.check(), timeout=probe.timeout)
+            except asyncio.TimeoutError:
+                result = ProbeResult(
+                    success=False,
+                    message=f"Probe timed out after {probe.timeout:g}s",
+                    timestamp=time.time(),
+                    details={"timeout": probe.timeout}
+                )
+            except Exception as e:
+                print(f"Error running probe {probe.name}: {e}")
+                probe.last_run = time.time()
+                return None
+        # A timed-out check never got to stamp last_run itself
+        probe.last_run = max(probe.last_run, result.timestamp)
+        self.results[probe.name] = result
+        latency = result.details.get("latency_ms")
+        if latency is None:
+            latency = (time.perf_counter() - started) * 1000
+        self.history.record(probe.name, result.success, result.timestamp, latency)
+        
+        if not result.success:
+            print(f"❌ Probe failed: {probe.name} - {result.message}")
+            self._notify_failure(probe, result)
+        return result
             
     def _notify_failure(self, probe: Probe, result: ProbeResult):
         """Notify listeners of probe failure"""
         for callback in self.failure_callbacks:
             try:
-                callback(probe, result)
+                outcome = callback(probe, result)
+                if asyncio.iscoroutine(outcome):
+                    # Async handlers (e.g. RepairEngine.handle_failure) run alongside the probes
+                    asyncio.ensure_future(outcome)
             except Exception as e:
                 print(f"Error in failure callback: {e}")
                 
+    def get_history(self, name: str, resolution: str = "raw", since: Optional[float] = None,
+                    limit: Optional[int] = None) -> List[dict]:
+        """Recorded results for one probe (raw) or its 1m/1h/1d rollups"""
+        return self.history.query(name, resolution, since, limit)
+        
     def get_status(self) -> Dict[str, dict]:
         """Get status of all probes"""
         status = {}
+        trends = self.history.summary()
         for probe in self.active_probes:
             result = self.results.get(probe.name)
             status[probe.name] = {
                 "interval": probe.interval,
                 "last_run": probe.last_run,
+                "next_run": self._next_run.get(probe.name),
+                "trend": trends.get(probe.name),
                 "status": "healthy" if result and result.success else "failed",
                 "message": result.message if result else "Not run yet"
             }
@@ -4,14 +4,15 @@ Base Probe Class and Probe Types
 
 import os
 import time
-import psutil
-import socket
 import asyncio
-from abc import ABC, abstractmethod
+from abc import ABC
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime
 
+from src.watchdog.processes import process_sampler
+
 @dataclass
 class ProbeResult:
     success: bool
@@ -19,19 +20,48 @@ class ProbeResult:
     timestamp: float
     details: Dict[str, Any]
 
+# Seconds a probe check may take before it is reported as failed
+DEFAULT_PROBE_TIMEOUT = 10.0
+# Threads for blocking checks; kept apart from the loop's default executor so
+# hung checks can't starve other to_thread users
+PROBE_THREADS = 4
+
+_probe_executor = ThreadPoolExecutor(max_workers=PROBE_THREADS, thread_name_prefix="probe")
+
 class Probe(ABC):
-    """Base class for all probes"""
+    """Base class for all probes
+    
+    Blocking probes implement check_blocking(); the default check() runs it
+    on the probe thread pool so it never stalls the (UI) event loop. A
+    thread can't be interrupted, so while a timed-out check is still stuck
+    in its thread the probe reports failure instead of starting another.
+    Probes with native async I/O override check() instead.
+    """
     
-    def __init__(self, name: str, interval: int):
+    def __init__(self, name: str, interval: int, timeout: Optional[float] = None):
         self.name = name
         self.interval = interval
+        self.timeout = float(timeout) if timeout else DEFAULT_PROBE_TIMEOUT
         self.last_run = 0
         self.last_result: Optional[ProbeResult] = None
+        self._thread_future: Optional[Future] = None
         
-    @abstractmethod
     async def check(self) -> ProbeResult:
         """Run the probe check"""
-        pass
+        if self._thread_future is not None and not self._thread_future.done():
+            self.last_run = time.time()
+            return ProbeResult(
+                success=False,
+                message="Previous check is still running (hung)",
+                timestamp=self.last_run,
+                details={"hung": True}
+            )
+        self._thread_future = _probe_executor.submit(self.check_blocking)
+        return await asyncio.wrap_future(self._thread_future)
+        
+    def check_blocking(self) -> ProbeResult:
+        """Blocking variant of check(), run off the event loop"""
+        raise NotImplementedError
         
     def should_run(self) -> bool:
         """Check if it's time to run the probe"""
@@ -40,11 +70,11 @@ class Probe(ABC):
 class FileExistsProbe(Probe):
     """Checks if a file exists"""
     
-    def __init__(self, name: str, interval: int, path: str):
-        super().__init__(name, interval)
+    def __init__(self, name: str, interval: int, path: str, timeout: Optional[float] = None):
+        super().__init__(name, interval, timeout)
         self.path = path
         
-    async def check(self) -> ProbeResult:
+    def check_blocking(self) -> ProbeResult:
         exists = os.path.exists(self.path)
         self.last_run = time.time()
         
@@ -66,23 +96,15 @@ class FileExistsProbe(Probe):
 class ProcessRunningProbe(Probe):
     """Checks if a process is running"""
     
-    def __init__(self, name: str, interval: int, process_name: str):
-        super().__init__(name, interval)
+    def __init__(self, name: str, interval: int, process_name: str, timeout: Optional[float] = None):
+        super().__init__(name, interval, timeout)
         self.process_name = process_name.lower()
         
-    async def check(self) -> ProbeResult:
-        found = False
-        pid = None
+    def check_blocking(self) -> ProbeResult:
+        matches = process_sampler.snapshot().matching(self.process_name)
+        found = bool(matches)
+        pid = matches[0]["pid"] if matches else None
         
-        for proc in psutil.process_iter(['pid', 'name']):
-            try:
-                if self.process_name in proc.info['name'].lower():
-                    found = True
-                    pid = proc.info['pid']
-                    break
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
-                
         self.last_run = time.time()
         
         if found:
@@ -103,24 +125,27 @@ class ProcessRunningProbe(Probe):
 class PortOpenProbe(Probe):
     """Checks if a TCP port is open"""
     
-    def __init__(self, name: str, interval: int, port: int, host: str = "localhost"):
-        super().__init__(name, interval)
+    def __init__(self, name: str, interval: int, port: int, host: str = "localhost",
+                 timeout: Optional[float] = None):
+        super().__init__(name, interval, timeout)
         self.port = int(port)
         self.host = host
         
     async def check(self) -> ProbeResult:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(1)
-        
+        # Non-blocking connect on the event loop; a little under the scheduler's
+        # timeout so a slow port is reported as closed rather than timed out
         try:
-            result = sock.connect_ex((self.host, self.port))
-            is_open = (result == 0)
-            msg = f"Port {self.host}:{self.port} is open" if is_open else f"Port {self.host}:{self.port} is closed"
+            _, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port),
+                                               timeout=self.timeout * 0.9)
+            writer.close()
+            is_open = True
+            msg = f"Port {self.host}:{self.port} is open"
+        except (OSError, asyncio.TimeoutError):
+            is_open = False
+            msg = f"Port {self.host}:{self.port} is closed"
         except Exception as e:
             is_open = False
             msg = f"Error checking port: {e}"
-        finally:
-            sock.close()
             
         self.last_run = time.time()
         
@@ -140,12 +165,19 @@ class ProbeFactory:
         name = config.name
         interval = config.interval
         params = config.params
+        timeout = params.get("timeout")
         
         if probe_type == "file_exists":
-            return FileExistsProbe(name, interval, params.get("path"))
+            return FileExistsProbe(name, interval, params.get("path"), timeout=timeout)
         elif probe_type == "process_running":
-            return ProcessRunningProbe(name, interval, params.get("process_name"))
+            return ProcessRunningProbe(name, interval, params.get("process_name"), timeout=timeout)
         elif probe_type == "port_open":
-            return PortOpenProbe(name, interval, params.get("port"), params.get("host", "localhost"))
+            return PortOpenProbe(name, interval, params.get("port"), params.get("host", "localhost"), timeout=timeout)
+        elif probe_type == "http":
+            from .http import HttpProbe
+            return HttpProbe(name, interval, params.get("url"), method=params.get("method", "GET"),
+                             expect_status=params.get("expect_status", 200),
+                             expect_body=params.get("expect_body"),
+                             max_latency_ms=params.get("max_latency_ms"), timeout=timeout)
         
         return None
@@ -0,0 +1,207 @@
+"""
+HTTP Probe - Async endpoint checks over a shared keep-alive connection pool
+"""
+
+import asyncio
+import ssl
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .base import Probe, ProbeResult
+
+# Idle connections kept per host; older ones are closed
+MAX_IDLE_PER_HOST = 4
+# Seconds an idle connection is reused for
+IDLE_TIMEOUT = 30.0
+# Body bytes kept for expect_body matching; the rest is read and dropped
+MAX_BODY = 64 * 1024
+# Latency samples kept per probe for percentiles
+LATENCY_WINDOW = 500
+
+_Conn = Tuple[asyncio.StreamReader, asyncio.StreamWriter, float]
+
+class HttpConnectionPool:
+    """Minimal HTTP/1.1 client that keeps connections open between requests
+
+    Connections are pooled per event loop and (scheme, host, port), so
+    frequent checks of a local service reuse one socket instead of doing a
+    TCP (and TLS) handshake every time.
+    """
+
+    def __init__(self, max_idle: int = MAX_IDLE_PER_HOST, idle_timeout: float = IDLE_TIMEOUT):
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self._idle: Dict[tuple, deque] = {}
+        self.connects = 0
+
+    async def request(self, method: str, url: str, max_body: int = MAX_BODY) -> Tuple[int, Dict[str, str], bytes]:
+        """Send one request; returns (status, lower-cased headers, body up to max_body bytes)"""
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        host = parts.hostname or "localhost"
+        port = parts.port or (443 if scheme == "https" else 80)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        key = (asyncio.get_running_loop(), scheme, host, port)
+
+        host_header = host if parts.port is None else f"{host}:{port}"
+        head = (f"{method} {target} HTTP/1.1\r\nHost: {host_header}\r\n"
+                "User-Agent: jessica-probe\r\nAccept: */*\r\nConnection: keep-alive\r\n\r\n").encode()
+
+        conn = self._acquire(key)
+        if conn is not None:
+            try:
+                return await self._exchange(key, conn, head, method, max_body)
+            except (ConnectionError, asyncio.IncompleteReadError, _StaleConnection):
+                pass  # server dropped the idle connection; retry on a fresh one
+        self._prune()
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=ssl.create_default_context() if scheme == "https" else None)
+        self.connects += 1
+        return await self._exchange(key, (reader, writer, time.monotonic()), head, method, max_body)
+
+    def _acquire(self, key) -> Optional[_Conn]:
+        idle = self._idle.get(key)
+        now = time.monotonic()
+        while idle:
+            reader, writer, used = idle.pop()
+            if now - used <= self.idle_timeout and not writer.is_closing() and not reader.at_eof():
+                return reader, writer, used
+            writer.close()
+        return None
+
+    def _release(self, key, reader, writer):
+        idle = self._idle.setdefault(key, deque())
+        idle.append((reader, writer, time.monotonic()))
+        while len(idle) > self.max_idle:
+            idle.popleft()[1].close()
+
+    def _prune(self):
+        """Forget connections of event loops that have gone away"""
+        for key in [k for k in self._idle if k[0].is_closed()]:
+            del self._idle[key]
+
+    async def _exchange(self, key, conn: _Conn, head: bytes, method: str, max_body: int):
+        reader, writer, _ = conn
+        ok = False
+        try:
+            writer.write(head)
+            await writer.drain()
+            status_line = await reader.readline()
+            if not status_line:
+                raise _StaleConnection()
+            version, status = status_line.decode("latin-1").split(" ", 2)[:2]
+            headers: Dict[str, str] = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            status = int(status)
+
+            reusable = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+            if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+                body = b""
+            elif "chunked" in headers.get("transfer-encoding", "").lower():
+                body = await self._read_chunked(reader, max_body)
+            elif "content-length" in headers:
+                body = await self._read_exact(reader, int(headers["content-length"]), max_body)
+            else:
+                body = (await reader.read())[:max_body]
+                reusable = False
+            ok = reusable
+            return status, headers, body
+        finally:
+            if ok:
+                self._release(key, reader, writer)
+            else:
+                writer.close()
+
+    @staticmethod
+    async def _read_exact(reader, length: int, max_body: int) -> bytes:
+        kept = bytearray()
+        while length > 0:
+            chunk = await reader.readexactly(min(length, 65536))
+            length -= len(chunk)
+            if len(kept) < max_body:
+                kept += chunk[:max_body - len(kept)]
+        return bytes(kept)
+
+    async def _read_chunked(self, reader, max_body: int) -> bytes:
+        kept = bytearray()
+        while True:
+            size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass  # trailers
+                return bytes(kept)
+            kept += await self._read_exact(reader, size, max_body - len(kept))
+            await reader.readexactly(2)
+
+class _StaleConnection(Exception):
+    pass
+
+http_pool = HttpConnectionPool()
+
+class HttpProbe(Probe):
+    """Checks an HTTP endpoint's status, body and latency
+
+    params: url, method (GET), expect_status (200, or a list), expect_body
+    (substring), max_latency_ms (slower responses fail).
+    """
+
+    def __init__(self, name: str, interval: int, url: str, method: str = "GET",
+                 expect_status: Any = 200, expect_body: Optional[str] = None,
+                 max_latency_ms: Optional[float] = None, timeout: Optional[float] = None,
+                 pool: Optional[HttpConnectionPool] = None):
+        super().__init__(name, interval, timeout)
+        self.url = url
+        self.method = method.upper()
+        statuses = expect_status if isinstance(expect_status, (list, tuple)) else [expect_status]
+        self.expect_status = {int(s) for s in statuses}
+        self.expect_body = expect_body
+        self.max_latency_ms = float(max_latency_ms) if max_latency_ms else None
+        self.pool = pool or http_pool
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+
+    def latency_percentiles(self) -> Dict[str, Optional[float]]:
+        """p50/p90/p99 latency in ms over the last LATENCY_WINDOW checks"""
+        ordered = sorted(self.latencies)
+
+        def pick(q):
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2) if ordered else None
+
+        return {"p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99), "samples": len(ordered)}
+
+    async def check(self) -> ProbeResult:
+        details: Dict[str, Any] = {"url": self.url}
+        start = time.perf_counter()
+        try:
+            # Leave a little room under the scheduler's timeout to report properly
+            status, _, body = await asyncio.wait_for(
+                self.pool.request(self.method, self.url), timeout=self.timeout * 0.9)
+        except asyncio.TimeoutError:
+            return self._result(False, f"{self.url} timed out", details)
+        except Exception as e:
+            return self._result(False, f"{self.url} unreachable: {e}", details)
+
+        latency = (time.perf_counter() - start) * 1000
+        self.latencies.append(latency)
+        details.update(status=status, latency_ms=round(latency, 2), latency=self.latency_percentiles())
+
+        failures: List[str] = []
+        if status not in self.expect_status:
+            failures.append(f"status {status}")
+        if self.expect_body and self.expect_body not in body.decode("utf-8", errors="replace"):
+            failures.append(f"body missing '{self.expect_body}'")
+        if self.max_latency_ms and latency > self.max_latency_ms:
+            failures.append(f"latency {latency:.0f}ms > {self.max_latency_ms:g}ms")
+        if failures:
+            return self._result(False, f"{self.url}: " + ", ".join(failures), details)
+        return self._result(True, f"{self.url} OK ({status}, {latency:.0f}ms)", details)
+
+    def _result(self, success: bool, message: str, details: Dict[str, Any]) -> ProbeResult:
+        self.last_run = time.time()
+        return ProbeResult(success=success, message=message, timestamp=self.last_run, details=details)
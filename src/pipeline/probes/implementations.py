@@ -1,7 +1,7 @@
 import os
-import psutil
 from typing import Any
 from .base import Probe, ProbeResult
+from src.watchdog.processes import process_sampler
 
 class FileProbe(Probe):
     """Checks if a file exists and optionally checks content"""
@@ -33,12 +33,8 @@ class ProcessProbe(Probe):
             return self.fail("Missing 'process_name' parameter")
             
         # Iterate over running processes
-        found = False
         try:
-            for proc in psutil.process_iter(['name']):
-                if proc.info['name'] == proc_name:
-                    found = True
-                    break
+            found = any(p["name"] == proc_name for p in process_sampler.snapshot().named(proc_name))
         except Exception as e:
             return self.fail(f"Error checking processes: {e}")
             
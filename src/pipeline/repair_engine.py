@@ -1,15 +1,75 @@
 import asyncio
-from typing import Dict, Any, Optional, Callable
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, Tuple
 from .probes.base import Probe, ProbeResult
 from src.core.brain import Brain
 
+# Generations allowed in a burst, then one per GENERATION_REFILL seconds
+GENERATION_BURST = 3
+GENERATION_REFILL = 60.0
+# Cached suggestions per failure signature
+SUGGESTION_CACHE_SIZE = 256
+SUGGESTION_TTL = 3600.0
+# Shown when generation fails; never cached, so the next failure tries again
+FALLBACK_SUGGESTION = "Check logs manually."
+
+# Only volatile tokens are masked; ports, paths and names identify the target
+_NORMALIZE = [
+    (re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.I), "<uuid>"),
+    (re.compile(r"0x[0-9a-f]+", re.I), "0x#"),
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?"), "<time>"),
+    (re.compile(r"\b\d+(\.\d+)?\s?(ms|s|sec|seconds)\b"), "<duration>"),
+    (re.compile(r"\s+"), " "),
+]
+
+def failure_signature(probe: Probe, result: ProbeResult) -> Tuple[str, str, str]:
+    """(probe type, probe name, message with ids, timestamps and durations masked)
+    
+    The probe name is part of the key because the suggestion prompt is
+    written for that probe.
+    """
+    message = result.message
+    for pattern, repl in _NORMALIZE:
+        message = pattern.sub(repl, message)
+    return type(probe).__name__, probe.name, message.strip()
+
+class TokenBucket:
+    """Allows `capacity` events at once, refilled at one per `refill` seconds"""
+    
+    def __init__(self, capacity: int = GENERATION_BURST, refill: float = GENERATION_REFILL):
+        self.capacity = capacity
+        self.refill = refill
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        
+    def try_acquire(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) / self.refill)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
 class RepairEngine:
-    """Analyzes failures and suggests repairs using the Custom Brain"""
+    """Analyzes failures and suggests repairs using the Custom Brain
     
-    def __init__(self, brain: Brain):
+    Suggestions are cached by failure signature, so a failure seen before
+    (or a flapping probe) reuses the earlier answer. New generations are
+    rate limited by a token bucket, and identical failures arriving
+    together share one generation.
+    """
+    
+    def __init__(self, brain: Brain, bucket: Optional[TokenBucket] = None):
         self.brain = brain
         self.active_repairs: Dict[str, Any] = {}
         self.repair_callback: Optional[Callable[[str, str, str], None]] = None
+        self.bucket = bucket or TokenBucket()
+        self._suggestions: "OrderedDict[Tuple[str, str, str], Tuple[str, float]]" = OrderedDict()
+        self._pending: Dict[Tuple[str, str, str], asyncio.Future] = {}
+        self.stats = {"generated": 0, "failed": 0, "cache_hits": 0, "rate_limited": 0}
         
     def set_repair_callback(self, callback: Callable[[str, str, str], None]):
         """Set callback to notify UI of repair suggestions"""
@@ -17,14 +77,17 @@ class RepairEngine:
         
     async def handle_failure(self, probe: Probe, result: ProbeResult):
         """Handle a probe failure"""
-        if probe.name in self.active_repairs:
+        if self.active_repairs.get(probe.name, {}).get("status", "rate_limited") != "rate_limited":
             return
             
         print(f"🔧 Repair Engine analyzing failure: {probe.name}")
         self.active_repairs[probe.name] = {"status": "analyzing", "timestamp": result.timestamp}
         
-        # Ask Brain for repair suggestion
-        suggestion = await self._generate_suggestion(probe, result)
+        # Ask Brain for repair suggestion (cached per failure signature)
+        suggestion = await self._suggest(probe, result)
+        if suggestion is None:
+            self.active_repairs[probe.name]["status"] = "rate_limited"
+            return
         
         # Auto-Approval Logic (Low Risk)
         is_safe = self._is_safe_repair(suggestion)
@@ -41,8 +104,48 @@ class RepairEngine:
         else:
             self.active_repairs[probe.name]["status"] = "no_suggestion"
             
-    async def _generate_suggestion(self, probe: Probe, result: ProbeResult) -> str:
-        """Generate repair suggestion using the Brain"""
+    async def _suggest(self, probe: Probe, result: ProbeResult) -> Optional[str]:
+        """Cached suggestion for this failure signature; None when rate limited"""
+        signature = failure_signature(probe, result)
+        cached = self._suggestions.get(signature)
+        if cached is not None and time.time() - cached[1] < SUGGESTION_TTL:
+            self._suggestions.move_to_end(signature)
+            self.stats["cache_hits"] += 1
+            return cached[0]
+            
+        pending = self._pending.get(signature)
+        if pending is not None:
+            self.stats["cache_hits"] += 1
+            return await asyncio.shield(pending)
+            
+        if not self.bucket.try_acquire():
+            self.stats["rate_limited"] += 1
+            print(f"🔧 Repair generation rate limited: {probe.name}")
+            return None
+            
+        future = asyncio.get_running_loop().create_future()
+        self._pending[signature] = future
+        try:
+            suggestion = await self._generate_suggestion(probe, result)
+            if suggestion is None:
+                self.stats["failed"] += 1
+                suggestion = FALLBACK_SUGGESTION
+            else:
+                self.stats["generated"] += 1
+                self._suggestions[signature] = (suggestion, time.time())
+                while len(self._suggestions) > SUGGESTION_CACHE_SIZE:
+                    self._suggestions.popitem(last=False)
+            future.set_result(suggestion)
+            return suggestion
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # retrieved; waiters re-raise it themselves
+            raise
+        finally:
+            del self._pending[signature]
+            
+    async def _generate_suggestion(self, probe: Probe, result: ProbeResult) -> Optional[str]:
+        """Generate repair suggestion using the Brain; None if generation failed"""
         prompt = f"""SYSTEM REPAIR REQUEST
 The system probe '{probe.name}' has FAILED.
 Error: {result.message}
@@ -51,13 +154,12 @@ Task: Suggest a specific shell command to fix this.
 Constraint: Return ONLY the command if possible, or a 1-sentence description.
 """
         try:
-            # Use Brain's process_input (simulating a system user)
-            # We don't want to trigger confirmation dialogs for the *generation* part
-            response = await self.brain.process_input(prompt)
+            # System prompt: no tools, no training sample, no chat history
+            response = await self.brain.process_input(prompt, system=True)
             return response.strip()
         except Exception as e:
             print(f"Error generating repair suggestion: {e}")
-            return "Check logs manually."
+            return None
 
     def _is_safe_repair(self, suggestion: str) -> bool:
         """Determine if a repair is safe to auto-approve"""
@@ -0,0 +1,120 @@
+import threading
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Dict, Optional, Sequence
+
+# Bucket upper bounds in seconds, shared by every scheduler histogram
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# Recent runs kept for /scheduler/metrics
+RECENT_RUNS = 50
+
+
+class Histogram:
+    """Fixed-bucket histogram; percentiles are estimated from bucket bounds."""
+
+    def __init__(self, bounds: Sequence[float] = BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        value = max(0.0, value)
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [str(b) for b in self.bounds] + ["+Inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "max": round(self.max, 6),
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class SchedulerMetrics:
+    """Per-run timing of the scheduler, aggregated into histograms.
+
+    - lateness: actual start minus the scheduled fire time;
+    - queue_wait: actual start minus dispatch to the pool;
+    - jitter: change in a task's lateness from its previous run;
+    - duration: run time of the task's process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.lateness = Histogram()
+        self.queue_wait = Histogram()
+        self.jitter = Histogram()
+        self.duration = Histogram()
+        self.status: Dict[str, int] = {}
+        self.skipped = 0
+        self.lost_claims = 0
+        self._last_lateness: Dict[int, float] = {}
+        self._recent: deque = deque(maxlen=RECENT_RUNS)
+
+    def record_run(self, task_id: int, scheduled: float, dispatched: float, started: float,
+                   finished: float, status: str, returncode: Optional[int]) -> Dict[str, Any]:
+        lateness = max(0.0, started - scheduled)
+        run = {
+            "task_id": task_id,
+            "scheduled": scheduled,
+            "started": started,
+            "lateness": round(lateness, 6),
+            "queue_wait": round(max(0.0, started - dispatched), 6),
+            "duration": round(max(0.0, finished - started), 6),
+            "status": status,
+            "returncode": returncode,
+        }
+        with self._lock:
+            self.lateness.observe(lateness)
+            self.queue_wait.observe(started - dispatched)
+            self.duration.observe(finished - started)
+            previous = self._last_lateness.get(task_id)
+            if previous is not None:
+                self.jitter.observe(abs(lateness - previous))
+            self._last_lateness[task_id] = lateness
+            self.status[status] = self.status.get(status, 0) + 1
+            self._recent.append(run)
+        return run
+
+    def record_skip(self) -> None:
+        with self._lock:
+            self.skipped += 1
+
+    def record_lost_claim(self) -> None:
+        with self._lock:
+            self.lost_claims += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "runs": sum(self.status.values()),
+                "status": dict(self.status),
+                "skipped": self.skipped,
+                "lost_claims": self.lost_claims,
+                "lateness": self.lateness.snapshot(),
+                "queue_wait": self.queue_wait.snapshot(),
+                "jitter": self.jitter.snapshot(),
+                "duration": self.duration.snapshot(),
+                "recent": list(self._recent),
+            }
@@ -1,88 +1,452 @@
+import calendar
+import heapq
 import json
 import os
+import signal
+import socket
+import sys
 import threading
 import time
-from datetime import datetime
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import subprocess
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 from data import db
+from src.scheduler.metrics import SchedulerMetrics
+from src.scheduler.output import TaskOutput, pump, start_output
 from croniter import croniter
 import dateutil.parser
 
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 
+# Fields that define when a task fires; a change to any of them reschedules it
+SCHEDULE_FIELDS = ("schedule_type", "interval_seconds", "cron_expr", "iso_time")
+
+# Per-command timeout when a task doesn't set timeout_seconds
+DEFAULT_TIMEOUTS = {"python": 20, "echo": 10, "dir": 10}
+
+# Seconds a claimed run stays leased without renewal
+LEASE_TTL = 30.0
+
+
+def _to_epoch(dt: datetime) -> float:
+    # Naive datetimes are UTC (sqlite CURRENT_TIMESTAMP, utcnow)
+    return calendar.timegm(dt.utctimetuple()) + dt.microsecond / 1e6
+
+
+def _from_epoch(ts: float) -> datetime:
+    return datetime(1970, 1, 1) + timedelta(seconds=ts)
+
+
+class TaskBusyError(RuntimeError):
+    """A run with the same concurrency key is already in flight."""
+
+
+def _kill_tree(proc: subprocess.Popen):
+    """Kill a run's process and whatever it started (they may hold its pipes open)."""
+    try:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except Exception:
+        pass
+    try:
+        proc.kill()
+    except Exception:
+        pass
+
+
+def _pump_and_close(pipe, output: TaskOutput, stream: str):
+    # The fd is closed by the thread reading it, never under a live read
+    try:
+        pump(pipe.fileno(), output, stream)
+    finally:
+        pipe.close()
+
+
+class RunHandle:
+    """A task run in flight; cancel() kills its process."""
+
+    def __init__(self, task_id: int, key: str):
+        self.task_id = task_id
+        self.key = key
+        self.started = time.time()
+        self.scheduled = self.started  # fire time the run was due at
+        self.dispatched = self.started  # handed to the pool
+        self.cancelled = threading.Event()
+        self.timed_out = False
+        self.fence: Optional[int] = None
+        self.proc: Optional[subprocess.Popen] = None
+        self.output: Optional[TaskOutput] = None
+
+    def cancel(self):
+        self.cancelled.set()
+        proc = self.proc
+        if proc is not None and proc.poll() is None:
+            _kill_tree(proc)
+
+
+def concurrency_key(task_row) -> str:
+    """Runs sharing a key never overlap; by default a task only excludes itself."""
+    return task_row["concurrency_key"] or f"task:{task_row['id']}"
+
+
+def task_timeout(task_row) -> int:
+    return int(task_row["timeout_seconds"] or DEFAULT_TIMEOUTS.get(task_row["command"].lower(), 20))
+
+
+def next_fire_time(task_row, now: float, last_run: Optional[float]) -> Optional[float]:
+    """Epoch seconds when a task should next run, or None if it never will again.
+
+    last_run is the start of the previous run (None if it never ran).
+    """
+    stype = task_row["schedule_type"] or "interval"
+    if stype == "interval":
+        interval = int(task_row["interval_seconds"] or 0)
+        if last_run is None:
+            return now
+        return last_run + interval
+    elif stype == "cron":
+        expr = task_row["cron_expr"]
+        if not expr:
+            return None
+        # Never-run cron tasks fire once straight away, as before
+        base = _from_epoch(last_run) if last_run is not None else _from_epoch(now) - timedelta(days=365)
+        try:
+            return _to_epoch(croniter(expr, base).get_next(datetime))
+        except Exception:
+            return None
+    elif stype == "iso":
+        iso = task_row["iso_time"]
+        if not iso or last_run is not None:
+            return None
+        try:
+            tgt = dateutil.parser.parse(iso)
+        except Exception:
+            return None
+        return _to_epoch(tgt)
+    return None
+
 
 class SchedulerWorker:
-    def __init__(self, interval: int = 10):
-        self._interval = interval
+    """Runs scheduled tasks from a min-heap of precomputed next-fire times.
+
+    The thread sleeps until the earliest fire time (or until refresh() is
+    called after a task is added, changed or removed), so idle cost does not
+    grow with the number of tasks. Schedules are only parsed when a task is
+    loaded or after it runs, never on every tick.
+
+    Due tasks run on a bounded thread pool, each with its own timeout. If a
+    run comes due while another run with the same concurrency key is still in
+    flight, it is skipped and the task is rescheduled from now.
+
+    Several processes may run a worker against the same database (e.g. uvicorn
+    with multiple workers). Each run is claimed through a lease in
+    task_leases first; the loser reschedules from the winner's start time. The
+    winner renews its lease while the run is in flight, and its result is
+    only recorded if its fencing token is still current.
+    """
+
+    def __init__(self, resync_interval: float = 300.0, max_workers: int = 4,
+                 owner: Optional[str] = None, lease_ttl: float = LEASE_TTL):
+        # Periodic reload catches tasks written to the DB outside the scheduler API
+        self._resync_interval = resync_interval
+        self._max_workers = max_workers
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lease_ttl = lease_ttl
+        self._next_renew = 0.0
+        self._pool: Optional[ThreadPoolExecutor] = None
         self._stop = threading.Event()
+        self._wake = threading.Event()
         self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._heap: List[Tuple[float, int, int]] = []  # (fire_at, version, task_id)
+        self._tasks: Dict[int, dict] = {}  # task_id -> {"row", "next", "version", "fence"}
+        self._running: Dict[str, RunHandle] = {}  # concurrency key -> run in flight
+        self.metrics = SchedulerMetrics()
+        self._publisher = None
+        self._version = 0
+        self._dirty = True
+        self._next_resync = 0.0
 
     def start(self):
         if self._thread and self._thread.is_alive():
             return
+        self._stop.clear()
+        self._dirty = True
+        self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="scheduler-task")
         self._thread = threading.Thread(target=self._run, daemon=True)
         self._thread.start()
 
     def stop(self):
         self._stop.set()
+        self._wake.set()
         if self._thread:
             self._thread.join(timeout=2)
+        with self._lock:
+            running = list(self._running.values())
+        for handle in running:
+            handle.cancel()
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def refresh(self):
+        """Reload tasks from the DB on the next loop iteration (call after task changes)."""
+        self._dirty = True
+        self._wake.set()
+
+    def set_publisher(self, fn):
+        """Attach a callable that receives a "scheduler_run" event after each run."""
+        self._publisher = fn
+
+    def run_now(self, task_row) -> Tuple[RunHandle, Optional[int], str, str]:
+        """Run a task immediately on the caller's thread, outside its schedule.
+
+        Output is capped and live-tailable like a scheduled run; nothing is stored.
+        The run holds the task's concurrency key, so it can be cancelled and
+        never overlaps a scheduled run. Raises TaskBusyError if the key is taken.
+        """
+        key = concurrency_key(task_row)
+        handle = RunHandle(task_row["id"], key)
+        with self._lock:
+            if key in self._running:
+                raise TaskBusyError(f"Task {task_row['id']} is already running")
+            self._running[key] = handle
+        try:
+            rc, out, err = self._execute_task(task_row, handle)
+        finally:
+            with self._lock:
+                self._running.pop(key, None)
+            self._wake.set()
+        return handle, rc, out, err
+
+    def cancel(self, task_id: int) -> bool:
+        """Kill the in-flight run of a task. Returns False if it isn't running."""
+        with self._lock:
+            handles = [h for h in self._running.values() if h.task_id == task_id]
+        for handle in handles:
+            handle.cancel()
+        return bool(handles)
+
+    def running(self) -> List[dict]:
+        with self._lock:
+            return [
+                {"task_id": h.task_id, "key": h.key, "started": h.started, "fence": h.fence}
+                for h in self._running.values()
+            ]
+
+    def next_runs(self) -> Dict[int, float]:
+        """Task id -> next fire time (epoch seconds) for every scheduled task."""
+        with self._lock:
+            return {tid: t["next"] for tid, t in self._tasks.items() if t["next"] is not None}
 
     def _run(self):
         while not self._stop.is_set():
             try:
-                tasks = db.get_due_tasks()
-                now = datetime.utcnow()
-                for t in tasks:
-                    if not self._is_due(t, now):
-                        continue
-                    rc, out, err = self._execute_task(t)
-                    db.log_task_result(t["id"], rc, out, err)
-                    db.mark_task_run(t["id"])  # sqlite3.Row supports key access
+                now = time.time()
+                if self._dirty or now >= self._next_resync:
+                    self._reload(now)
+                for task_id, row, fire_at in self._pop_due(time.time()):
+                    self._dispatch(task_id, row, fire_at)
+                if time.time() >= self._next_renew:
+                    self._renew_leases()
             except Exception:
                 # Avoid crashing the loop; in production, log the exception
                 pass
-            self._stop.wait(self._interval)
-
-    def _is_due(self, task_row, now: datetime) -> bool:
-        stype = task_row["schedule_type"] or "interval"
-        last_run = task_row.get("last_run") if isinstance(task_row, dict) else task_row["last_run"] if "last_run" in task_row.keys() else None
-        if stype == "interval":
-            interval = int(task_row.get("interval_seconds") if isinstance(task_row, dict) else task_row["interval_seconds"]) or 0
-            if last_run is None:
-                return True
-            try:
-                last = dateutil.parser.parse(last_run)
-            except Exception:
-                return True
-            return (now - last).total_seconds() >= interval
-        elif stype == "cron":
-            expr = task_row.get("cron_expr") if isinstance(task_row, dict) else task_row["cron_expr"]
-            if not expr:
-                return False
-            base = dateutil.parser.parse(last_run) if last_run else now.replace(year=now.year - 1)
+            self._wake.wait(self._sleep_time())
+            self._wake.clear()
+
+    def _dispatch(self, task_id: int, row, scheduled: float):
+        key = concurrency_key(row)
+        with self._lock:
+            busy = key in self._running
+            if not busy:
+                handle = RunHandle(task_id, key)
+                handle.scheduled = scheduled
+                self._running[key] = handle
+            entry = self._tasks.get(task_id)
+            fence = entry["fence"] if entry else 0
+        if busy:
+            # Skipped-run policy: never queue behind an in-flight run
+            self.metrics.record_skip()
+            self._reschedule(task_id, time.time())
+            return
+        try:
+            handle.fence = db.claim_task_run(task_id, self.owner, fence, self._lease_ttl)
+        except Exception:
+            handle.fence = None
+        if handle.fence is None:
+            with self._lock:
+                self._running.pop(key, None)
+            self._claim_lost(task_id)
+            return
+        try:
+            handle.dispatched = time.time()
+            self._pool.submit(self._run_task, task_id, row, handle)
+        except Exception:
+            with self._lock:
+                self._running.pop(key, None)
+            # The claimed run never started; let the lease lapse
+            self._reschedule(task_id, time.time(), handle.fence)
+
+    def _claim_lost(self, task_id: int):
+        # Another process claimed this run (or still holds the lease): follow its schedule
+        self.metrics.record_lost_claim()
+        lease = None
+        try:
+            lease = db.get_task_lease(task_id)
+        except Exception:
+            pass
+        if lease is None or lease["claimed_at"] is None:
+            self._reschedule(task_id, time.time())
+        else:
+            self._reschedule(task_id, lease["claimed_at"], lease["fence"])
+
+    def _run_task(self, task_id: int, row, handle: RunHandle):
+        handle.started = time.time()
+        rc, status = None, "error"
+        finished = False
+        try:
+            rc, out, err = self._execute_task(row, handle)
+            if handle.cancelled.is_set():
+                status = "cancelled"
+            elif handle.timed_out:
+                status = "timeout"
+            else:
+                status = "ok" if rc == 0 else "failed"
+            overflow = handle.output.streams if handle.output else {}
+            recorded = db.finish_task_run(
+                task_id, self.owner, handle.fence, rc, out, err,
+                stdout_overflow=overflow["stdout"].overflow_blob() if overflow else None,
+                stderr_overflow=overflow["stderr"].overflow_blob() if overflow else None,
+            )
+            finished = True
+            if not recorded:
+                # Lease expired and was re-claimed elsewhere; that run owns the result
+                status = "fenced"
+        except Exception as e:
+            status = "error"
+            print(f"Scheduled task {task_id} failed to run: {e!r}", file=sys.stderr)
             try:
-                itr = croniter(expr, base)
-                next_time = itr.get_next(datetime)
-                return now >= next_time
+                # Keep the error as the run's result; this also releases the lease
+                finished = True
+                if not db.finish_task_run(task_id, self.owner, handle.fence, None, "", f"Error: {e!r}"):
+                    status = "fenced"
             except Exception:
-                return False
-        elif stype == "iso":
-            iso = task_row.get("iso_time") if isinstance(task_row, dict) else task_row["iso_time"]
-            if not iso:
-                return False
+                finished = False
+        finally:
+            if not finished and handle.fence is not None:
+                try:
+                    db.release_task_lease(task_id, self.owner, handle.fence)
+                except Exception:
+                    pass  # expires after the lease TTL instead
+            with self._lock:
+                self._running.pop(handle.key, None)
+            self._record(handle, status, rc)
+            self._reschedule(task_id, handle.started, handle.fence)
+            self._wake.set()
+
+    def _record(self, handle: RunHandle, status: str, rc: Optional[int]):
+        try:
+            run = self.metrics.record_run(handle.task_id, handle.scheduled, handle.dispatched,
+                                          handle.started, time.time(), status, rc)
+            if callable(self._publisher):
+                self._publisher({"type": "scheduler_run", "data": run})
+        except Exception:
+            pass
+
+    def _renew_leases(self):
+        self._next_renew = time.time() + self._lease_ttl / 3
+        with self._lock:
+            running = list(self._running.values())
+        for handle in running:
+            if handle.fence is None:
+                continue
             try:
-                tgt = dateutil.parser.parse(iso)
-                # Run only once: if never run and now >= tgt
-                return last_run is None and now >= tgt
+                held = db.renew_task_lease(handle.task_id, self.owner, handle.fence, self._lease_ttl)
             except Exception:
-                return False
-        return False
+                continue  # DB busy; retry on the next renewal
+            if not held:
+                handle.cancel()
 
-    def _execute_task(self, task_row):
+    def _sleep_time(self) -> float:
+        now = time.time()
+        until = self._next_resync
+        with self._lock:
+            if self._heap:
+                until = min(until, self._heap[0][0])
+            if self._running:
+                until = min(until, self._next_renew)
+        return max(0.0, until - now)
+
+    def _push(self, task_id: int, fire_at: Optional[float], fence: Optional[int] = None):
+        # Caller holds self._lock
+        self._version += 1
+        entry = self._tasks[task_id]
+        entry["next"] = fire_at
+        entry["version"] = self._version
+        if fence is not None:
+            entry["fence"] = max(entry["fence"], fence)
+        if fire_at is not None:
+            heapq.heappush(self._heap, (fire_at, self._version, task_id))
+
+    def _reload(self, now: float):
+        self._dirty = False
+        self._next_resync = now + self._resync_interval
+        rows = db.get_due_tasks()
+        with self._lock:
+            previous = self._tasks
+            self._tasks = {}
+            self._heap = []
+            for row in rows:
+                task_id = row["id"]
+                old = previous.get(task_id)
+                self._tasks[task_id] = {"row": row, "next": None, "version": 0, "fence": row["fence"]}
+                if old is not None:
+                    self._tasks[task_id]["fence"] = max(old["fence"], row["fence"])
+                if (old is not None and old["fence"] >= row["fence"]
+                        and all(old["row"][f] == row[f] for f in SCHEDULE_FIELDS)):
+                    # Unchanged schedule and no runs elsewhere: keep the in-memory (sub-second) fire time
+                    self._push(task_id, old["next"])
+                    continue
+                last_run = None
+                if row["claimed_at"] is not None:
+                    last_run = row["claimed_at"]
+                elif row["last_run"]:
+                    try:
+                        last_run = _to_epoch(dateutil.parser.parse(row["last_run"]))
+                    except Exception:
+                        last_run = None
+                fire_at = next_fire_time(row, now, last_run)
+                # Runs missed while no scheduler was up are due now, not "late" by the downtime
+                self._push(task_id, None if fire_at is None else max(fire_at, now))
+
+    def _pop_due(self, now: float) -> List[Tuple[int, object, float]]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                fire_at, version, task_id = heapq.heappop(self._heap)
+                entry = self._tasks.get(task_id)
+                if entry is None or entry["version"] != version:
+                    continue  # superseded by a reschedule or reload
+                entry["next"] = None
+                due.append((task_id, entry["row"], fire_at))
+        return due
+
+    def _reschedule(self, task_id: int, started: float, fence: Optional[int] = None):
+        with self._lock:
+            entry = self._tasks.get(task_id)
+            if entry is None or entry["next"] is not None:
+                return
+            self._push(task_id, next_fire_time(entry["row"], time.time(), started), fence)
+
+    def _execute_task(self, task_row, handle: Optional[RunHandle] = None):
         command = task_row["command"].lower()
         args_json = task_row["args_json"]
         args = []
@@ -103,15 +467,56 @@ class SchedulerWorker:
             if not os.path.isfile(target):
                 return None, "", "File not found"
             full = ["python", target] + args[1:]
-            p = subprocess.run(full, capture_output=True, text=True, timeout=20, shell=False)
-            return p.returncode, p.stdout, p.stderr
+            return self._run_process(full, False, task_timeout(task_row), handle)
         elif command in {"echo", "dir"}:
             full = [command] + args
-            p = subprocess.run(full, capture_output=True, text=True, timeout=10, shell=True)
-            return p.returncode, p.stdout, p.stderr
+            return self._run_process(full, True, task_timeout(task_row), handle)
         else:
             # Unsupported command; ignore
             return None, "", "Unsupported command"
 
+    def _run_process(self, full: List[str], shell: bool, timeout: int, handle: Optional[RunHandle]):
+        # Output is streamed through bounded captures instead of buffered whole
+        output = start_output(handle.task_id) if handle is not None else TaskOutput(0)
+        # Own session, so a timeout or cancel can kill the shell's children too
+        p = subprocess.Popen(full, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=shell,
+                             start_new_session=(os.name != "nt"))
+        if handle is not None:
+            handle.output = output
+            handle.proc = p
+            if handle.cancelled.is_set():
+                _kill_tree(p)
+        pumps = [
+            threading.Thread(target=_pump_and_close, args=(p.stdout, output, "stdout"), daemon=True),
+            threading.Thread(target=_pump_and_close, args=(p.stderr, output, "stderr"), daemon=True),
+        ]
+        for t in pumps:
+            t.start()
+        note = ""
+        try:
+            rc = p.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill_tree(p)
+            p.wait()
+            rc = None
+            note = f"Timed out after {timeout}s"
+            if handle is not None:
+                handle.timed_out = True
+        # Children left behind can keep the pipes open; give them a moment, then
+        # kill them so the pumps see EOF
+        for t in pumps:
+            t.join(timeout=2)
+        if any(t.is_alive() for t in pumps):
+            _kill_tree(p)
+            for t in pumps:
+                t.join(timeout=2)
+        if handle is not None and handle.cancelled.is_set():
+            rc = None
+            note = "Cancelled"
+        if note:
+            output.write("stderr", "\n" + note)
+        output.finish(rc)
+        return rc, output.streams["stdout"].text(), output.streams["stderr"].text()
+
 
-worker_singleton = SchedulerWorker(interval=10)
\ No newline at end of file
+worker_singleton = SchedulerWorker()
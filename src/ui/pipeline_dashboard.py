@@ -6,6 +6,7 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QScrollArea, QFrame, QPushButton, QProgressBar)
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont, QColor
+from qasync import asyncSlot
 
 class PipelineDashboard(QWidget):
     def __init__(self, pipeline_manager, probe_scheduler, repair_engine):
@@ -13,6 +14,8 @@ class PipelineDashboard(QWidget):
         self.pipeline_manager = pipeline_manager
         self.probe_scheduler = probe_scheduler
         self.repair_engine = repair_engine
+        # pipeline name -> last step run summary ("running" while in flight)
+        self.step_runs = {}
         
         self.setWindowTitle("Pipeline Intelligence Dashboard")
         self.resize(800, 600)
@@ -128,6 +131,18 @@ class PipelineDashboard(QWidget):
             health_lbl = QLabel("HEALTHY" if is_healthy else "ISSUES DETECTED")
             health_lbl.setStyleSheet(f"color: {'#4ec9b0' if is_healthy else '#f48771'}; font-weight: bold;")
             p_header.addWidget(health_lbl)
+
+            # Step runner
+            if pipeline.steps:
+                last_run = self.step_runs.get(pipeline.name)
+                if last_run:
+                    run_lbl = QLabel(last_run)
+                    run_lbl.setStyleSheet("color: #808080;")
+                    p_header.addWidget(run_lbl)
+                run_btn = QPushButton("Running..." if last_run == "running" else "Run Steps")
+                run_btn.setEnabled(last_run != "running")
+                run_btn.clicked.connect(lambda checked, n=pipeline.name: self.run_pipeline(n))
+                p_header.addWidget(run_btn)
             
             card_layout.addLayout(p_header)
             
@@ -159,7 +174,17 @@ class PipelineDashboard(QWidget):
                 if status.get("status") == "failed":
                     msg_lbl.setStyleSheet("color: #f48771;")
                 probe_row.addWidget(msg_lbl, 1)
-                
+
+                # Last hour trend (uptime / flapping)
+                trend = status.get("trend") or {}
+                if trend.get("uptime") is not None:
+                    trend_text = f"{trend['uptime'] * 100:.0f}% 1h"
+                    if trend.get("flaps"):
+                        trend_text += f" · {trend['flaps']} flaps"
+                    trend_lbl = QLabel(trend_text)
+                    trend_lbl.setStyleSheet(f"color: {'#ce9178' if trend.get('flaps') else '#808080'};")
+                    probe_row.addWidget(trend_lbl)
+
                 # Repair Button (if failed)
                 if status.get("status") == "failed":
                     repair_info = self.repair_engine.active_repairs.get(probe_config.name)
@@ -177,6 +202,21 @@ class PipelineDashboard(QWidget):
                 
             self.content_layout.addWidget(card)
             
+    @asyncSlot(str)
+    async def run_pipeline(self, name):
+        """Run a pipeline's steps and show the outcome on its card"""
+        self.step_runs[name] = "running"
+        self.update_status()
+        try:
+            results = await self.pipeline_manager.run_pipeline(name)
+            counts = {}
+            for result in results.values():
+                counts[result.status] = counts.get(result.status, 0) + 1
+            self.step_runs[name] = ", ".join(f"{n} {status}" for status, n in counts.items())
+        except Exception as e:
+            self.step_runs[name] = f"error: {e}"
+        self.update_status()
+            
     def show_repair(self, probe_name):
         """Show repair suggestion dialog"""
         repair_info = self.repair_engine.active_repairs.get(probe_name)
@@ -1,42 +1,139 @@
+import glob
+import json
+import os
 import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 
-COMMON_PATTERNS = [
-    (
-        re.compile(r"NullReferenceException", re.I),
-        {
-            "title": "Unity NullReferenceException",
-            "docs": "https://docs.unity3d.com/ScriptReference/NullReferenceException.html",
-            "suggest": "Check for missing component references; add null checks",
-            "command": None,
-        },
-    ),
-    (
-        re.compile(r"Shader error", re.I),
-        {
-            "title": "Unity Shader Compilation Error",
-            "docs": "https://docs.unity3d.com/Manual/SL-ShaderCompileErrors.html",
-            "suggest": "Open shader inspector; fix syntax; verify include paths",
-            "command": None,
-        },
-    ),
-    (
-        re.compile(r"404|network error|failed to fetch", re.I),
-        {
-            "title": "Browser Network Error",
-            "docs": "https://developer.mozilla.org/en-US/docs/Web/HTTP/Status/404",
-            "suggest": "Verify URL, CORS, and server availability",
-            "command": None,
-        },
-    ),
-]
+# Rule packs: every *.json here (and in WATCHDOG_RULES_DIR, if set), in file-name order
+RULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules")
+CACHE_MAX_ENTRIES = 10000
+
+_REC_FIELDS = ("title", "docs", "suggest", "command")
+# Leading global inline flags, e.g. "(?i)"; only allowed at the very start of a whole regex
+_GLOBAL_FLAGS = re.compile(r"^\(\?([aiLmsux]+)\)")
+
+
+def _wrap(pattern: str, ignore_case: bool) -> str:
+    """The rule as it appears inside the combined regex."""
+    return f"{'(?i:' if ignore_case else '(?:'}{pattern})"
+
+
+class RuleSet:
+    """Rule packs compiled into one regex.
+
+    Each rule becomes a named alternative inside a zero-width lookahead, so a
+    single left-to-right scan sees every position where any rule matches; the
+    earliest-listed matching rule wins, as with checking rules one by one.
+    """
+
+    def __init__(self, rules: List[Tuple[str, bool, Dict[str, Any]]]):
+        self.recommendations = [rec for _, _, rec in rules]
+        parts = [
+            f"(?P<r{i}>{_wrap(pattern, ignore_case)})"
+            for i, (pattern, ignore_case, _) in enumerate(rules)
+        ]
+        self._regex = re.compile("(?=" + "|".join(parts) + ")") if parts else None
+
+    def __len__(self) -> int:
+        return len(self.recommendations)
+
+    def match(self, message: str) -> Optional[Dict[str, Any]]:
+        if self._regex is None:
+            return None
+        best = None
+        for m in self._regex.finditer(message):
+            i = int(m.lastgroup[1:])
+            if best is None or i < best:
+                best = i
+                if best == 0:
+                    break
+        return None if best is None else self.recommendations[best]
+
+
+def load_rules(dirs: List[str]) -> RuleSet:
+    """Read rule packs; rules with a bad or missing pattern are skipped (and reported)."""
+    rules = []
+    for directory in dirs:
+        for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    pack = json.load(f)
+            except Exception:
+                continue
+            for rule in pack.get("rules", []):
+                pattern = rule.get("pattern")
+                ignore_case = bool(rule.get("ignore_case", True))
+                if not isinstance(pattern, str) or re.search(r"\\\d|\(\?P=", pattern):
+                    print(f"Skipping watchdog rule in {path}: missing pattern or backreference")
+                    continue  # backreferences don't survive being combined
+                # Rule-local named groups would clash in the combined regex
+                pattern = re.sub(r"\(\?P<\w+>", "(?:", pattern)
+                # Global flags can't sit inside the combined regex; scope them to the rule
+                flags = _GLOBAL_FLAGS.match(pattern)
+                if flags:
+                    pattern = f"(?{flags.group(1)}:{pattern[flags.end():]})"
+                try:
+                    re.compile(_wrap(pattern, ignore_case))
+                except re.error as e:
+                    print(f"Skipping watchdog rule in {path}: {e}")
+                    continue
+                rules.append((pattern, ignore_case, {k: rule.get(k) for k in _REC_FIELDS}))
+    return RuleSet(rules)
+
+
+_lock = threading.Lock()
+_ruleset: Optional[RuleSet] = None
+# (source, message) -> recommendation or None
+_cache: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+
+
+def _rule_dirs() -> List[str]:
+    dirs = [RULES_DIR]
+    extra = os.getenv("WATCHDOG_RULES_DIR")
+    if extra:
+        dirs.append(extra)
+    return dirs
+
+
+def get_ruleset() -> RuleSet:
+    global _ruleset
+    if _ruleset is None:
+        with _lock:
+            if _ruleset is None:
+                _ruleset = load_rules(_rule_dirs())
+    return _ruleset
+
+
+def reload_rules() -> int:
+    """Re-read the rule packs and drop cached suggestions. Returns the rule count."""
+    global _ruleset
+    ruleset = load_rules(_rule_dirs())
+    with _lock:
+        _ruleset = ruleset
+        _cache.clear()
+    return len(ruleset)
+
+
+def recommend(source: str, message: str) -> Optional[Dict[str, Any]]:
+    # Keyed by exact text: fingerprints mask numbers that rules may match on (e.g. 404)
+    key = (source, message)
+    try:
+        return _cache[key]
+    except KeyError:
+        pass
+    rec = get_ruleset().match(message)
+    with _lock:
+        if len(_cache) >= CACHE_MAX_ENTRIES:
+            _cache.clear()
+        _cache[key] = rec
+    return rec
 
 
 def suggest_actions_for_events(events):
     suggestions = []
     for e in events:
-        msg = e.get("message", "")
-        for pat, rec in COMMON_PATTERNS:
-            if pat.search(msg):
-                suggestions.append({"event": e, "recommendation": rec})
-                break
-    return suggestions
\ No newline at end of file
+        rec = recommend(e.get("source", ""), e.get("message", ""))
+        if rec is not None:
+            suggestions.append({"event": e, "recommendation": rec})
+    return suggestions
@@ -0,0 +1,191 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from typing import List, Optional
+
+# Bytes read per read_lines() call; a bigger backlog is picked up on the next call
+MAX_READ = 4 * 1024 * 1024
+# Longest line kept; the rest of an oversized line is dropped
+MAX_LINE = 64 * 1024
+
+_IN_MODIFY = 0x002
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Minimal inotify watch on a directory, filtered to one file name (Linux only)."""
+
+    def __init__(self, directory: str, name: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._name = name.encode()
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = _IN_MODIFY | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), mask) < 0:
+            os.close(self._fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+        # Self-pipe so wake() can interrupt a wait() blocked in select
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+
+    def wait(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select([self._fd, self._wake_r], [], [], remaining)
+            if not ready:
+                return False
+            if self._wake_r in ready:
+                try:
+                    os.read(self._wake_r, 4096)
+                except BlockingIOError:
+                    pass
+                return False
+            if self._drain():
+                return True
+
+    def _drain(self) -> bool:
+        hit = False
+        while True:
+            try:
+                buf = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return hit
+            pos = 0
+            while pos + _EVENT_HEADER.size <= len(buf):
+                _, _, _, length = _EVENT_HEADER.unpack_from(buf, pos)
+                pos += _EVENT_HEADER.size
+                name = buf[pos:pos + length].rstrip(b"\0")
+                pos += length
+                if name == self._name:
+                    hit = True
+
+    def wake(self) -> None:
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            pass  # pipe full: a wake-up is already pending
+
+    def close(self) -> None:
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class LogTailer:
+    """Follows a growing log file, returning only lines appended since the last call.
+
+    The file's identity (device, inode) and read offset are remembered, so
+    each call costs one stat plus reading the new bytes. A shrunken file is
+    treated as truncated and re-read from the start; a replaced file
+    (rotation) is finished from the old handle, then followed from the
+    start of the new one. wait() blocks on inotify where available and
+    falls back to sleeping (polling).
+    """
+
+    def __init__(self, path: str, from_end: bool = True, use_inotify: bool = True):
+        self.path = path
+        self._from_end = from_end
+        self._fh = None
+        self._ident: Optional[tuple] = None
+        self._offset = 0
+        self._partial = b""
+        self._pending = False
+        self._notify: Optional[_Inotify] = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._notify = _Inotify(os.path.dirname(os.path.abspath(path)) or ".", os.path.basename(path))
+            except Exception:
+                self._notify = None
+        if from_end:
+            self.read_lines()  # anchor at the current end now, not on the first poll
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._notify is not None
+
+    def read_lines(self) -> List[str]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return []  # not there (yet); keep the old handle until a new file shows up
+        ident = (st.st_dev, st.st_ino)
+        lines: List[str] = []
+        if self._fh is not None and ident != self._ident:
+            # Rotated: finish the old file, including an unterminated last line
+            lines = self._split(self._fh.read(MAX_READ))
+            if self._partial:
+                lines.append(self._decode(self._partial))
+                self._partial = b""
+            self._close_file()
+        if self._fh is None:
+            try:
+                self._fh = open(self.path, "rb")
+            except OSError:
+                return lines
+            first = self._ident is None
+            self._ident = ident
+            self._offset = st.st_size if (first and self._from_end) else 0
+            self._fh.seek(self._offset)
+        elif st.st_size < self._offset:
+            self._offset = 0
+            self._partial = b""
+            self._fh.seek(0)
+        chunk = self._fh.read(MAX_READ)
+        self._offset += len(chunk)
+        self._pending = len(chunk) >= MAX_READ
+        return lines + self._split(chunk)
+
+    def _split(self, data: bytes) -> List[str]:
+        if not data:
+            return []
+        parts = (self._partial + data).split(b"\n")
+        self._partial = parts.pop()[:MAX_LINE]
+        return [self._decode(p) for p in parts]
+
+    @staticmethod
+    def _decode(raw: bytes) -> str:
+        return raw[:MAX_LINE].decode("utf-8", errors="ignore").rstrip("\r")
+
+    def wait(self, timeout: float) -> bool:
+        """Block until the file may have changed or timeout passes. True if it changed."""
+        if self._pending:
+            return True
+        if self._notify is not None:
+            return self._notify.wait(timeout)
+        time.sleep(timeout)
+        return False
+
+    def wake(self) -> None:
+        """Make a wait() blocked in another thread return early."""
+        if self._notify is not None:
+            self._notify.wake()
+
+    def _close_file(self) -> None:
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            except OSError:
+                pass
+            self._fh = None
+
+    def close(self) -> None:
+        """Release the file and the inotify fds; must not race a wait() in another thread."""
+        self._close_file()
+        if self._notify is not None:
+            self._notify.close()
+            self._notify = None
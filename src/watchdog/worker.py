@@ -5,9 +5,14 @@ from typing import Dict, Any
 import psutil  # type: ignore
 import os
 
-from data.db import log_watchdog_event
+from data.ingest import enqueue_watchdog_event
 from src.configs.settings import Settings
 from src.watchdog.devtools import DevToolsMonitor
+from src.watchdog.logtail import LogTailer
+from src.watchdog.processes import process_sampler
+
+# Seconds between process checks
+SCAN_INTERVAL = 2.0
 
 
 class WatchdogWorker:
@@ -16,6 +21,9 @@ class WatchdogWorker:
         self._stop = threading.Event()
         self._snapshot: Dict[str, Any] = {}
         self._settings = Settings()
+        self._unity_tail: LogTailer | None = None
+        # Guards _unity_tail between stop() waking it and the worker closing it
+        self._tail_lock = threading.Lock()
         self._devtools = DevToolsMonitor(port=int(os.getenv("BROWSER_DEVTOOLS_PORT", str(getattr(self._settings, "browser_devtools_port", 9222)))))
 
     def start(self):
@@ -24,6 +32,7 @@ class WatchdogWorker:
         self._stop.clear()
         self._thread = threading.Thread(target=self._run, daemon=True)
         self._thread.start()
+        process_sampler.start()
         try:
             self._devtools.start()
         except Exception:
@@ -31,8 +40,13 @@ class WatchdogWorker:
 
     def stop(self):
         self._stop.set()
+        with self._tail_lock:
+            if self._unity_tail is not None:
+                self._unity_tail.wake()
         if self._thread:
-            self._thread.join(timeout=1)
+            # The worker thread closes the tailer itself once it leaves its loop
+            self._thread.join(timeout=2)
+        process_sampler.stop()
         try:
             self._devtools.stop()
         except Exception:
@@ -42,60 +56,87 @@ class WatchdogWorker:
         return self._snapshot.copy()
 
     def _run(self):
+        try:
+            self._loop()
+        finally:
+            with self._tail_lock:
+                if self._unity_tail is not None:
+                    self._unity_tail.close()
+                    self._unity_tail = None
+
+    def _loop(self):
         unity_detected = False
         chrome_detected = False
-        last_unity_log_check = 0.0
+        next_scan = 0.0
 
         while not self._stop.is_set():
             try:
-                procs = {p.pid: p.info for p in psutil.process_iter(attrs=["name", "exe"]) }
-                names = [str(info.get("name") or "").lower() for info in procs.values()]
-
-                unity_detected = any("unity" in n for n in names)
-                chrome_detected = any("chrome" in n or "msedge" in n for n in names)
-
-                self._snapshot = {
-                    "unity_running": unity_detected,
-                    "browser_running": chrome_detected,
-                    "process_count": len(procs),
-                    "idle_mode": psutil.cpu_percent(interval=0.1) < 5.0,
-                }
-
-                if unity_detected and time.time() - last_unity_log_check > 5:
+                if time.time() >= next_scan:
+                    procs = process_sampler.snapshot()
+
+                    unity_detected = bool(procs.matching("unity"))
+                    chrome_detected = bool(procs.matching("chrome", "msedge"))
+
+                    self._snapshot = {
+                        "unity_running": unity_detected,
+                        "browser_running": chrome_detected,
+                        "process_count": len(procs),
+                        "idle_mode": psutil.cpu_percent(interval=0.1) < 5.0,
+                    }
+                    next_scan = time.time() + SCAN_INTERVAL
+
+                # Only appended bytes are read, so this is cheap on every pass
+                if unity_detected:
                     self._check_unity_logs()
-                    last_unity_log_check = time.time()
 
                 # Future: monitor active window, browser console via devtools API, etc.
 
             except Exception:
                 pass
 
-            time.sleep(2)
+            self._wait(max(0.0, next_scan - time.time()))
 
-    def _check_unity_logs(self):
+    def _wait(self, timeout: float):
+        # Wake early when Editor.log changes (inotify); otherwise plain polling
+        tail = self._unity_tail
+        if self._stop.is_set():
+            return
+        if tail is not None and tail.uses_inotify:
+            try:
+                tail.wait(timeout)  # stop() wakes this early
+                return
+            except Exception:
+                pass
+        self._stop.wait(timeout)
+
+    def _unity_log_path(self) -> str | None:
         # Windows typical path; adapt as needed
-        import os
         user = os.getenv("USERNAME") or os.getenv("USER") or ""
         candidates = [
             os.path.expanduser(rf"~\AppData\Local\Unity\Editor\Editor.log"),
             rf"C:\\Users\\{user}\\AppData\\Local\\Unity\\Editor\\Editor.log",
         ]
         for path in candidates:
-            try:
-                if os.path.exists(path):
-                    with open(path, "r", errors="ignore") as f:
-                        tail = f.readlines()[-50:]
-                    for line in tail:
-                        l = line.strip()
-                        if not l:
-                            continue
-                        if "error" in l.lower():
-                            log_watchdog_event("unity", "error", l, None)
-                        elif "warning" in l.lower():
-                            log_watchdog_event("unity", "warning", l, None)
-                    break
-            except Exception:
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _check_unity_logs(self):
+        if self._unity_tail is None:
+            path = self._unity_log_path()
+            if path is None:
+                return
+            # Start at the end: only lines written from now on are reported
+            with self._tail_lock:
+                self._unity_tail = LogTailer(path)
+        for line in self._unity_tail.read_lines():
+            l = line.strip()
+            if not l:
                 continue
+            if "error" in l.lower():
+                enqueue_watchdog_event("unity", "error", l, None)
+            elif "warning" in l.lower():
+                enqueue_watchdog_event("unity", "warning", l, None)
 
 
 watchdog_singleton = WatchdogWorker()
\ No newline at end of file
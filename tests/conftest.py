@@ -4,4 +4,30 @@ import sys
 # Ensure project root is on sys.path for imports in test environment
 ROOT = os.path.dirname(os.path.dirname(__file__))
 if ROOT not in sys.path:
-    sys.path.insert(0, ROOT)
\ No newline at end of file
+    sys.path.insert(0, ROOT)
+
+import pytest  # noqa: E402
+
+
+def _isolated_store(store, path, monkeypatch):
+    store.close()
+    monkeypatch.setattr(store, "path", str(path))
+    return store
+
+
+@pytest.fixture
+def jessica_db(tmp_path, monkeypatch):
+    """Point the shared jessica.db store at a throwaway file."""
+    from data.storage import jessica_store
+    store = _isolated_store(jessica_store, tmp_path / "jessica.db", monkeypatch)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def memory_db(tmp_path, monkeypatch):
+    """Point the shared memory.db store at a throwaway file."""
+    from data.storage import memory_store
+    store = _isolated_store(memory_store, tmp_path / "memory.db", monkeypatch)
+    yield store
+    store.close()
@@ -0,0 +1,63 @@
+import pytest
+
+from backend.routes import auth
+
+
+@pytest.fixture
+def token_db(jessica_db, monkeypatch):
+    monkeypatch.setattr(auth, "_cache", {})
+    auth.init_auth_db()
+    yield auth
+
+
+def test_lookup_is_cached_until_invalidated(token_db):
+    t = token_db.make_token("admin")
+    assert token_db.validate_token(t)
+    assert token_db.get_token_role(t) == "admin"
+
+    # A change made behind the cache's back is only seen after invalidation
+    with token_db._store.transaction() as conn:
+        conn.execute("UPDATE tokens SET role = 'skill' WHERE token = ?", (t,))
+    assert token_db.get_token_role(t) == "admin"
+    token_db.invalidate_token_cache(t)
+    assert token_db.get_token_role(t) == "skill"
+
+
+def test_revoke_drops_cached_token(token_db):
+    t = token_db.make_token()
+    assert token_db.validate_token(t)
+    assert token_db.revoke_token(t)
+    assert not token_db.validate_token(t)
+    assert token_db.get_token_role(t) is None
+
+
+def test_expired_entries_are_reloaded(token_db, monkeypatch):
+    monkeypatch.setattr(token_db, "CACHE_TTL_SECONDS", 0)
+    assert not token_db.validate_token("missing")
+    with token_db._store.transaction() as conn:
+        conn.execute("INSERT INTO tokens(token, created_at, role) VALUES ('missing', 0, 'user')")
+    assert token_db.validate_token("missing")
+
+
+def test_revoke_during_lookup_is_not_cached_over(token_db, monkeypatch):
+    from contextlib import contextmanager
+
+    t = token_db.make_token()
+    store = token_db._store
+
+    class RacingStore:
+        """Revokes the token right after the lookup has read it."""
+
+        def __getattr__(self, name):
+            return getattr(store, name)
+
+        @contextmanager
+        def reader(self):
+            with store.reader() as conn:
+                yield conn
+            monkeypatch.setattr(token_db, "_store", store)
+            token_db.revoke_token(t)
+
+    monkeypatch.setattr(token_db, "_store", RacingStore())
+    assert token_db.validate_token(t)  # read before the revoke landed
+    assert not token_db.validate_token(t)
@@ -0,0 +1,48 @@
+import asyncio
+import time
+
+from backend.cron import CronRegistry
+
+
+def test_interval_jobs_share_one_timer_without_overlap():
+    async def scenario():
+        registry = CronRegistry()
+        fast, slow = [], []
+
+        async def slow_job():
+            slow.append(time.time())
+            await asyncio.sleep(0.35)
+
+        registry.add("fast", lambda: fast.append(time.time()), every=0.1, run_immediately=True)
+        registry.add("slow", slow_job, every=0.1, run_immediately=True)
+        registry.start()
+        await asyncio.sleep(0.55)
+        await registry.stop()
+        return registry, fast, slow
+
+    registry, fast, slow = asyncio.run(scenario())
+    assert 5 <= len(fast) <= 7
+    # Anchored to the schedule, not to when the previous run finished
+    assert all(abs((b - a) - 0.1) < 0.05 for a, b in zip(fast, fast[1:]))
+    status = {j["name"]: j for j in registry.jobs()}
+    assert len(slow) == 2 and status["slow"]["overlaps"] >= 2
+
+
+def test_misfire_policies():
+    async def scenario():
+        registry = CronRegistry(misfire_grace=0.05)
+        calls = {"skip": 0, "catch_up": 0}
+        for policy in calls:
+            job = registry.add(policy, lambda p=policy: calls.__setitem__(p, calls[p] + 1), every=10,
+                               misfire=policy)
+            job.next_fire = time.time() - 25  # slept through several slots
+        registry.start()
+        await asyncio.sleep(0.1)
+        await registry.stop()
+        return registry, calls
+
+    registry, calls = asyncio.run(scenario())
+    assert calls == {"skip": 0, "catch_up": 1}
+    for job in registry.jobs():
+        assert job["next_fire"] > time.time()
+        assert job["missed"] >= 2
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import threading
+import time
+from http import HTTPStatus
+
+from websockets.asyncio.server import serve
+
+import watchdog.devtools as devtools
+
+
+class FakeCDP:
+    """Serves /json and one console websocket per target, like Chrome's DevTools port."""
+
+    def __init__(self):
+        self.targets = ["page-1"]
+        self.handshakes = 0
+        self.closed = []
+        self.port = None
+        self._ready = threading.Event()
+        self._loop = None
+        threading.Thread(target=lambda: asyncio.run(self._main()), daemon=True).start()
+        self._ready.wait(5)
+
+    def _process_request(self, connection, request):
+        if request.path == "/json":
+            body = [
+                {"id": t, "url": f"http://app/{t}", "webSocketDebuggerUrl": f"ws://127.0.0.1:{self.port}/{t}"}
+                for t in self.targets
+            ]
+            return connection.respond(HTTPStatus.OK, json.dumps(body))
+        return None
+
+    async def _handler(self, ws):
+        self.handshakes += 1
+        target = ws.request.path.lstrip("/")
+        assert json.loads(await ws.recv())["method"] == "Runtime.enable"
+        for i in range(3):
+            await ws.send(json.dumps({
+                "method": "Runtime.consoleAPICalled",
+                "params": {"type": "error" if i == 2 else "log", "args": [{"type": "string", "value": f"{target} msg {i}"}]},
+            }))
+        try:
+            await ws.wait_closed()
+        finally:
+            self.closed.append(target)
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        async with serve(self._handler, "127.0.0.1", 0, process_request=self._process_request) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            await asyncio.Future()
+
+
+def _wait_for(cond, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if cond():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_persistent_connections_follow_targets(monkeypatch):
+    events = []
+    monkeypatch.setattr(devtools, "enqueue_watchdog_event", lambda *row: events.append(row))
+    cdp = FakeCDP()
+    monitor = devtools.DevToolsMonitor(port=cdp.port, host="127.0.0.1", discover_interval=0.05)
+    monitor.start()
+    try:
+        assert _wait_for(lambda: len(events) == 3)
+        time.sleep(0.3)  # several discovery rounds
+        assert cdp.handshakes == 1 and monitor.attached() == ["page-1"]
+        assert events[0] == ("browser", "info", "page-1 msg 0", json.dumps({"url": "http://app/page-1"}))
+        assert events[2][1] == "error"
+
+        cdp.targets = ["page-2"]
+        assert _wait_for(lambda: cdp.closed == ["page-1"] and monitor.attached() == ["page-2"])
+        assert _wait_for(lambda: len(events) == 6)
+        assert cdp.handshakes == 2
+    finally:
+        monitor.stop()
+    assert _wait_for(lambda: "page-2" in cdp.closed)
@@ -0,0 +1,41 @@
+from data import db
+
+
+def test_conversation_overflow_is_archived_not_deleted(jessica_db, monkeypatch):
+    monkeypatch.setattr(db, "HOT_CONVERSATIONS", 3)
+    for i in range(5):
+        db.append_conversation("user", f"message {i}")
+
+    assert [c for _, c in db.get_recent_conversation(10)] == ["message 4", "message 3", "message 2"]
+    archived = db.search_conversation_archive()
+    assert [r["content"] for r in archived] == ["message 1", "message 0"]
+    assert [r["content"] for r in db.search_conversation_archive(q="message 0")] == ["message 0"]
+    assert db.search_conversation_archive(since="2999-01-01") == []
+
+
+def test_command_batches_roll_into_archive(jessica_db, monkeypatch):
+    monkeypatch.setattr(db, "HOT_COMMANDS", 2)
+    db.log_commands(["a", "b", "c", "d"])
+    assert db.get_recent_commands(10) == ["d", "c"]
+    assert [r["text"] for r in db.search_command_archive()] == ["b", "a"]
+
+
+def test_keyset_pages_continue_into_archive(jessica_db, monkeypatch):
+    monkeypatch.setattr(db, "HOT_CONVERSATIONS", 2)
+    for i in range(5):
+        db.append_conversation("user", f"m{i}")
+
+    first = db.get_conversation_page(3)
+    assert [r["content"] for r in first] == ["m4", "m3", "m2"]
+    second = db.get_conversation_page(3, first[-1]["id"])
+    assert [r["content"] for r in second] == ["m1", "m0"]
+    assert [r["content"] for r in db.iter_keyset(db.get_conversation_page, page_size=2)] == [
+        "m4", "m3", "m2", "m1", "m0"
+    ]
+
+
+def test_watchdog_events_page_by_source(jessica_db):
+    db.log_watchdog_events([("unity", "error", f"u{i}", None) for i in range(3)] + [("browser", "info", "b", None)])
+    page = db.list_watchdog_events(2, source="unity")
+    assert [r["message"] for r in page] == ["u2", "u1"]
+    assert [r["message"] for r in db.list_watchdog_events(2, page[-1]["id"], "unity")] == ["u0"]
@@ -0,0 +1,77 @@
+import asyncio
+
+from src.pipeline.manager import ProbeConfig
+from src.pipeline.probes.base import ProbeFactory
+from src.pipeline.probes.http import HttpConnectionPool, HttpProbe
+
+
+async def _serve(handler):
+    server = await asyncio.start_server(handler, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def test_http_probe_reuses_connections_and_checks_expectations():
+    async def scenario():
+        accepted = []
+
+        async def handler(reader, writer):
+            accepted.append(writer)
+            while True:
+                try:
+                    request = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break
+                path = request.split(b" ")[1]
+                if path == b"/chunked":
+                    writer.write(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                                 b"5\r\nready\r\n0\r\n\r\n")
+                else:
+                    body = b"oops" if path == b"/down" else b"all ready"
+                    status = b"503 Service Unavailable" if path == b"/down" else b"200 OK"
+                    writer.write(b"HTTP/1.1 " + status + b"\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+                await writer.drain()
+
+        server, port = await _serve(handler)
+        pool = HttpConnectionPool()
+        base = f"http://127.0.0.1:{port}"
+        ok = HttpProbe("ok", 1, base + "/health", expect_body="ready", pool=pool)
+        chunked = HttpProbe("chunked", 1, base + "/chunked", expect_body="ready", pool=pool)
+        down = HttpProbe("down", 1, base + "/down", pool=pool)
+        results = [await ok.check() for _ in range(5)]
+        results.append(await chunked.check())
+        bad = await down.check()
+        server.close()
+        return pool, ok, results, bad, len(accepted)
+
+    pool, ok, results, bad, accepted = asyncio.run(scenario())
+    assert all(r.success for r in results)
+    assert pool.connects == 1 and accepted == 1
+    assert not bad.success and "status 503" in bad.message
+    stats = ok.latency_percentiles()
+    assert stats["samples"] == 5 and stats["p50"] <= stats["p99"]
+    assert results[0].details["status"] == 200
+
+
+def test_http_probe_latency_threshold_and_factory():
+    async def scenario():
+        async def handler(reader, writer):
+            await reader.readuntil(b"\r\n\r\n")
+            await asyncio.sleep(0.1)
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            writer.close()
+
+        server, port = await _serve(handler)
+        probe = ProbeFactory.create_probe(ProbeConfig(
+            type="http", name="slow", interval=5,
+            params={"url": f"http://127.0.0.1:{port}/", "max_latency_ms": 20}))
+        result = await probe.check()
+        gone = await ProbeFactory.create_probe(ProbeConfig(
+            type="http", name="gone", interval=5, params={"url": "http://127.0.0.1:1/"})).check()
+        server.close()
+        return probe, result, gone
+
+    probe, result, gone = asyncio.run(scenario())
+    assert isinstance(probe, HttpProbe)
+    assert not result.success and "latency" in result.message
+    assert not gone.success and "unreachable" in gone.message
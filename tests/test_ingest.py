@@ -0,0 +1,67 @@
+import json
+
+from data import db
+from data.ingest import IngestQueue, WATCHDOG_EVENT, COMMAND
+
+
+def test_batches_and_coalesces_events(jessica_db):
+    q = IngestQueue(maxsize=100, flush_interval=0.05)
+    for _ in range(5):
+        q.put(WATCHDOG_EVENT, ("unity", "error", "NullReferenceException", None))
+    q.put(WATCHDOG_EVENT, ("unity", "warning", "Shader warning", None))
+    q.put(COMMAND, ("open project",))
+    assert q.flush()
+    q.stop()
+
+    rows = db.list_watchdog_events(10)
+    assert [r["message"] for r in rows] == ["Shader warning", "NullReferenceException"]
+    assert json.loads(rows[1]["metadata_json"]) == {"repeats": 5}
+    assert db.get_recent_commands(5) == ["open project"]
+    assert q.stats()["coalesced"] == 4
+
+
+def test_full_queue_drops_and_reports(jessica_db):
+    q = IngestQueue(maxsize=2, flush_interval=0.05)
+    # Fill the queue before the writer can drain it
+    q.start = lambda: None
+    assert q.put(WATCHDOG_EVENT, ("browser", "info", "a", None))
+    assert q.put(WATCHDOG_EVENT, ("browser", "info", "b", None))
+    assert not q.put(WATCHDOG_EVENT, ("browser", "info", "c", None))
+    assert q.stats()["dropped"] == 1
+
+    del q.start
+    q.start()
+    assert q.flush()
+    q.stop()
+
+    messages = [r["message"] for r in db.list_watchdog_events(10)]
+    assert "Dropped 1 events (ingest queue full)" in messages
+    assert "c" not in messages
+
+
+def test_repeats_are_aggregated_by_fingerprint(jessica_db):
+    q = IngestQueue(maxsize=100, flush_interval=0.05, dedup_window=60)
+    for frame in range(3):
+        q.put(WATCHDOG_EVENT, ("unity", "error", f"NullReferenceException at Player.cs:{40 + frame}", None))
+        assert q.flush()
+    q.put(WATCHDOG_EVENT, ("unity", "error", "Shader error in 'Lit'", None))
+    assert q.flush()
+
+    # Only the first occurrence in the window becomes a row
+    assert [r["message"] for r in db.list_watchdog_events(10)] == [
+        "Shader error in 'Lit'",
+        "NullReferenceException at Player.cs:40",
+    ]
+    groups = {g["message"]: g for g in db.list_watchdog_event_groups(10)}
+    assert groups["NullReferenceException at Player.cs:42"]["count"] == 3
+    assert groups["Shader error in 'Lit'"]["count"] == 1
+
+    # After the window the next occurrence is written with the suppressed repeats
+    q._dedup_window = 0
+    q.put(WATCHDOG_EVENT, ("unity", "error", "NullReferenceException at Player.cs:43", None))
+    assert q.flush()
+    q.stop()
+    latest = db.list_watchdog_events(1)[0]
+    assert json.loads(latest["metadata_json"]) == {"repeats": 3}
+    counts = {g["fingerprint"]: g["count"] for g in db.list_watchdog_event_groups(10)}
+    assert counts[latest["fingerprint"]] == 4
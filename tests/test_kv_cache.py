@@ -0,0 +1,34 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("pytorch_lightning")
+
+from src.model.transformer import JessicaGPT, KVCache  # noqa: E402
+
+
+def _model(block_size=32):
+    torch.manual_seed(0)
+    model = JessicaGPT(vocab_size=50, n_embd=32, n_head=4, n_layer=2, block_size=block_size)
+    return model.eval()
+
+
+def test_incremental_logits_match_full_forward():
+    model = _model()
+    idx = torch.randint(50, (2, 20))
+    with torch.no_grad():
+        full, _ = model(idx)
+        cache = KVCache(2, 4)
+        prefix, _ = model(idx[:, :12], cache=cache)
+        steps = [model(idx[:, t:t + 1], cache=cache)[0] for t in range(12, 20)]
+    incremental = torch.cat([prefix] + steps, dim=1)
+    assert cache.length == 20
+    assert torch.allclose(full, incremental, atol=1e-5)
+
+
+def test_generate_past_block_size_rebuilds_cache():
+    model = _model(block_size=16)
+    idx = torch.randint(50, (1, 10))
+    out = model.generate(idx, max_new_tokens=30)
+    assert out.shape == (1, 40)
+    assert torch.equal(out[:, :10], idx)
+    assert model.generate(idx, max_new_tokens=5, use_cache=False).shape == (1, 15)
@@ -0,0 +1,23 @@
+import asyncio
+import threading
+
+from backend import log_stream
+
+
+def test_publish_from_worker_thread_wakes_loop_subscriber(monkeypatch):
+    monkeypatch.setattr(log_stream, "_subscribers", [])
+    monkeypatch.setattr(log_stream, "_history", [])
+
+    async def scenario():
+        log_stream.bind_loop(asyncio.get_running_loop())
+        queue = asyncio.Queue()
+        log_stream._subscribers.append(queue)
+        threading.Thread(target=log_stream.publish_log_event, args=({"type": "scheduler_run"},)).start()
+        return await asyncio.wait_for(queue.get(), 1)
+
+    try:
+        payload = asyncio.run(scenario())
+    finally:
+        log_stream.bind_loop(None)
+    assert '"scheduler_run"' in payload
+    assert log_stream._history == [payload]
@@ -0,0 +1,78 @@
+import os
+import threading
+import time
+
+import pytest
+
+from watchdog.logtail import LogTailer
+
+
+def _append(path, text):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_reads_only_appended_lines(tmp_path, use_inotify):
+    log = tmp_path / "Editor.log"
+    log.write_text("old error\n" * 1000)
+    tail = LogTailer(str(log), use_inotify=use_inotify)
+    try:
+        assert tail.read_lines() == []  # history is skipped
+        _append(log, "first\nsecond (partial")
+        assert tail.read_lines() == ["first"]
+        _append(log, ")\n")
+        assert tail.read_lines() == ["second (partial)"]
+        assert tail.read_lines() == []
+    finally:
+        tail.close()
+
+
+def test_truncation_and_rotation(tmp_path):
+    log = tmp_path / "Editor.log"
+    log.write_text("a\nb\n")
+    tail = LogTailer(str(log), from_end=False, use_inotify=False)
+    assert tail.read_lines() == ["a", "b"]
+
+    log.write_text("c\n")  # truncated and rewritten
+    assert tail.read_lines() == ["c"]
+
+    _append(log, "last line of old file")
+    os.replace(log, tmp_path / "Editor-prev.log")
+    log.write_text("fresh\n")
+    assert tail.read_lines() == ["last line of old file", "fresh"]
+    tail.close()
+
+
+def test_inotify_wakes_on_write(tmp_path):
+    log = tmp_path / "Editor.log"
+    log.write_text("")
+    tail = LogTailer(str(log))
+    if not tail.uses_inotify:
+        pytest.skip("inotify not available")
+    try:
+        assert not tail.wait(0.05)
+        (tmp_path / "Other.log").write_text("noise\n")  # other files in the directory are ignored
+        assert not tail.wait(0.05)
+        threading.Timer(0.1, _append, (log, "error CS0103\n")).start()
+        started = time.monotonic()
+        assert tail.wait(2)
+        assert time.monotonic() - started < 1
+        assert tail.read_lines() == ["error CS0103"]
+    finally:
+        tail.close()
+
+
+def test_wake_interrupts_a_blocked_wait(tmp_path):
+    log = tmp_path / "Editor.log"
+    log.write_text("")
+    tail = LogTailer(str(log))
+    if not tail.uses_inotify:
+        pytest.skip("inotify not available")
+    try:
+        threading.Timer(0.1, tail.wake).start()
+        started = time.monotonic()
+        assert not tail.wait(5)
+        assert time.monotonic() - started < 1
+    finally:
+        tail.close()
@@ -0,0 +1,33 @@
+import sqlite3
+
+import backend.memory as memory
+
+
+def test_fts_search_ranks_and_tracks_deletes(memory_db):
+    memory.store_interaction("unity shader error", "check include paths")
+    memory.store_interaction("shader shader compile", "shader cache cleared")
+    memory.store_interaction("docker networking", "restart the daemon")
+
+    rows = memory.search_interactions("shader", 10)
+    assert [r[1] for r in rows] == ["shader shader compile", "unity shader error"]
+    # Prefix match and quoting of FTS syntax characters
+    assert memory.search_interactions("dock", 10)[0][1] == "docker networking"
+    assert memory.search_interactions('"daemon OR', 10) == []
+
+    with memory_db.transaction() as conn:
+        conn.execute("DELETE FROM interactions WHERE prompt LIKE 'docker%'")
+    assert memory.search_interactions("docker", 10) == []
+
+
+def test_existing_rows_are_backfilled(memory_db):
+    path = memory_db.path
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE interactions (id INTEGER PRIMARY KEY AUTOINCREMENT, prompt TEXT, response TEXT, "
+        "time DATETIME DEFAULT CURRENT_TIMESTAMP)"
+    )
+    conn.execute("INSERT INTO interactions (prompt, response) VALUES ('legacy question', 'answer')")
+    conn.commit()
+    conn.close()
+
+    assert memory.search_interactions("legacy", 5)[0][1] == "legacy question"
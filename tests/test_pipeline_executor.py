@@ -0,0 +1,119 @@
+import sys
+import time
+
+import pytest
+
+from src.pipeline.executor import PipelineExecutor, order_steps
+from src.pipeline.manager import Pipeline, PipelineStep
+
+PY = f'"{sys.executable}" -c'
+
+
+def _step(name, code, **kw):
+    return PipelineStep(name=name, command=f'{PY} "{code}"', **kw)
+
+
+def test_dag_runs_independent_steps_in_parallel_and_skips_after_failure(tmp_path):
+    events = []
+    pipeline = Pipeline("p", "", steps=[
+        _step("a", "import time; time.sleep(0.4); print('a done')"),
+        _step("b", "import time; time.sleep(0.4)"),
+        _step("c", "print('c')", depends_on=["a", "b"]),
+        _step("bad", "raise SystemExit(3)"),
+        _step("after_bad", "print('never')", depends_on=["bad"]),
+    ])
+    executor = PipelineExecutor(max_workers=4, cache_path=tmp_path / "cache.json",
+                                publish=events.append, base_dir=tmp_path)
+    start = time.time()
+    results = executor.run(pipeline)
+    assert time.time() - start < 1.5
+    assert [results[n].status for n in ("a", "b", "c", "bad", "after_bad")] == \
+        ["ok", "ok", "ok", "failed", "skipped"]
+    assert results["bad"].returncode == 3
+    assert "a done" in results["a"].output
+    assert {"a done"} <= {e.get("line") for e in events if e["step"] == "a"}
+
+
+def test_steps_with_unchanged_inputs_are_cached(tmp_path):
+    src = tmp_path / "input.txt"
+    src.write_text("one")
+    marker = tmp_path / "runs.log"
+    code = "open('runs.log', 'a').write('x')"
+    pipeline = Pipeline("p", "", steps=[
+        _step("build", code, inputs=["*.txt"]),
+        _step("always", "print(1)"),
+    ])
+
+    def run(force=False):
+        return PipelineExecutor(cache_path=tmp_path / "cache.json", publish=lambda e: None,
+                                base_dir=tmp_path).run(pipeline, force=force)
+
+    assert run()["build"].status == "ok"
+    second = run()
+    assert second["build"].status == "cached" and second["always"].status == "ok"
+    src.write_text("two")
+    assert run()["build"].status == "ok"
+    assert run(force=True)["build"].status == "ok"
+    assert marker.read_text() == "xxx"
+
+
+def test_directory_inputs_cover_the_files_inside(tmp_path):
+    pkg = tmp_path / "src" / "pkg"
+    pkg.mkdir(parents=True)
+    (pkg / "a.py").write_text("one")
+    pipeline = Pipeline("p", "", steps=[_step("build", "print(1)", inputs=["src"])])
+
+    def run():
+        return PipelineExecutor(cache_path=tmp_path / "cache.json", publish=lambda e: None,
+                                base_dir=tmp_path).run(pipeline)["build"].status
+
+    assert run() == "ok"
+    assert run() == "cached"
+    (pkg / "a.py").write_text("two")
+    assert run() == "ok"
+    (pkg / "b.py").write_text("new file")
+    assert run() == "ok"
+    assert run() == "cached"
+
+
+def test_order_steps_rejects_cycles_and_unknown_deps():
+    with pytest.raises(ValueError, match="cycle"):
+        order_steps([PipelineStep("a", "x", depends_on=["b"]), PipelineStep("b", "x", depends_on=["a"])])
+    with pytest.raises(ValueError, match="unknown"):
+        order_steps([PipelineStep("a", "x", depends_on=["zz"])])
+
+
+def test_timeout_kills_step(tmp_path):
+    pipeline = Pipeline("p", "", steps=[_step("slow", "import time; time.sleep(5)", timeout=0.3)])
+    result = PipelineExecutor(publish=lambda e: None, base_dir=tmp_path).run(pipeline)["slow"]
+    assert result.status == "timeout" and result.duration < 3
+
+
+def test_step_output_reaches_log_stream_subscribers_on_the_loop(tmp_path, monkeypatch):
+    import asyncio
+
+    from src.backend import log_stream
+
+    monkeypatch.setattr(log_stream, "_subscribers", [])
+    monkeypatch.setattr(log_stream, "_history", [])
+    pipeline = Pipeline("p", "", steps=[_step("say", "print('hello from step')")])
+
+    async def scenario():
+        log_stream.bind_loop(asyncio.get_running_loop())
+        queue = asyncio.Queue()
+        log_stream._subscribers.append(queue)
+        await PipelineExecutor(base_dir=tmp_path).run_async(pipeline)
+        lines = []
+        while True:
+            try:
+                lines.append(await asyncio.wait_for(queue.get(), 1))
+            except asyncio.TimeoutError:
+                return lines
+            if '"status": "ok"' in lines[-1]:
+                return lines
+
+    try:
+        lines = asyncio.run(scenario())
+    finally:
+        log_stream.bind_loop(None)
+    assert any("hello from step" in line for line in lines)
@@ -0,0 +1,43 @@
+import math
+
+import pytest
+
+from src.pipeline.history import ProbeHistory
+
+
+def test_raw_ring_is_bounded_and_rollups_aggregate():
+    history = ProbeHistory(path=None, raw_capacity=5)
+    base = 1_700_000_000.0 - 1_700_000_000.0 % 86400
+    for i in range(130):
+        # one check every 30s; every 10th fails
+        history.record("api", ok=i % 10 != 9, ts=base + i * 30, latency_ms=float(i))
+
+    raw = history.query("api")
+    assert [p["ts"] for p in raw] == [base + i * 30 for i in range(125, 130)]
+    assert raw[-1]["latency_ms"] == 129.0
+
+    minutes = history.query("api", "1m")
+    assert len(minutes) == 65 and all(p["count"] == 2 for p in minutes)
+    hours = history.query("api", "1h")
+    assert [p["count"] for p in hours] == [120, 10]
+    assert hours[0]["failures"] == 12 and hours[0]["flaps"] == 23
+    assert hours[0]["latency_max_ms"] == 119.0
+    assert math.isclose(hours[0]["latency_avg_ms"], 59.5)
+    assert history.query("api", "1d")[0]["count"] == 130
+    assert len(history.query("api", "1m", since=base + 3600)) == 5
+    with pytest.raises(ValueError):
+        history.query("api", "5m")
+
+
+def test_history_round_trips_through_disk(tmp_path):
+    path = str(tmp_path / "history.json")
+    history = ProbeHistory(path=path, raw_capacity=3)
+    for i in range(4):
+        history.record("p", ok=bool(i % 2), ts=1000.0 + i, latency_ms=None if i == 0 else 5.0)
+    history.save()
+
+    loaded = ProbeHistory(path=path, raw_capacity=3).load()
+    assert loaded.query("p") == history.query("p")
+    assert loaded.query("p", "1m") == history.query("p", "1m")
+    loaded.record("p", ok=True, ts=1010.0, latency_ms=1.0)
+    assert [p["ts"] for p in loaded.query("p")] == [1002.0, 1003.0, 1010.0]
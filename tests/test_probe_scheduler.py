@@ -0,0 +1,221 @@
+import asyncio
+import os
+import time
+
+from src.pipeline import probe_scheduler
+from src.pipeline.history import ProbeHistory
+from src.pipeline.manager import PipelineManager
+from src.pipeline.probe_scheduler import ProbeScheduler
+from src.pipeline.probes.base import Probe, ProbeResult
+
+
+class SleepyProbe(Probe):
+    """Blocking check that sleeps, run through the default executor path."""
+
+    def __init__(self, name, delay, timeout=None, success=True):
+        super().__init__(name, 60, timeout)
+        self.delay = delay
+        self.success = success
+
+    def check_blocking(self):
+        time.sleep(self.delay)
+        self.last_run = time.time()
+        return ProbeResult(self.success, self.name, self.last_run, {})
+
+
+class EmptyManager:
+    def get_all_pipelines(self):
+        return []
+
+
+def test_probes_run_concurrently_without_blocking_the_loop():
+    async def scenario():
+        scheduler = ProbeScheduler(EmptyManager(), max_concurrency=4)
+        probes = [SleepyProbe(f"p{i}", 0.3) for i in range(4)]
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.05)
+
+        start = time.monotonic()
+        await asyncio.gather(ticker(), *(scheduler._run_probe(p) for p in probes))
+        return scheduler, time.monotonic() - start, ticks
+
+    scheduler, elapsed, ticks = asyncio.run(scenario())
+    assert elapsed < 0.6
+    assert len(ticks) == 5 and ticks[-1] - ticks[0] < 0.35
+    assert all(scheduler.results[f"p{i}"].success for i in range(4))
+
+
+def test_timeout_and_async_failure_callback():
+    async def scenario():
+        scheduler = ProbeScheduler(EmptyManager())
+        handled = []
+
+        async def on_failure(probe, result):
+            handled.append((probe.name, result.message))
+
+        scheduler.add_failure_callback(on_failure)
+        probe = SleepyProbe("hung", 1.0, timeout=0.1)
+        result = await scheduler._run_probe(probe)
+        await asyncio.sleep(0)
+        return probe, result, handled
+
+    probe, result, handled = asyncio.run(scenario())
+    assert not result.success and "timed out" in result.message
+    assert probe.last_run > 0 and not probe.should_run()
+    assert handled == [("hung", result.message)]
+
+
+class CountingProbe(Probe):
+    def __init__(self, name, interval):
+        super().__init__(name, interval)
+        self.runs = []
+
+    async def check(self):
+        self.last_run = time.time()
+        self.runs.append(self.last_run)
+        return ProbeResult(True, self.name, self.last_run, {})
+
+
+def test_timer_loop_runs_probes_on_their_own_intervals(monkeypatch):
+    monkeypatch.setattr(probe_scheduler, "MAX_JITTER", 0.02)
+
+    async def scenario():
+        scheduler = ProbeScheduler(EmptyManager(), history=ProbeHistory(path=None))
+        fast, slow = CountingProbe("fast", 0.2), CountingProbe("slow", 3600)
+        scheduler.active_probes = [fast, slow]
+        scheduler.running = True
+        loop_task = asyncio.ensure_future(scheduler._run_loop())
+        await asyncio.sleep(0.55)
+        scheduler.stop()
+        await asyncio.wait_for(loop_task, 1)
+        return scheduler, fast, slow
+
+    scheduler, fast, slow = asyncio.run(scenario())
+    assert len(fast.runs) == 3
+    assert all(abs((b - a) - 0.2) < 0.05 for a, b in zip(fast.runs, fast.runs[1:]))
+    assert len(slow.runs) == 1
+    status = scheduler.get_status()
+    assert status["slow"]["next_run"] > time.time() + 3000
+    assert status["fast"]["trend"]["checks"] == 3 and status["fast"]["trend"]["uptime"] == 1.0
+    assert [p["ok"] for p in scheduler.get_history("fast")] == [True] * 3
+
+
+def test_missed_slots_are_skipped_after_sleep():
+    scheduler = ProbeScheduler(EmptyManager())
+    probe = CountingProbe("p", 60)
+    now = 10_000.0
+    # On schedule: anchored to the previous slot
+    assert scheduler._next_due(probe, now - 10, now) == now + 50
+    # Woke from a long suspend: one run soon, not one per missed slot
+    nxt = scheduler._next_due(probe, now - 3600, now)
+    assert now <= nxt <= now + 5
+
+
+def _write_pipeline(path, probes, name="P"):
+    import json
+    path.write_text(json.dumps({"name": name, "probes": probes}))
+    # make sure the change is visible even on coarse mtime filesystems
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def test_pipeline_edits_are_applied_as_a_diff(tmp_path):
+    manager = PipelineManager(tmp_path)
+    f = tmp_path / "p.json"
+    _write_pipeline(f, [
+        {"type": "file_exists", "name": "keep", "path": "a", "interval": 10},
+        {"type": "file_exists", "name": "retime", "path": "b", "interval": 10},
+        {"type": "file_exists", "name": "change", "path": "c", "interval": 10},
+        {"type": "file_exists", "name": "drop", "path": "d", "interval": 10},
+    ])
+    manager.load_pipelines()
+    scheduler = ProbeScheduler(manager, history=ProbeHistory(path=None))
+    scheduler._load_probes()
+    before = {p.name: p for p in scheduler.active_probes}
+    before["retime"].last_run = 123.0
+    assert not manager.reload_changed()
+
+    _write_pipeline(f, [
+        {"type": "file_exists", "name": "keep", "path": "a", "interval": 10},
+        {"type": "file_exists", "name": "retime", "path": "b", "interval": 99},
+        {"type": "file_exists", "name": "change", "path": "c2", "interval": 10},
+        {"type": "port_open", "name": "new", "port": 1, "interval": 5},
+    ])
+    assert manager.reload_changed()
+    scheduler.sync_probes()
+    after = {p.name: p for p in scheduler.active_probes}
+    assert set(after) == {"keep", "retime", "change", "new"}
+    assert after["keep"] is before["keep"]
+    assert after["retime"] is before["retime"] and after["retime"].interval == 99
+    assert after["retime"].last_run == 123.0
+    assert after["change"] is not before["change"] and after["change"].path == "c2"
+
+    # An invalid edit keeps the last good definition
+    _write_pipeline(f, [{"type": "file_exists", "name": "keep", "interval": -1}])
+    manager.reload_changed()
+    assert len(manager.get_pipeline("P").probes) == 4
+
+    f.unlink()
+    assert manager.reload_changed()
+    scheduler.sync_probes()
+    assert scheduler.active_probes == []
+
+
+def test_rescheduled_probe_skips_stale_heap_entries(monkeypatch, tmp_path):
+    monkeypatch.setattr(probe_scheduler, "MAX_JITTER", 0.01)
+
+    async def scenario():
+        manager = PipelineManager(tmp_path)
+        scheduler = ProbeScheduler(manager, history=ProbeHistory(path=None))
+        probe = CountingProbe("p", 0.1)
+        scheduler.active_probes = [probe]
+        scheduler.running = True
+        loop_task = asyncio.ensure_future(scheduler._run_loop())
+        await asyncio.sleep(0.05)
+        # Slow it down: the queued 0.1s slot must not fire any more
+        probe.interval = 0.4
+        scheduler._schedule(probe, probe.last_run + probe.interval)
+        scheduler._wake.set()
+        await asyncio.sleep(0.6)
+        scheduler.stop()
+        await asyncio.wait_for(loop_task, 1)
+        return probe
+
+    probe = asyncio.run(scenario())
+    assert len(probe.runs) == 2
+
+
+def test_hung_blocking_check_is_not_started_again():
+    import threading
+
+    release = threading.Event()
+
+    class HungProbe(Probe):
+        def __init__(self):
+            super().__init__("hung", 1, timeout=0.05)
+            self.calls = 0
+
+        def check_blocking(self):
+            self.calls += 1
+            release.wait(5)
+            return ProbeResult(True, "late", time.time(), {})
+
+    async def scenario():
+        scheduler = ProbeScheduler(EmptyManager(), history=ProbeHistory(path=None))
+        probe = HungProbe()
+        first = await scheduler._run_probe(probe)
+        second = await scheduler._run_probe(probe)
+        release.set()
+        return probe, first, second
+
+    try:
+        probe, first, second = asyncio.run(scenario())
+    finally:
+        release.set()
+    assert "timed out" in first.message
+    assert not second.success and "still running" in second.message
+    assert probe.calls == 1
@@ -0,0 +1,28 @@
+import os
+import threading
+
+from watchdog.processes import ProcessSampler
+
+
+def test_consumers_share_one_scan_per_interval():
+    sampler = ProcessSampler(interval=60)
+    snaps = []
+    threads = [threading.Thread(target=lambda: snaps.append(sampler.snapshot())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sampler.scans == 1
+    assert all(s is snaps[0] for s in snaps)
+
+    sampler.snapshot(max_age=0)
+    assert sampler.scans == 2
+
+
+def test_snapshot_indexes():
+    snap = ProcessSampler().snapshot()
+    me = snap.by_pid[os.getpid()]
+    assert me in snap.named(me["name"].upper())
+    assert me in snap.matching("no-such-process", me["name"][:3])
+    assert not snap.matching("no-such-process")
+    assert len(snap.top(3)) == min(3, len(snap))
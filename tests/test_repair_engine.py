@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("torch")
+
+from src.pipeline.probes.base import FileExistsProbe, PortOpenProbe, ProbeResult  # noqa: E402
+from src.pipeline.repair_engine import (  # noqa: E402
+    FALLBACK_SUGGESTION, RepairEngine, TokenBucket, failure_signature)
+
+
+class CountingBrain:
+    def __init__(self):
+        self.prompts = []
+
+    async def process_input(self, prompt, system=False):
+        assert system
+        self.prompts.append(prompt)
+        await asyncio.sleep(0.01)
+        return f"fix #{len(self.prompts)}"
+
+
+def _failure(probe, message="File missing: config.yaml (took 12ms)"):
+    return ProbeResult(False, message, 0.0, {})
+
+
+def test_signature_masks_only_volatile_tokens():
+    probe = FileExistsProbe("cfg", 10, "config.yaml")
+    assert failure_signature(probe, _failure(probe, "took 12ms at 2026-10-19T10:00:01")) == \
+        failure_signature(probe, _failure(probe, "took 873ms at 2026-10-19T11:30:00"))
+    port = PortOpenProbe("db", 10, 5432)
+    assert failure_signature(port, _failure(port, "Port localhost:5432 is closed")) != \
+        failure_signature(port, _failure(port, "Port localhost:8000 is closed"))
+
+
+def test_different_ports_do_not_share_a_suggestion():
+    async def scenario():
+        brain = CountingBrain()
+        engine = RepairEngine(brain)
+        for port in (5432, 8000):
+            probe = PortOpenProbe(f"port{port}", 10, port)
+            await engine.handle_failure(probe, _failure(probe, f"Port localhost:{port} is closed"))
+        return brain, engine
+
+    brain, engine = asyncio.run(scenario())
+    assert len(brain.prompts) == 2 and "5432" in brain.prompts[0] and "8000" in brain.prompts[1]
+    assert engine.active_repairs["port5432"]["suggestion"] != engine.active_repairs["port8000"]["suggestion"]
+
+
+def test_suggestions_are_cached_shared_and_rate_limited():
+    async def scenario():
+        brain = CountingBrain()
+        engine = RepairEngine(brain, bucket=TokenBucket(capacity=1, refill=3600))
+        probe = FileExistsProbe("cfg", 10, "config.yaml")
+        # Concurrent identical failures share one generation
+        await asyncio.gather(*(engine._suggest(probe, _failure(probe)) for _ in range(2)))
+        # A later failure with the same signature is served from the cache
+        await engine.handle_failure(probe, _failure(probe))
+        other = FileExistsProbe("other", 10, "other.yaml")
+        await engine.handle_failure(other, _failure(other, "File missing: other.yaml"))
+        return brain, engine
+
+    brain, engine = asyncio.run(scenario())
+    assert len(brain.prompts) == 1
+    assert engine.active_repairs["cfg"]["suggestion"] == "fix #1"
+    assert engine.active_repairs["other"]["status"] == "rate_limited"
+    assert engine.stats == {"generated": 1, "failed": 0, "cache_hits": 2, "rate_limited": 1}
+
+
+def test_failed_generation_is_not_cached():
+    class FlakyBrain(CountingBrain):
+        async def process_input(self, prompt, system=False):
+            if not self.prompts:
+                self.prompts.append(prompt)
+                raise RuntimeError("model not loaded")
+            return await super().process_input(prompt, system)
+
+    async def scenario():
+        brain = FlakyBrain()
+        engine = RepairEngine(brain)
+        probe = FileExistsProbe("cfg", 10, "config.yaml")
+        await engine.handle_failure(probe, _failure(probe))
+        first = engine.active_repairs["cfg"]["suggestion"]
+        engine.clear_repair("cfg")
+        await engine.handle_failure(probe, _failure(probe))
+        return brain, engine, first
+
+    brain, engine, first = asyncio.run(scenario())
+    assert first == FALLBACK_SUGGESTION
+    assert len(brain.prompts) == 2
+    assert engine.active_repairs["cfg"]["suggestion"] == "fix #2"
+    assert engine.stats["failed"] == 1 and engine.stats["generated"] == 1
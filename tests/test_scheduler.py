@@ -0,0 +1,285 @@
+import time
+import zlib
+from datetime import datetime
+
+from data import db
+from scheduler.output import HEAD_CHARS, TAIL_CHARS, StreamCapture
+from scheduler.worker import RunHandle, SchedulerWorker, next_fire_time, _to_epoch
+
+
+def _row(**kw):
+    row = {"schedule_type": "interval", "interval_seconds": 0, "cron_expr": None, "iso_time": None}
+    row.update(kw)
+    return row
+
+
+def test_next_fire_time():
+    now = _to_epoch(datetime(2025, 1, 1, 12, 0, 30))
+    assert next_fire_time(_row(interval_seconds=60), now, None) == now
+    assert next_fire_time(_row(interval_seconds=60), now, now - 10) == now + 50
+    cron = _row(schedule_type="cron", cron_expr="*/5 * * * *")
+    assert next_fire_time(cron, now, now) == _to_epoch(datetime(2025, 1, 1, 12, 5))
+    iso = _row(schedule_type="iso", iso_time="2025-01-02T00:00:00")
+    assert next_fire_time(iso, now, None) == _to_epoch(datetime(2025, 1, 2))
+    assert next_fire_time(iso, now, now) is None
+
+
+class RecordingWorker(SchedulerWorker):
+    def __init__(self, **kw):
+        super().__init__(**kw)
+        self.runs = []
+
+    def _execute_task(self, task_row, handle=None):
+        self.runs.append((task_row["id"], time.time()))
+        return 0, "ok", ""
+
+
+def test_worker_sleeps_until_due_and_picks_up_new_tasks(jessica_db):
+    worker = RecordingWorker()
+    worker.start()
+    try:
+        time.sleep(0.1)
+        assert worker.runs == []
+        task_id = db.add_task("tick", "echo", "[]", 1)
+        worker.refresh()
+        time.sleep(1.5)
+    finally:
+        worker.stop()
+
+    times = [t for tid, t in worker.runs if tid == task_id]
+    assert len(times) == 2
+    assert 0.9 <= times[1] - times[0] <= 1.2
+    assert db.get_task_results(task_id, 5)[0]["stdout"] == "ok"
+
+
+class SlowWorker(SchedulerWorker):
+    def __init__(self):
+        super().__init__(max_workers=4)
+        self.started = []
+
+    def _execute_task(self, task_row, handle=None):
+        self.started.append(task_row["id"])
+        handle.cancelled.wait(0.8)
+        return 0, "", ""
+
+
+def test_due_tasks_run_in_parallel_and_in_flight_runs_are_skipped(jessica_db):
+    a = db.add_task_advanced("a", "echo", "[]", "interval", 1)
+    b = db.add_task_advanced("b", "echo", "[]", "interval", 1)
+    c = db.add_task_advanced("c", "echo", "[]", "interval", 1, concurrency_key="shared")
+    d = db.add_task_advanced("d", "echo", "[]", "interval", 1, concurrency_key="shared")
+    worker = SlowWorker()
+    worker.start()
+    try:
+        time.sleep(0.3)
+        # a and b overlap; c and d share a key so only one of them started
+        assert {a, b} <= set(worker.started)
+        assert len({c, d} & set(worker.started)) == 1
+        assert len(worker.running()) == 3
+        # The other shared-key task was skipped rather than queued
+        assert worker.metrics.skipped == 1
+        assert worker.cancel(a)
+        assert not worker.cancel(a + 100)
+    finally:
+        worker.stop()
+
+
+def test_timeout_kills_process(jessica_db):
+    worker = SchedulerWorker()
+    rc, out, err = worker._run_process(["python", "-c", "import time; time.sleep(5)"], False, 1, None)
+    assert rc is None
+    assert "Timed out after 1s" in err
+
+
+def test_output_capture_keeps_head_and_tail_and_compresses_middle():
+    cap = StreamCapture(head_chars=10, tail_chars=10)
+    body = "".join(str(i % 10) for i in range(1000))
+    for i in range(0, len(body), 7):
+        cap.write(body[i:i + 7])
+    text = cap.text()
+    assert text.startswith(body[:10]) and text.endswith(body[-10:])
+    assert "[980 chars omitted" in text
+    assert zlib.decompress(cap.overflow_blob()).decode() == body[10:-10]
+
+
+def test_large_output_is_capped_in_task_results(jessica_db):
+    task_id = db.add_task("chatty", "python", "[]", 60, True)
+    row = {"id": task_id, "command": "python", "args_json": None, "timeout_seconds": 10}
+    worker = SchedulerWorker()
+    worker._execute_task = lambda task_row, handle=None: worker._run_process(
+        ["python", "-c", "import sys; sys.stdout.write('x' * 500000)"], False, 10, handle
+    )
+    handle = RunHandle(task_id, "k")
+    handle.fence = db.claim_task_run(task_id, worker.owner, 0, 30)
+    worker._run_task(task_id, row, handle)
+
+    result = db.get_task_results(task_id, 1)[0]
+    assert result["returncode"] == 0
+    assert len(result["stdout"]) < HEAD_CHARS + TAIL_CHARS + 100
+    overflow = zlib.decompress(db.get_task_result_overflow(result["id"], "stdout"))
+    assert len(overflow) == 500000 - HEAD_CHARS - TAIL_CHARS
+    assert db.get_task_result_overflow(result["id"], "stderr") is None
+
+
+def test_two_workers_claim_each_run_once(jessica_db):
+    task_id = db.add_task("shared", "echo", "[]", 3600, True)
+    workers = [RecordingWorker(owner=f"proc-{i}") for i in range(2)]
+    for w in workers:
+        w.start()
+    try:
+        deadline = time.time() + 3
+        while time.time() < deadline and not any(w.runs for w in workers):
+            time.sleep(0.05)
+        time.sleep(0.3)
+    finally:
+        for w in workers:
+            w.stop()
+    assert sum(1 for w in workers for tid, _ in w.runs if tid == task_id) == 1
+    assert db.get_task_lease(task_id)["fence"] == 1
+    assert len(db.get_task_results(task_id)) == 1
+
+
+def test_stale_fence_is_rejected(jessica_db):
+    task_id = db.add_task("leased", "echo", "[]", 60, True)
+    fence = db.claim_task_run(task_id, "a", 0, ttl=0)
+    assert db.claim_task_run(task_id, "b", 0, ttl=30) is None  # run already claimed
+    newer = db.claim_task_run(task_id, "b", fence, ttl=30)  # a's lease expired
+    assert newer == fence + 1
+    assert not db.renew_task_lease(task_id, "a", fence, 30)
+    assert not db.finish_task_run(task_id, "a", fence, 0, "late", "")
+    assert db.finish_task_run(task_id, "b", newer, 0, "ok", "")
+    assert [r["stdout"] for r in db.get_task_results(task_id)] == ["ok"]
+
+
+def test_runs_are_timed_and_published(jessica_db):
+    task_id = db.add_task("timed", "echo", "[]", 3600, True)
+    events = []
+    worker = RecordingWorker()
+    worker.set_publisher(events.append)
+    worker.start()
+    try:
+        deadline = time.time() + 3
+        while time.time() < deadline and not events:
+            time.sleep(0.05)
+    finally:
+        worker.stop()
+
+    assert events[0]["type"] == "scheduler_run"
+    run = events[0]["data"]
+    assert run["task_id"] == task_id and run["status"] == "ok" and run["returncode"] == 0
+    assert 0 <= run["lateness"] < 1 and run["queue_wait"] <= run["lateness"]
+    snap = worker.metrics.snapshot()
+    assert snap["status"] == {"ok": 1}
+    assert snap["lateness"]["count"] == snap["duration"]["count"] == 1
+    assert snap["jitter"]["count"] == 0
+    assert sum(snap["duration"]["buckets"].values()) == 1
+
+
+def test_failed_launch_releases_lease_and_records_error(jessica_db):
+    task_id = db.add_task("broken", "no-such-binary", "[]", 60, True)
+    row = {"id": task_id, "command": "no-such-binary", "args_json": None, "timeout_seconds": 10}
+    worker = SchedulerWorker()
+
+    def explode(task_row, handle=None):
+        raise FileNotFoundError("no-such-binary")
+
+    worker._execute_task = explode
+    handle = RunHandle(task_id, "k")
+    handle.fence = db.claim_task_run(task_id, worker.owner, 0, 30)
+    worker._run_task(task_id, row, handle)
+
+    assert db.get_task_lease(task_id)["expires_at"] == 0
+    assert worker.metrics.snapshot()["recent"][-1]["status"] == "error"
+    assert "FileNotFoundError" in db.get_task_results(task_id, 1)[0]["stderr"]
+    # The next run claims normally instead of counting as lost
+    assert db.claim_task_run(task_id, "other", handle.fence, 30) == handle.fence + 1
+
+
+def test_leftover_children_are_killed_so_output_completes(jessica_db):
+    worker = SchedulerWorker()
+    script = (
+        "import subprocess, sys; "
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)']); "
+        "print(child.pid, flush=True)"
+    )
+    started = time.monotonic()
+    rc, out, err = worker._run_process(["python", "-c", script], False, 10, None)
+    assert rc == 0
+    assert time.monotonic() - started < 8
+    child_pid = int(out.split()[0])
+    time.sleep(0.2)
+    # Killed and reaped by init, or at worst a zombie
+    try:
+        with open(f"/proc/{child_pid}/stat") as f:
+            assert f.read().split()[2] == "Z"
+    except FileNotFoundError:
+        pass
+
+
+def test_run_now_holds_the_concurrency_key_and_can_be_cancelled(jessica_db):
+    import threading
+
+    import pytest
+
+    from scheduler.worker import TaskBusyError
+
+    task_id = db.add_task("manual", "python", "[]", 3600, True)
+    row = {"id": task_id, "command": "python", "args_json": None, "timeout_seconds": 30,
+           "concurrency_key": None}
+    worker = SchedulerWorker()
+    worker._execute_task = lambda task_row, handle=None: worker._run_process(
+        ["python", "-c", "import time; time.sleep(20)"], False, 30, handle
+    )
+    result = {}
+    t = threading.Thread(target=lambda: result.update(run=worker.run_now(row)))
+    t.start()
+    deadline = time.time() + 5
+    while not worker.running() and time.time() < deadline:
+        time.sleep(0.02)
+    assert [r["task_id"] for r in worker.running()] == [task_id]
+    with pytest.raises(TaskBusyError):
+        worker.run_now(row)
+
+    assert worker.cancel(task_id)
+    t.join(timeout=5)
+    handle, rc, _, err = result["run"]
+    assert rc is None and "Cancelled" in err
+    assert worker.running() == []
+
+
+def test_finished_outputs_are_pruned_after_the_grace_period(monkeypatch):
+    from scheduler import output
+
+    old = output.start_output(9001)
+    old.finish(0)
+    assert output.live_output(9001) is old
+    monkeypatch.setattr(output, "OUTPUT_GRACE", 0.0)
+    running = output.start_output(9002)
+    assert output.live_output(9001) is None
+    output.start_output(9003)
+    assert output.live_output(9002) is running  # still in flight
+    output.forget_output(9002)
+    output.forget_output(9003)
+
+
+def test_end_event_reaches_a_full_tail_queue():
+    import asyncio
+
+    from scheduler.output import TaskOutput
+
+    async def scenario():
+        out = TaskOutput(1)
+        queue = asyncio.Queue(maxsize=3)
+        out.subscribe(asyncio.get_running_loop(), queue)
+        for i in range(10):
+            out.write("stdout", f"line {i}\n")
+        out.finish(0)
+        await asyncio.sleep(0.05)
+        events = []
+        while not queue.empty():
+            events.append(queue.get_nowait())
+        return events
+
+    events = asyncio.run(scenario())
+    assert len(events) == 3
+    assert events[-1] == {"type": "end", "returncode": 0}
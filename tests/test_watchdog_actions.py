@@ -0,0 +1,62 @@
+import json
+
+from watchdog import actions
+from watchdog.actions import load_rules
+
+
+def _pack(tmp_path, name, rules):
+    (tmp_path / name).write_text(json.dumps({"name": name, "rules": rules}))
+
+
+def test_default_pack_matches_like_before():
+    events = [
+        {"source": "unity", "message": "NullReferenceException: Object reference not set"},
+        {"source": "browser", "message": "GET /api 404 (Not Found)"},
+        {"source": "unity", "message": "all good"},
+    ]
+    suggestions = actions.suggest_actions_for_events(events)
+    assert [s["recommendation"]["title"] for s in suggestions] == [
+        "Unity NullReferenceException",
+        "Browser Network Error",
+    ]
+    assert suggestions[0]["event"] is events[0]
+
+
+def test_earliest_listed_rule_wins_and_bad_rules_are_skipped(tmp_path):
+    _pack(tmp_path, "a.json", [
+        {"pattern": "timeout", "title": "Timeout"},
+        {"pattern": "(unclosed", "title": "Broken"},
+        {"pattern": r"(?P<code>\d+) error", "ignore_case": False, "title": "Coded"},
+    ])
+    _pack(tmp_path, "b.json", [{"pattern": "error", "title": "Generic"}])
+    rules = load_rules([str(tmp_path)])
+    assert len(rules) == 3
+    # "Coded" starts earlier in the text but "Timeout" is listed first
+    assert rules.match("500 error after timeout")["title"] == "Timeout"
+    assert rules.match("500 error")["title"] == "Coded"
+    assert rules.match("500 ERROR")["title"] == "Generic"
+    assert rules.match("fine") is None
+
+
+def test_reload_picks_up_extra_packs(tmp_path, monkeypatch):
+    _pack(tmp_path, "extra.json", [{"pattern": "CS\\d{4}", "title": "C# compiler error"}])
+    monkeypatch.setenv("WATCHDOG_RULES_DIR", str(tmp_path))
+    assert actions.recommend("unity", "error CS0103: name does not exist") is None
+    try:
+        assert actions.reload_rules() == 4
+        assert actions.recommend("unity", "error CS0103: name does not exist")["title"] == "C# compiler error"
+    finally:
+        monkeypatch.delenv("WATCHDOG_RULES_DIR")
+        actions.reload_rules()
+
+
+def test_global_inline_flags_do_not_break_the_combined_regex(tmp_path):
+    _pack(tmp_path, "a.json", [
+        {"pattern": "(?i)timeout", "ignore_case": False, "title": "Timeout"},
+        {"pattern": "a(?i)b", "title": "Misplaced"},
+        {"pattern": "crash", "title": "Crash"},
+    ])
+    rules = load_rules([str(tmp_path)])
+    assert len(rules) == 2
+    assert rules.match("Request TIMEOUT")["title"] == "Timeout"
+    assert rules.match("app crash")["title"] == "Crash"
@@ -1,17 +1,38 @@
-import requests
-import threading
-import time
+import asyncio
 import json
+import threading
+from typing import Any, Dict, List, Optional
+
+import requests
 import websockets
 
-from data.db import log_watchdog_event
+from data.ingest import enqueue_watchdog_event
+
+# Console API call types mapped to watchdog event levels
+_LEVELS = {"error": "error", "assert": "error", "warning": "warning"}
 
 
 class DevToolsMonitor:
-    def __init__(self, port: int = 9222):
+    """Streams browser console output from the Chrome DevTools Protocol.
+
+    One background thread runs one asyncio loop. Targets are rediscovered
+    from /json every discover_interval seconds; each target gets a single
+    long-lived websocket that is attached when it appears and closed when it
+    disappears, so no console events are missed between polls. Events are
+    handed to the ingest queue, which writes them to the watchdog store in
+    batches.
+    """
+
+    def __init__(self, port: int = 9222, host: str = "localhost", discover_interval: float = 5.0):
         self.port = port
+        self.host = host
+        self.discover_interval = discover_interval
         self._thread = None
         self._stop = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._sessions: Dict[str, asyncio.Task] = {}
+        self.connects = 0
 
     def start(self):
         if self._thread and self._thread.is_alive():
@@ -22,50 +43,98 @@ class DevToolsMonitor:
 
     def stop(self):
         self._stop.set()
+        loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                pass  # loop already closed
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def attached(self) -> List[str]:
+        """Ids of targets with a live console connection."""
+        return [key for key, task in list(self._sessions.items()) if not task.done()]
 
     def _run(self):
-        while not self._stop.is_set():
-            try:
-                targets = requests.get(f"http://localhost:{self.port}/json", timeout=1).json()
-                for t in targets:
-                    ws = t.get("webSocketDebuggerUrl")
-                    if not ws:
-                        continue
-                    try:
-                        # Connect briefly and subscribe to Runtime console events
-                        # To limit scope, we connect and listen for a short window, then move on
-                        self._listen_console(ws, duration=2.0)
-                    except Exception:
-                        continue
-            except Exception:
-                pass
-            time.sleep(5)
-
-    async def _console_client(self, ws_url: str, duration: float):
-        async with websockets.connect(ws_url) as ws:
-            # Enable Runtime
-            await ws.send(json.dumps({"id": 1, "method": "Runtime.enable"}))
-            start = time.time()
-            while time.time() - start < duration:
+        try:
+            asyncio.run(self._main())
+        except Exception:
+            pass
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        try:
+            while not self._stop.is_set():
                 try:
-                    msg = await ws.recv()
-                    data = json.loads(msg)
-                    method = data.get("method")
-                    if method == "Runtime.consoleAPICalled":
-                        args = data.get("params", {}).get("args", [])
-                        texts = []
-                        for a in args:
-                            val = a.get("value") or a.get("description")
-                            if isinstance(val, str):
-                                texts.append(val)
-                        if texts:
-                            log_watchdog_event("browser", "info", " ".join(texts), None)
+                    targets = await self._loop.run_in_executor(None, self._fetch_targets)
+                    self._sync(targets)
                 except Exception:
-                    break
+                    pass  # browser not running or not debuggable; open sessions end on their own
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.discover_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            sessions = list(self._sessions.values())
+            for task in sessions:
+                task.cancel()
+            await asyncio.gather(*sessions, return_exceptions=True)
+            self._sessions.clear()
+
+    def _fetch_targets(self) -> List[Dict[str, Any]]:
+        return requests.get(f"http://{self.host}:{self.port}/json", timeout=1).json()
 
-    def _listen_console(self, ws_url: str, duration: float):
-        import asyncio
+    def _sync(self, targets: List[Dict[str, Any]]):
+        wanted = {}
+        for t in targets:
+            ws_url = t.get("webSocketDebuggerUrl")
+            if ws_url:
+                wanted[t.get("id") or ws_url] = (ws_url, t.get("url"))
+        for key, task in list(self._sessions.items()):
+            if key not in wanted or task.done():
+                task.cancel()
+                del self._sessions[key]
+        for key, (ws_url, page_url) in wanted.items():
+            if key not in self._sessions:
+                self._sessions[key] = asyncio.create_task(self._session(ws_url, page_url))
+
+    async def _session(self, ws_url: str, page_url: Optional[str]):
         try:
-            asyncio.run(self._console_client(ws_url, duration))
+            async with websockets.connect(ws_url, max_size=None) as ws:
+                self.connects += 1
+                await ws.send(json.dumps({"id": 1, "method": "Runtime.enable"}))
+                async for msg in ws:
+                    try:
+                        self._handle(json.loads(msg), page_url)
+                    except Exception:
+                        continue
+        except asyncio.CancelledError:
+            raise
         except Exception:
-            pass
\ No newline at end of file
+            pass  # dropped; re-attached on the next discovery if the target is still listed
+
+    def _handle(self, data: Dict[str, Any], page_url: Optional[str]):
+        method = data.get("method")
+        params = data.get("params") or {}
+        if method == "Runtime.consoleAPICalled":
+            texts = []
+            for a in params.get("args", []):
+                val = a.get("value") or a.get("description")
+                if isinstance(val, str):
+                    texts.append(val)
+            if not texts:
+                return
+            level = _LEVELS.get(params.get("type"), "info")
+            message = " ".join(texts)
+        elif method == "Runtime.exceptionThrown":
+            details = params.get("exceptionDetails") or {}
+            message = (details.get("exception") or {}).get("description") or details.get("text")
+            if not message:
+                return
+            level = "error"
+        else:
+            return
+        metadata = json.dumps({"url": page_url}) if page_url else None
+        enqueue_watchdog_event("browser", level, message, metadata)
@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import psutil  # type: ignore
+
+# Seconds a process snapshot stays fresh; at most one process_iter pass per interval
+SAMPLE_INTERVAL = float(os.getenv("PROCESS_SAMPLE_INTERVAL", "2.0"))
+
+_ATTRS = ["pid", "name", "exe", "cpu_percent", "memory_percent"]
+
+
+class ProcessSnapshot:
+    """One pass over the process table, indexed by pid, name and exe.
+
+    Each process is a dict with pid, name, exe, cpu and mem keys. Name and
+    exe indexes are keyed in lower case.
+    """
+
+    def __init__(self, processes: List[Dict[str, Any]], taken_at: float):
+        self.processes = processes
+        self.taken_at = taken_at
+        self.by_pid: Dict[int, Dict[str, Any]] = {}
+        self.by_name: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_exe: Dict[str, List[Dict[str, Any]]] = {}
+        for proc in processes:
+            self.by_pid[proc["pid"]] = proc
+            self.by_name.setdefault((proc["name"] or "").lower(), []).append(proc)
+            if proc["exe"]:
+                self.by_exe.setdefault(proc["exe"].lower(), []).append(proc)
+
+    def __len__(self) -> int:
+        return len(self.processes)
+
+    def named(self, name: str) -> List[Dict[str, Any]]:
+        """Processes whose name equals name (case-insensitive)."""
+        return self.by_name.get(name.lower(), [])
+
+    def matching(self, *fragments: str) -> List[Dict[str, Any]]:
+        """Processes whose name contains any of the fragments (case-insensitive)."""
+        fragments = tuple(f.lower() for f in fragments)
+        return [p for n, procs in self.by_name.items() if any(f in n for f in fragments) for p in procs]
+
+    def top(self, n: int, key: str = "cpu") -> List[Dict[str, Any]]:
+        return sorted(self.processes, key=lambda p: p[key] or 0, reverse=True)[:n]
+
+
+class ProcessSampler:
+    """Shares one process-table scan between every monitor in the process.
+
+    snapshot() returns the latest scan, rescanning only when it is older than
+    max_age (the sample interval by default); concurrent callers wait for a
+    single scan instead of each running their own. start() keeps the
+    snapshot fresh from a background thread so readers never pay for a scan.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self._latest: Optional[ProcessSnapshot] = None
+        self._scan_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.scans = 0
+
+    def snapshot(self, max_age: Optional[float] = None) -> ProcessSnapshot:
+        max_age = self.interval if max_age is None else max_age
+        latest = self._latest
+        if latest is not None and time.time() - latest.taken_at <= max_age:
+            return latest
+        with self._scan_lock:
+            latest = self._latest
+            if latest is not None and time.time() - latest.taken_at <= max_age:
+                return latest  # another caller just scanned
+            return self._scan()
+
+    def _scan(self) -> ProcessSnapshot:
+        procs = []
+        for p in psutil.process_iter(attrs=_ATTRS):
+            info = p.info
+            procs.append({
+                "pid": info.get("pid"),
+                "name": info.get("name") or "",
+                "exe": info.get("exe"),
+                "cpu": info.get("cpu_percent"),
+                "mem": info.get("memory_percent"),
+            })
+        self.scans += 1
+        self._latest = ProcessSnapshot(procs, time.time())
+        return self._latest
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with self._scan_lock:
+                    self._scan()
+            except Exception:
+                pass
+            self._stop.wait(self.interval)
+
+
+process_sampler = ProcessSampler()